@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -15,22 +15,36 @@ class Settings(BaseSettings):
     COGNITO_USER_POOL_ID: str
     COGNITO_CLIENT_ID: str
     COGNITO_CLIENT_SECRET: str
+    JWKS_CACHE_TTL_SECONDS: float = 3600.0  # Signing keys are refreshed in the background after this
+    JWKS_MIN_REFRESH_SECONDS: float = 30.0  # Unknown key ids trigger a refresh at most this often
+    JWKS_TIMEOUT_SECONDS: float = 5.0
+    AUTH_TOKEN_CACHE_SIZE: int = 10000  # Verified tokens kept until they expire (0 disables the cache)
+    AUTH_USER_PROFILE_CACHE_SECONDS: float = 300.0  # How long Cognito attributes missing from tokens are reused
     
     # AWS S3
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     S3_BUCKET_NAME: str
     S3_REGION: str
+    AWS_MAX_POOL_CONNECTIONS: int = 32  # HTTP connections per shared boto3 client
+    AWS_MAX_WORKERS: int = 16  # Threads for blocking AWS calls
+    AWS_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AWS_READ_TIMEOUT_SECONDS: float = 10.0  # Per attempt; botocore makes up to 3
     
     # Stripe
     STRIPE_SECRET_KEY: str
     STRIPE_PUBLISHABLE_KEY: str
     STRIPE_WEBHOOK_SECRET: str
+    STRIPE_MAX_WORKERS: int = 4  # Threads for blocking Stripe SDK calls
+    STRIPE_TIMEOUT_SECONDS: float = 30.0
     
     # Plaid
     PLAID_CLIENT_ID: str
     PLAID_SECRET: str
     PLAID_ENV: str
+    PLAID_MAX_WORKERS: int = 8  # Threads (and HTTP connections) for blocking Plaid SDK calls
+    PLAID_TIMEOUT_SECONDS: float = 30.0
+    PLAID_RECIPIENT_FINGERPRINT_KEY: Optional[str] = None  # HMAC key for recipient fingerprints (defaults to SECRET_KEY)
     
     # Email
     SMTP_HOST: str
@@ -38,6 +52,16 @@ class Settings(BaseSettings):
     SMTP_USER: str
     SMTP_PASSWORD: str
     FROM_EMAIL: str
+    SMTP_STARTTLS: bool = True
+    SMTP_POOL_SIZE: int = 4  # Long-lived authenticated sessions per process
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    
+    # Bulk notifications
+    NOTIFICATION_CONCURRENCY: int = 8
+    NOTIFICATION_RATE_PER_SECOND: float = 20.0  # Messages per second toward the SMTP relay (0 = unlimited)
+    NOTIFICATION_MAX_RETRIES: int = 3  # Retries per recipient for transient (4xx) failures
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 2.0
     
     # Security
     SECRET_KEY: str
@@ -60,6 +84,33 @@ class Settings(BaseSettings):
     
     ENCRYPTION_KEY: str = "your-fernet-key-here"
     
+    # Payroll outbox worker (PDF, email and payment side effects)
+    OUTBOX_WORKER_ENABLED: bool = True
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 5.0
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_LEASE_SECONDS: int = 300
+    OUTBOX_PDF_CONCURRENCY: int = 4
+    OUTBOX_EMAIL_CONCURRENCY: int = 8
+    OUTBOX_PAYMENT_CONCURRENCY: int = 4
+    
+    # Payroll job worker (runs queued payroll calculations)
+    PAYROLL_WORKER_ENABLED: bool = True
+    PAYROLL_JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    PAYROLL_JOB_LEASE_SECONDS: int = 600  # A running job with no progress for this long is picked up again
+    
+    # Payouts
+    PAYMENT_BATCH_CONCURRENCY: int = 8  # Plaid payment calls in flight per batch
+    PAYMENT_STATUS_REFRESH_SECONDS: float = 60.0  # How often the worker polls Plaid for submitted payments
+    
+    # Payslip PDF rendering processes (0 = one per available core)
+    PDF_RENDER_WORKERS: int = 0
+    
+    # Payroll calculation processes (0 = one per available core); smaller runs are calculated in-process
+    PAYROLL_CALC_WORKERS: int = 0
+    PAYROLL_SHARD_SIZE: int = 2000
+    PAYROLL_PARALLEL_MIN_EMPLOYEES: int = 5000
+    
     @property
     def DATABASE_URL(self) -> str:
         return f"mysql+aiomysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
@@ -0,0 +1,52 @@
+import time
+from typing import Any, Dict
+from fastapi import Depends, HTTPException, Request, status
+from backend.config import settings
+from backend.schemas import UserInfo
+from backend.services.auth_service import cognito_service
+from backend.services.aws_clients import aws_executor
+from backend.utils.cache import TTLCache
+
+# Cognito profiles (attributes access tokens do not carry), keyed by user sub
+user_profiles: TTLCache[Dict[str, Any]] = TTLCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+async def get_current_user_info(request: Request) -> UserInfo:
+    """Get current user info from the claims the auth middleware verified"""
+    try:
+        user_info = request.state.user
+        if not user_info:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not authenticated"
+            )
+        return UserInfo(**user_info)
+    except AttributeError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not authenticated"
+        )
+
+async def get_current_user_profile(
+    request: Request,
+    current_user: UserInfo = Depends(get_current_user_info)
+) -> UserInfo:
+    """Get current user info, completed from Cognito when the token lacks the org or profile.
+
+    Access tokens carry the sub and groups but not custom attributes, so the first request of
+    a user fetches the rest with GetUser (on the AWS executor) and keeps it for
+    AUTH_USER_PROFILE_CACHE_SECONDS. Claims present in the token always win.
+    """
+    if current_user.org_id and current_user.email:
+        return current_user
+
+    profile = user_profiles.get(current_user.sub)
+    if profile is None:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            # Users set by the middleware without a token (the development test user)
+            return current_user
+        profile = await aws_executor.run(cognito_service.get_user_info, token)
+        user_profiles.set(current_user.sub, profile, time.time() + settings.AUTH_USER_PROFILE_CACHE_SECONDS)
+
+    claims = {name: value for name, value in current_user.model_dump().items() if value}
+    return UserInfo(**{**profile, **claims})
@@ -7,8 +7,15 @@ from contextlib import asynccontextmanager
 from backend.database import engine, Base
 from backend.routers import auth, employees, timesheets, payroll, payslips, organizations, bank_accounts
 from backend.config import settings
-from backend.services.auth_service import verify_token
+from backend.services.auth_service import verify_token, cognito_service
 from backend.middleware.auth_middleware import auth_middleware
+from backend.services.outbox_service import outbox_service
+from backend.services.payroll_job_service import payroll_job_service
+from backend.services.pdf_service import shutdown_render_pool
+from backend.services.payroll_engine import shutdown_calc_pool
+from backend.services.email_service import close_smtp_pool
+from backend.services.tax_brackets import federal_brackets
+from backend.services.aws_clients import aws_executor, warm_up_aws_clients, shutdown_aws_clients
 
 # Create tables
 @asynccontextmanager
@@ -16,9 +23,21 @@ async def lifespan(app: FastAPI):
     # Startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    federal_brackets.load()
+    cognito_service.jwks.start()
+    await aws_executor.run(warm_up_aws_clients)
+    if settings.OUTBOX_WORKER_ENABLED:
+        outbox_service.start_worker()
+    if settings.PAYROLL_WORKER_ENABLED:
+        payroll_job_service.start_worker()
     yield
     # Shutdown
-    pass
+    await payroll_job_service.stop_worker()
+    await outbox_service.stop_worker()
+    shutdown_render_pool()
+    shutdown_calc_pool()
+    await close_smtp_pool()
+    shutdown_aws_clients()
 
 app = FastAPI(
     title="Payroll Management System",
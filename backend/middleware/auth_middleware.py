@@ -1,11 +1,32 @@
+import hashlib
+import jwt
+from typing import Dict, Any
 from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from backend.services.auth_service import verify_token
+from backend.utils.cache import TTLCache
 from backend.utils.logger import api_logger
 from backend.config import settings
 
 security = HTTPBearer()
 
+# User info of recently verified tokens, keyed by the token's SHA-256 and kept until it expires
+verified_tokens: TTLCache[Dict[str, Any]] = TTLCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+async def verify_token_cached(token: str) -> Dict[str, Any]:
+    """Verify a token, skipping the signature check for a token already verified and not yet expired"""
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    user_info = verified_tokens.get(token_hash)
+    if user_info is not None:
+        return dict(user_info)
+    
+    user_info = await verify_token(token)
+    # The signature has just been checked, so the expiry claim can be read as-is
+    expires_at = jwt.decode(token, options={"verify_signature": False}).get('exp')
+    if expires_at:
+        verified_tokens.set(token_hash, dict(user_info), float(expires_at))
+    return user_info
+
 async def verify_auth_token(credentials: HTTPAuthorizationCredentials = None):
     """Verify authentication token"""
     if not credentials:
@@ -16,7 +37,7 @@ async def verify_auth_token(credentials: HTTPAuthorizationCredentials = None):
         )
     
     try:
-        user_info = await verify_token(credentials.credentials)
+        user_info = await verify_token_cached(credentials.credentials)
         api_logger.info(f"Authentication successful for user: {user_info.get('sub')} with groups: {user_info.get('groups', [])}")
         return user_info
     except Exception as e:
@@ -92,7 +113,7 @@ async def auth_middleware(request: Request, call_next):
                 )
                 
             # Verify token and set user info in request state
-            user_info = await verify_token(token)
+            user_info = await verify_token_cached(token)
             request.state.user = user_info
             
             return await call_next(request)
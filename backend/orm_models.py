@@ -1,29 +1,27 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Enum, DECIMAL, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Enum, DECIMAL, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
 import enum
 from datetime import datetime
 from sqlalchemy_utils import EncryptedType
+from sqlalchemy_utils.types.encrypted.encrypted_type import FernetEngine
 from cryptography.fernet import Fernet
-import os
-from dotenv import load_dotenv
+from functools import lru_cache
+from backend.config import settings
 from backend.models.contractor import Contractor
 
-load_dotenv()  # Load variables from .env
-
-key_str = os.getenv("ENCRYPTION_KEY")
-if not key_str:
-    raise ValueError("ENCRYPTION_KEY not set in environment variables")
-
-try:
-    key = key_str.encode()  # Fernet key must be base64-encoded bytes
-    Fernet(key)  # Validate the key
-except Exception:
-    raise ValueError("ENCRYPTION_KEY is not a valid 32-byte url-safe base64 string")
-
-def get_fernet():
-    return Fernet(key)
+@lru_cache(maxsize=None)
+def get_encryption_key() -> str:
+    """Validated ENCRYPTION_KEY, resolved on the first encrypt/decrypt rather than on import"""
+    key_str = settings.ENCRYPTION_KEY
+    if not key_str:
+        raise ValueError("ENCRYPTION_KEY not set in environment variables")
+    try:
+        Fernet(key_str.encode())  # Fernet key must be base64-encoded bytes
+    except Exception:
+        raise ValueError("ENCRYPTION_KEY is not a valid 32-byte url-safe base64 string")
+    return key_str
 
 class OnboardingStatus(str, enum.Enum):
     PENDING = "pending"
@@ -55,6 +53,23 @@ class PaymentStatus(str, enum.Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+class OutboxEventType(str, enum.Enum):
+    PAYSLIP_PDF = "payslip_pdf"
+    PAYSLIP_EMAIL = "payslip_email"
+    PAYMENT = "payment"
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class PayrollJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class Organization(Base):
     __tablename__ = "organizations"
     
@@ -84,6 +99,9 @@ class User(Base):
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("ix_employees_org_id_is_active", "org_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     cognito_sub = Column(String(255), unique=True, nullable=False, index=True)
@@ -125,6 +143,9 @@ class Employee(Base):
 
 class Timesheet(Base):
     __tablename__ = "timesheets"
+    __table_args__ = (
+        Index("ix_timesheets_employee_status_week", "employee_id", "status", "week_start_date", "week_end_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -144,7 +165,8 @@ class Timesheet(Base):
     approved_at = Column(DateTime(timezone=True))
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Stamped by the application clock, like approved_at: payroll recompute compares both with it
+    updated_at = Column(DateTime(timezone=True), onupdate=datetime.utcnow)
     
     # Relationships
     employee = relationship("Employee", back_populates="timesheets", foreign_keys=[employee_id])
@@ -169,6 +191,9 @@ class TaxConfiguration(Base):
 
 class PayrollRun(Base):
     __tablename__ = "payroll_runs"
+    __table_args__ = (
+        Index("ix_payroll_runs_org_id_period", "org_id", "pay_period_start", "pay_period_end"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     org_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
@@ -181,6 +206,9 @@ class PayrollRun(Base):
     total_taxes = Column(DECIMAL(12, 2), default=0)
     processed_by = Column(Integer, ForeignKey("employees.id"))
     processed_at = Column(DateTime(timezone=True))
+    checkpoint_employee_id = Column(Integer)  # Last employee whose payslip is committed; a retry resumes after it
+    recomputed_at = Column(DateTime(timezone=True))  # Timesheet changes up to here are covered by adjustment payslips
+    claim_token = Column(String(64))  # Job claim processing the run; only its holder may write payslips
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -190,6 +218,10 @@ class PayrollRun(Base):
 
 class Payslip(Base):
     __tablename__ = "payslips"
+    __table_args__ = (
+        Index("ix_payslips_employee_id_pay_date", "employee_id", "pay_date"),
+        Index("ix_payslips_payroll_run_id_employee_id", "payroll_run_id", "employee_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
@@ -197,6 +229,7 @@ class Payslip(Base):
     pay_period_start = Column(DateTime(timezone=True), nullable=False)
     pay_period_end = Column(DateTime(timezone=True), nullable=False)
     pay_date = Column(DateTime(timezone=True), nullable=False)
+    is_adjustment = Column(Boolean, default=False, nullable=False)  # Amounts are differences to earlier payslips of the run
     
     # Earnings
     regular_hours = Column(DECIMAL(5, 2), default=0)
@@ -231,6 +264,57 @@ class Payslip(Base):
     employee = relationship("Employee", back_populates="payslips")
     payroll_run = relationship("PayrollRun", back_populates="payslips")
 
+class EmployeeYTDWages(Base):
+    __tablename__ = "employee_ytd_wages"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "tax_year", name="uq_employee_ytd_wages_employee_year"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    tax_year = Column(Integer, nullable=False)  # Calendar year of the pay date
+    gross_wages = Column(DECIMAL(14, 2), nullable=False, default=0)  # Gross pay on payslips dated in tax_year
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class PayrollOutboxEvent(Base):
+    __tablename__ = "payroll_outbox"
+    __table_args__ = (
+        # Workers claim due events per type; without it FOR UPDATE SKIP LOCKED scans (and locks) the table
+        Index("ix_payroll_outbox_event_type_status_available_at", "event_type", "status", "available_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    payroll_run_id = Column(Integer, ForeignKey("payroll_runs.id"), nullable=False)
+    payslip_id = Column(Integer, ForeignKey("payslips.id"), nullable=False)
+    event_type = Column(Enum(OutboxEventType), nullable=False)
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    available_at = Column(DateTime(timezone=True), server_default=func.now())  # Not retried before this time
+    locked_at = Column(DateTime(timezone=True))  # Set when a worker claims the event
+    processed_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class PayrollJob(Base):
+    __tablename__ = "payroll_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    payroll_run_id = Column(Integer, ForeignKey("payroll_runs.id"), nullable=False)
+    status = Column(Enum(PayrollJobStatus), nullable=False, default=PayrollJobStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    employees_total = Column(Integer, nullable=False, default=0)
+    employees_calculated = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    requested_by = Column(String(255))  # Cognito sub of the admin who queued the job
+    locked_at = Column(DateTime(timezone=True))  # Refreshed by the worker as it makes progress
+    claim_token = Column(String(64))  # New for every claim; a worker only writes the job while it matches
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
 class BankAccount(Base):
     __tablename__ = "bank_accounts"
     
@@ -244,14 +328,17 @@ class BankAccount(Base):
     mask = Column(String(10))
     is_primary = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
+    # Plaid payment recipient reused across pay periods; only valid while the fingerprint matches
+    plaid_recipient_id = Column(String(255))
+    plaid_recipient_fingerprint = Column(String(64))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     
     # Extend BankAccount for encrypted account number
-    account_number = Column(EncryptedType(String, key, get_fernet), nullable=True)
-    routing_number = Column(EncryptedType(String, key, get_fernet), nullable=True)
+    account_number = Column(EncryptedType(String, get_encryption_key, FernetEngine), nullable=True)
+    routing_number = Column(EncryptedType(String, get_encryption_key, FernetEngine), nullable=True)
 
 class EmergencyContact(Base):
     __tablename__ = "emergency_contacts"
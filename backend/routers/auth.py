@@ -3,12 +3,12 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from backend.services.auth_service import cognito_service, get_current_user
 from backend.schemas import UserInfo, Token
 from backend.config import settings
+from backend.services.aws_clients import aws_executor, cognito_client
 from backend.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from backend.orm_models import Employee, UserRole, SalaryType, Organization
 from decimal import Decimal
-import boto3
 import hmac
 import hashlib
 import base64
@@ -48,12 +48,7 @@ async def signup(
 ):
     """Sign up a new user with Cognito"""
     # No org_id validation, allow any string
-    client = boto3.client(
-        "cognito-idp",
-        region_name=settings.COGNITO_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    client = cognito_client()
     
     try:
         attributes = [
@@ -65,7 +60,8 @@ async def signup(
             {"Name": "custom:role", "Value": request.role},
         ]
         print("Cognito signup attributes:", attributes)
-        response = client.sign_up(
+        response = await aws_executor.run(
+            client.sign_up,
             ClientId=settings.COGNITO_CLIENT_ID,
             SecretHash=calculate_secret_hash(request.email),
             Username=request.email,
@@ -75,7 +71,8 @@ async def signup(
         
         # Auto-confirm the user
         try:
-            client.admin_confirm_sign_up(
+            await aws_executor.run(
+                client.admin_confirm_sign_up,
                 UserPoolId=settings.COGNITO_USER_POOL_ID,
                 Username=request.email
             )
@@ -87,7 +84,8 @@ async def signup(
         role = request.role.lower()
         if role in ["admin", "manager", "employee"]:
             try:
-                client.admin_add_user_to_group(
+                await aws_executor.run(
+                    client.admin_add_user_to_group,
                     UserPoolId=settings.COGNITO_USER_POOL_ID,
                     Username=request.email,
                     GroupName=role
@@ -147,15 +145,11 @@ async def confirm_signup(
     request: ConfirmRequest,
 ):
     """Confirm user signup with verification code"""
-    client = boto3.client(
-        "cognito-idp",
-        region_name=settings.COGNITO_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    client = cognito_client()
     
     try:
-        response = client.confirm_sign_up(
+        response = await aws_executor.run(
+            client.confirm_sign_up,
             ClientId=settings.COGNITO_CLIENT_ID,
             SecretHash=calculate_secret_hash(request.email),
             Username=request.email,
@@ -176,15 +170,11 @@ async def login(
     request: LoginRequest,
 ):
     """Login user with Cognito"""
-    client = boto3.client(
-        "cognito-idp",
-        region_name=settings.COGNITO_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    client = cognito_client()
     
     try:
-        response = client.admin_initiate_auth(
+        response = await aws_executor.run(
+            client.admin_initiate_auth,
             UserPoolId=settings.COGNITO_USER_POOL_ID,
             ClientId=settings.COGNITO_CLIENT_ID,
             AuthFlow="ADMIN_NO_SRP_AUTH",
@@ -217,16 +207,12 @@ async def login(
 
 async def get_user_info_from_cognito(username: str) -> dict:
     """Get user information from Cognito"""
-    client = boto3.client(
-        "cognito-idp",
-        region_name=settings.COGNITO_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    client = cognito_client()
     
     try:
         # Get user attributes
-        response = client.admin_get_user(
+        response = await aws_executor.run(
+            client.admin_get_user,
             UserPoolId=settings.COGNITO_USER_POOL_ID,
             Username=username
         )
@@ -255,7 +241,8 @@ async def get_user_info_from_cognito(username: str) -> dict:
         
         # Get user groups
         try:
-            groups_response = client.admin_list_groups_for_user(
+            groups_response = await aws_executor.run(
+                client.admin_list_groups_for_user,
                 UserPoolId=settings.COGNITO_USER_POOL_ID,
                 Username=username
             )
@@ -3,21 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from typing import List
 from backend.database import get_db
+from backend.dependencies import get_current_user_profile
 from backend.orm_models import BankAccount, Employee, UserRole
 from backend.schemas import BankAccount as BankAccountSchema, BankAccountCreate, UserInfo
-from backend.services.auth_service import get_current_user
 from backend.services.plaid_service import plaid_service
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 
 router = APIRouter()
-security = HTTPBearer()
-
-async def get_current_user_info(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserInfo:
-    """Get current user info from token"""
-    token = credentials.credentials
-    user_info = await get_current_user(token)
-    return UserInfo(**user_info)
 
 class LinkTokenRequest(BaseModel):
     client_name: str = "Payroll System"
@@ -29,7 +21,7 @@ class PublicTokenRequest(BaseModel):
 @router.post("/link-token")
 async def create_link_token(
     request: LinkTokenRequest,
-    current_user: UserInfo = Depends(get_current_user_info),
+    current_user: UserInfo = Depends(get_current_user_profile),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a Plaid link token for bank account connection"""
@@ -63,7 +55,7 @@ async def create_link_token(
 @router.post("/connect")
 async def connect_bank_account(
     request: PublicTokenRequest,
-    current_user: UserInfo = Depends(get_current_user_info),
+    current_user: UserInfo = Depends(get_current_user_profile),
     db: AsyncSession = Depends(get_db)
 ):
     """Connect a bank account using Plaid"""
@@ -154,7 +146,7 @@ async def connect_bank_account(
 
 @router.get("/", response_model=List[BankAccountSchema])
 async def get_bank_accounts(
-    current_user: UserInfo = Depends(get_current_user_info),
+    current_user: UserInfo = Depends(get_current_user_profile),
     db: AsyncSession = Depends(get_db)
 ):
     """Get bank accounts for the current user"""
@@ -190,7 +182,7 @@ async def get_bank_accounts(
 @router.get("/{account_id}", response_model=BankAccountSchema)
 async def get_bank_account(
     account_id: int,
-    current_user: UserInfo = Depends(get_current_user_info),
+    current_user: UserInfo = Depends(get_current_user_profile),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific bank account"""
@@ -237,7 +229,7 @@ async def get_bank_account(
 @router.delete("/{account_id}")
 async def delete_bank_account(
     account_id: int,
-    current_user: UserInfo = Depends(get_current_user_info),
+    current_user: UserInfo = Depends(get_current_user_profile),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a bank account"""
@@ -288,7 +280,7 @@ async def delete_bank_account(
 @router.post("/{account_id}/verify")
 async def verify_bank_account(
     account_id: int,
-    current_user: UserInfo = Depends(get_current_user_info),
+    current_user: UserInfo = Depends(get_current_user_profile),
     db: AsyncSession = Depends(get_db)
 ):
     """Verify a bank account"""
@@ -1,18 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Body, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc
 from typing import List, Optional
 from backend.database import get_db
+from backend.dependencies import get_current_user_profile
+from backend.utils.pagination import paginate, set_next_cursor
 from backend.orm_models import Employee, UserRole, SalaryType, Payslip, BankAccount, EmergencyContact, Compensation, TaxInfo, OnboardingStatus, EmployeeOnboardingDraft, Compensation as CompensationModel, EmergencyContact as EmergencyContactModel, BankAccount as BankAccountModel
 from backend.schemas import Employee as EmployeeSchema, EmployeeCreate, EmployeeUpdate, UserInfo, Payslip as PayslipSchema, BankAccount as BankAccountSchema, EmergencyContactCreate, EmergencyContact, CompensationCreate, Compensation, W2EmployeeOnboardingDraft, W2EmployeeOnboarding
 from backend.services.auth_service import get_current_user, cognito_service
 from backend.services.email_service import EmailService
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import boto3
 import hmac
 import hashlib
 import base64
 from backend.config import settings
+from backend.services.aws_clients import aws_executor, cognito_client
 import shutil
 import os
 from sqlalchemy.future import select
@@ -21,7 +22,6 @@ from datetime import datetime
 import logging
 
 router = APIRouter()
-security = HTTPBearer()
 email_service = EmailService()
 
 def calculate_secret_hash(username: str) -> str:
@@ -31,17 +31,11 @@ def calculate_secret_hash(username: str) -> str:
     dig = hmac.new(key, msg, hashlib.sha256).digest()
     return base64.b64encode(dig).decode()
 
-async def get_current_user_info(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserInfo:
-    """Get current user info from token"""
-    token = credentials.credentials
-    user_info = await get_current_user(token)
-    return UserInfo(**user_info)
-
 @router.post("/", response_model=EmployeeSchema)
 async def create_employee(
     employee: EmployeeCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Create a new employee (Admin only)"""
     if "admin" not in current_user.get("groups", []):
@@ -51,12 +45,7 @@ async def create_employee(
         )
     
     # Initialize Cognito client
-    client = boto3.client(
-        "cognito-idp",
-        region_name=settings.COGNITO_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    client = cognito_client()
     
     cognito_sub = None
     
@@ -65,7 +54,8 @@ async def create_employee(
         cognito_sub = employee.cognito_sub
         # Verify the user exists in Cognito
         try:
-            client.admin_get_user(
+            await aws_executor.run(
+                client.admin_get_user,
                 UserPoolId=settings.COGNITO_USER_POOL_ID,
                 Username=employee.email
             )
@@ -81,7 +71,8 @@ async def create_employee(
             temp_password = f"Temp{employee.first_name}{employee.last_name}123!"
             
             # Create user in Cognito
-            cognito_response = client.admin_create_user(
+            cognito_response = await aws_executor.run(
+                client.admin_create_user,
                 UserPoolId=settings.COGNITO_USER_POOL_ID,
                 Username=employee.email,
                 UserAttributes=[
@@ -99,7 +90,8 @@ async def create_employee(
             
             # Add user to appropriate group based on role
             try:
-                client.admin_add_user_to_group(
+                await aws_executor.run(
+                    client.admin_add_user_to_group,
                     UserPoolId=settings.COGNITO_USER_POOL_ID,
                     Username=employee.email,
                     GroupName=employee.role
@@ -164,12 +156,14 @@ async def create_employee(
 
 @router.get("/", response_model=List[EmployeeSchema])
 async def get_employees(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     department: Optional[str] = None,
     is_active: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get employees list"""
     # Build query conditions
@@ -196,9 +190,10 @@ async def get_employees(
     if conditions:
         query = query.where(and_(*conditions))
     
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, Employee.id, limit, cursor=cursor, skip=skip)
     result = await db.execute(query)
     employees = result.scalars().all()
+    set_next_cursor(response, employees, limit)
     
     return employees
 
@@ -206,7 +201,7 @@ async def get_employees(
 async def get_employee(
     employee_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get employee by ID, including compensation, emergency_contacts, and bank_accounts"""
     result = await db.execute(select(Employee).where(Employee.id == employee_id))
@@ -242,7 +237,7 @@ async def update_employee(
     employee_id: int,
     employee_update: EmployeeUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Update employee (Admin only)"""
     result = await db.execute(select(Employee).where(Employee.id == employee_id))
@@ -275,7 +270,7 @@ async def update_employee(
 async def delete_employee(
     employee_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Delete employee (Admin only)"""
     if "admin" not in current_user.get("groups", []):
@@ -302,7 +297,7 @@ async def delete_employee(
 @router.get("/me/profile", response_model=EmployeeSchema)
 async def get_my_profile(
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get current user's employee profile"""
     result = await db.execute(
@@ -319,7 +314,7 @@ async def get_my_profile(
 @router.get("/me/salary")
 async def get_my_salary(
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get current user's most recent payslip (salary info)"""
     result = await db.execute(
@@ -335,7 +330,7 @@ async def get_my_salary(
 @router.get("/me/bank-account")
 async def get_my_bank_account(
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get current user's bank account info"""
     result = await db.execute(
@@ -360,7 +355,8 @@ async def onboard_employee(
     if "admin" not in current_user.get("groups", []):
         raise HTTPException(status_code=403, detail="Not authorized")
     # Create user in Cognito
-    sub, temp_password = cognito_service.create_user(
+    sub, temp_password = await aws_executor.run(
+        cognito_service.create_user,
         email=employee.email,
         first_name=employee.first_name,
         last_name=employee.last_name
@@ -489,19 +485,15 @@ async def finalize_employee_onboarding(payload: W2EmployeeOnboarding, db: AsyncS
     data = payload.dict()
     try:
         # 1. Cognito user creation
-        client = boto3.client(
-            "cognito-idp",
-            region_name=settings.COGNITO_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        )
+        client = cognito_client()
         cognito_sub = None
         email = data.get("email")
         first_name = data["legal_first_name"]
         last_name = data["legal_last_name"]
         try:
             # Try to get user
-            user = client.admin_get_user(
+            user = await aws_executor.run(
+                client.admin_get_user,
                 UserPoolId=settings.COGNITO_USER_POOL_ID,
                 Username=email
             )
@@ -509,7 +501,8 @@ async def finalize_employee_onboarding(payload: W2EmployeeOnboarding, db: AsyncS
         except client.exceptions.UserNotFoundException:
             # Create user
             temp_password = f"Temp{first_name}{last_name}123!"
-            resp = client.admin_create_user(
+            resp = await aws_executor.run(
+                client.admin_create_user,
                 UserPoolId=settings.COGNITO_USER_POOL_ID,
                 Username=email,
                 UserAttributes=[
@@ -525,7 +518,8 @@ async def finalize_employee_onboarding(payload: W2EmployeeOnboarding, db: AsyncS
             cognito_sub = resp["User"]["Username"]
             # Add to group
             try:
-                client.admin_add_user_to_group(
+                await aws_executor.run(
+                    client.admin_add_user_to_group,
                     UserPoolId=settings.COGNITO_USER_POOL_ID,
                     Username=email,
                     GroupName="employee"
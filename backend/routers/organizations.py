@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
 from backend.database import get_db
+from backend.dependencies import get_current_user_profile
 from backend.orm_models import Organization, TaxConfiguration, UserRole
 from backend.schemas import (
     Organization as OrganizationSchema, 
@@ -11,23 +12,14 @@ from backend.schemas import (
     TaxConfigurationCreate,
     UserInfo
 )
-from backend.services.auth_service import get_current_user
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter()
-security = HTTPBearer()
-
-async def get_current_user_info(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserInfo:
-    """Get current user info from token"""
-    token = credentials.credentials
-    user_info = await get_current_user(token)
-    return UserInfo(**user_info)
 
 @router.post("/", response_model=OrganizationSchema)
 async def create_organization(
     organization: OrganizationCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Create a new organization (Admin only)"""
     if UserRole.ADMIN.value not in current_user.groups:
@@ -67,7 +59,7 @@ async def get_public_organizations(
 @router.get("/", response_model=List[OrganizationSchema])
 async def get_organizations(
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get organizations list"""
     # For now, return all organizations
@@ -80,7 +72,7 @@ async def get_organizations(
 async def get_organization(
     org_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get organization by ID"""
     result = await db.execute(select(Organization).where(Organization.id == org_id))
@@ -99,7 +91,7 @@ async def create_tax_configuration(
     org_id: int,
     tax_config: TaxConfigurationCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Create tax configuration for organization (Admin only)"""
     if UserRole.ADMIN.value not in current_user.groups:
@@ -144,7 +136,7 @@ async def create_tax_configuration(
 async def get_tax_configuration(
     org_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get tax configuration for organization"""
     result = await db.execute(
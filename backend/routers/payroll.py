@@ -1,32 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from typing import List, Optional
 from datetime import datetime
 from backend.database import get_db
+from backend.dependencies import get_current_user_info
+from backend.utils.pagination import paginate, set_next_cursor
 from backend.orm_models import PayrollRun, Employee, UserRole, PayrollStatus
 from backend.schemas import PayrollRun as PayrollRunSchema, PayrollRunCreate, UserInfo
 from backend.services.payroll_service import PayrollService
+from backend.services.payroll_job_service import payroll_job_service
 
 router = APIRouter()
 payroll_service = PayrollService()
 
-async def get_current_user_info(request: Request) -> UserInfo:
-    """Get current user info from request state"""
-    try:
-        user_info = request.state.user
-        if not user_info:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not authenticated"
-            )
-        return UserInfo(**user_info)
-    except AttributeError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not authenticated"
-        )
-
 @router.post("/", response_model=PayrollRunSchema)
 async def create_payroll_run(
     payroll_run: PayrollRunCreate,
@@ -65,11 +52,50 @@ async def create_payroll_run(
     
     return db_payroll_run
 
+@router.post("/preview")
+async def preview_payroll_run(
+    payroll_run: PayrollRunCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserInfo = Depends(get_current_user_info)
+):
+    """Preview the payroll register for a period without creating a run (Admin only).
+    
+    Nothing is written: no payroll run, payslips, PDFs, emails or payments. Safe to repeat.
+    """
+    if UserRole.ADMIN.value not in current_user.groups:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can preview payroll"
+        )
+    
+    # The register shows every employee's pay, so only for the admin's own organization
+    if not current_user.org_id or str(payroll_run.org_id) != current_user.org_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only preview payroll for your organization"
+        )
+    
+    try:
+        return await payroll_service.preview_payroll(
+            db,
+            org_id=payroll_run.org_id,
+            pay_period_start=payroll_run.pay_period_start,
+            pay_period_end=payroll_run.pay_period_end,
+            pay_date=payroll_run.pay_date
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/", response_model=List[PayrollRunSchema])
 async def get_payroll_runs(
+    response: Response,
     org_id: Optional[int] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     db: AsyncSession = Depends(get_db),
     current_user: UserInfo = Depends(get_current_user_info)
 ):
@@ -98,9 +124,10 @@ async def get_payroll_runs(
     if conditions:
         query = query.where(and_(*conditions))
     
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, PayrollRun.id, limit, cursor=cursor, skip=skip)
     result = await db.execute(query)
     payroll_runs = result.scalars().all()
+    set_next_cursor(response, payroll_runs, limit)
     
     return payroll_runs
 
@@ -130,13 +157,17 @@ async def get_payroll_run(
     
     return payroll_run
 
-@router.post("/{payroll_run_id}/process")
+@router.post("/{payroll_run_id}/process", status_code=status.HTTP_202_ACCEPTED)
 async def process_payroll_run(
     payroll_run_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: UserInfo = Depends(get_current_user_info)
 ):
-    """Process payroll run (Admin only)"""
+    """Queue a payroll run for processing (Admin only).
+    
+    Returns the job at once; poll GET /api/payroll/jobs/{job_id} for progress. Repeating the
+    request while the run is queued or running returns the same job.
+    """
     if UserRole.ADMIN.value not in current_user.groups:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -144,15 +175,69 @@ async def process_payroll_run(
         )
     
     try:
-        result = await payroll_service.process_payroll(db, payroll_run_id)
-        return result
+        job = await payroll_job_service.enqueue(db, payroll_run_id, requested_by=current_user.sub)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {
+        "job_id": job.id,
+        "payroll_run_id": payroll_run_id,
+        "status": job.status.value,
+        "status_url": f"/api/payroll/jobs/{job.id}"
+    }
+
+@router.post("/{payroll_run_id}/recompute")
+async def recompute_payroll_run(
+    payroll_run_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserInfo = Depends(get_current_user_info)
+):
+    """Issue adjustment payslips for timesheets approved since the run was processed (Admin only)"""
+    if UserRole.ADMIN.value not in current_user.groups:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can recompute payroll"
+        )
+    
+    try:
+        return await payroll_service.recompute_payroll(db, payroll_run_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
-    except Exception as e:
+    except RuntimeError as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing payroll: {str(e)}"
-        ) 
\ No newline at end of file
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/jobs/{job_id}")
+async def get_payroll_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserInfo = Depends(get_current_user_info)
+):
+    """Get payroll job status and progress (Admin only)"""
+    if UserRole.ADMIN.value not in current_user.groups:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view payroll jobs"
+        )
+    
+    job_status = await payroll_job_service.get_status(db, job_id)
+    if not job_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payroll job not found"
+        )
+    
+    return job_status
@@ -1,40 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from typing import List, Optional
 from datetime import datetime
 from backend.database import get_db
+from backend.dependencies import get_current_user_info
+from backend.utils.pagination import paginate, set_next_cursor
 from backend.orm_models import Payslip, Employee, UserRole
 from backend.schemas import Payslip as PayslipSchema, UserInfo
-import boto3
 from backend.config import settings
+from backend.services.aws_clients import s3_client
 from backend.services.pdf_service import generate_payslip_pdf
 from backend.services.auth_service import get_current_user
 
 router = APIRouter()
 
-async def get_current_user_info(request: Request) -> UserInfo:
-    """Get current user info from request state"""
-    try:
-        user_info = request.state.user
-        if not user_info:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not authenticated"
-            )
-        return UserInfo(**user_info)
-    except AttributeError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not authenticated"
-        )
-
 @router.get("/", response_model=List[PayslipSchema])
 async def get_payslips(
+    response: Response,
     employee_id: Optional[int] = None,
     payroll_run_id: Optional[int] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     db: AsyncSession = Depends(get_db),
     current_user: UserInfo = Depends(get_current_user_info)
 ):
@@ -69,9 +57,10 @@ async def get_payslips(
     if conditions:
         query = query.where(and_(*conditions))
     
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, Payslip.id, limit, cursor=cursor, skip=skip)
     result = await db.execute(query)
     payslips = result.scalars().all()
+    set_next_cursor(response, payslips, limit)
     
     return payslips
 
@@ -136,12 +125,7 @@ async def download_payslip(
             detail="Payslip PDF not available"
         )
     # Generate fresh presigned URL
-    s3 = boto3.client(
-        "s3",
-        region_name=settings.S3_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    s3 = s3_client()
     # Extract bucket and key from the stored URL or config
     bucket = settings.S3_BUCKET_NAME
     # Assume pdf_url is the S3 key (path in bucket)
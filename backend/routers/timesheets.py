@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 from typing import List, Optional
 from datetime import datetime, timedelta
+from decimal import Decimal
 from backend.database import get_db
+from backend.dependencies import get_current_user_profile
+from backend.utils.pagination import paginate, set_next_cursor
 from backend.orm_models import Timesheet, Employee, UserRole, TimesheetStatus, TaxConfiguration
 from backend.schemas import (
     Timesheet as TimesheetSchema, 
@@ -13,26 +16,19 @@ from backend.schemas import (
     UserInfo
 )
 from backend.services.email_service import EmailService
-from backend.services.auth_service import get_current_user
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from backend.services.tax_service import TaxService
 from backend.services.payment_service import PaymentService
+from backend.services.ytd_wage_service import ytd_wage_service
+from backend.utils.helpers import round_currency
 
 router = APIRouter()
 email_service = EmailService()
-security = HTTPBearer()
-
-async def get_current_user_info(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserInfo:
-    """Get current user info from token"""
-    token = credentials.credentials
-    user_info = await get_current_user(token)
-    return UserInfo(**user_info)
 
 @router.post("/", response_model=TimesheetSchema)
 async def create_timesheet(
     timesheet: TimesheetCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Create a new timesheet"""
     # Determine employee_id based on role
@@ -95,13 +91,15 @@ async def create_timesheet(
 
 @router.get("/", response_model=List[TimesheetSchema])
 async def get_timesheets(
+    response: Response,
     employee_id: Optional[int] = None,
     week_start: Optional[str] = None,
     status: Optional[TimesheetStatus] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get timesheets list"""
     # Build query conditions
@@ -147,9 +145,10 @@ async def get_timesheets(
     if conditions:
         query = query.where(and_(*conditions))
     
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, Timesheet.id, limit, cursor=cursor, skip=skip)
     result = await db.execute(query)
     timesheets = result.scalars().all()
+    set_next_cursor(response, timesheets, limit)
     
     return timesheets
 
@@ -157,7 +156,7 @@ async def get_timesheets(
 async def get_timesheet(
     timesheet_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Get timesheet by ID"""
     result = await db.execute(select(Timesheet).where(Timesheet.id == timesheet_id))
@@ -188,7 +187,7 @@ async def update_timesheet(
     timesheet_id: int,
     timesheet_update: TimesheetUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Update timesheet"""
     result = await db.execute(select(Timesheet).where(Timesheet.id == timesheet_id))
@@ -233,7 +232,7 @@ async def update_timesheet(
 async def approve_timesheet(
     timesheet_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Approve timesheet (Admin/Manager only)"""
     if UserRole.ADMIN.value not in current_user.groups:
@@ -257,7 +256,12 @@ async def approve_timesheet(
             detail="Can only approve pending timesheets"
         )
     
+    approver_result = await db.execute(select(Employee.id).where(Employee.cognito_sub == current_user.sub))
+    
     timesheet.status = TimesheetStatus.APPROVED
+    timesheet.approved_by = approver_result.scalar_one_or_none()
+    # Payroll recomputation picks up approvals made after a run was processed
+    timesheet.approved_at = datetime.utcnow()
     await db.commit()
     await db.refresh(timesheet)
     
@@ -267,7 +271,7 @@ async def approve_timesheet(
 async def delete_timesheet(
     timesheet_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     """Delete timesheet"""
     result = await db.execute(select(Timesheet).where(Timesheet.id == timesheet_id))
@@ -308,7 +312,7 @@ async def delete_timesheet(
 async def calculate_taxes_for_timesheet(
     timesheet_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     result = await db.execute(select(Timesheet).where(Timesheet.id == timesheet_id))
     timesheet = result.scalar_one_or_none()
@@ -330,15 +334,23 @@ async def calculate_taxes_for_timesheet(
         gross_pay = employee.base_salary / 52
     else:
         raise HTTPException(status_code=400, detail="Employee pay rate not set")
+    # Rounded to cents as in batch payroll, so both paths add the same amounts to YTD wages
+    gross_pay = round_currency(gross_pay)
+    tax_year = timesheet.week_end_date.year
+    ytd_wages = await ytd_wage_service.load(db, [employee.id], tax_year)
     tax_service = TaxService()
-    taxes = tax_service.calculate_taxes(gross_pay, tax_config, employee)
+    taxes = tax_service.calculate_taxes(
+        gross_pay, tax_config, employee,
+        ytd_gross=ytd_wages.get(employee.id, Decimal('0')),
+        tax_year=tax_year
+    )
     return taxes
 
 @router.post("/{timesheet_id}/pay")
 async def pay_timesheet(
     timesheet_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserInfo = Depends(get_current_user_info)
+    current_user: UserInfo = Depends(get_current_user_profile)
 ):
     # Only admin/manager can pay
     if UserRole.ADMIN.value not in current_user.groups and UserRole.MANAGER.value not in current_user.groups:
@@ -362,9 +374,21 @@ async def pay_timesheet(
         gross_pay = employee.base_salary / 52
     else:
         raise HTTPException(status_code=400, detail="Employee pay rate not set")
+    # Rounded to cents as in batch payroll, so both paths add the same amounts to YTD wages
+    gross_pay = round_currency(gross_pay)
+    tax_year = timesheet.week_end_date.year
+    ytd_wages = await ytd_wage_service.load(db, [employee.id], tax_year)
     tax_service = TaxService()
-    taxes = tax_service.calculate_taxes(gross_pay, tax_config, employee)
+    taxes = tax_service.calculate_taxes(
+        gross_pay, tax_config, employee,
+        ytd_gross=ytd_wages.get(employee.id, Decimal('0')),
+        tax_year=tax_year
+    )
     net_pay = taxes['net_pay']
     payment_service = PaymentService()
     payment_result = await payment_service.send_payment_via_plaid(net_pay, employee.id, f"Timesheet {timesheet_id} payment", db)
+    if payment_result['status'] != 'failed':
+        # Only once Plaid has taken the payment, so no YTD row lock is held across the Plaid call
+        await ytd_wage_service.add(db, tax_year, {employee.id: gross_pay})
+        await db.commit()
     return payment_result 
\ No newline at end of file
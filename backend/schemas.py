@@ -173,6 +173,7 @@ class PayrollRun(PayrollRunBase):
     total_taxes: Decimal
     processed_by: Optional[int] = None
     processed_at: Optional[datetime] = None
+    recomputed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -199,6 +200,7 @@ class Payslip(PayslipBase):
     id: int
     employee_id: int
     payroll_run_id: int
+    is_adjustment: bool = False
     payment_status: PaymentStatus
     payment_method: Optional[str] = None
     payment_reference: Optional[str] = None
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script to add the Plaid payment recipient columns to the bank_accounts table.
+Existing accounts start without a recipient; one is created and stored on their next payment.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine
+from sqlalchemy import text
+
+async def add_recipient_columns():
+    """Add the recipient columns to the bank_accounts table"""
+    
+    columns_to_add = [
+        ("plaid_recipient_id", "VARCHAR(255)"),
+        ("plaid_recipient_fingerprint", "VARCHAR(64)")
+    ]
+    
+    async with engine.begin() as conn:
+        for column_name, column_definition in columns_to_add:
+            try:
+                # Check if column already exists
+                result = await conn.execute(text(f"""
+                    SELECT COUNT(*) 
+                    FROM INFORMATION_SCHEMA.COLUMNS 
+                    WHERE TABLE_SCHEMA = DATABASE() 
+                    AND TABLE_NAME = 'bank_accounts' 
+                    AND COLUMN_NAME = '{column_name}'
+                """))
+                
+                count = result.scalar()
+                
+                if count == 0:
+                    print(f"Adding column: {column_name}")
+                    await conn.execute(text(f"ALTER TABLE bank_accounts ADD COLUMN {column_name} {column_definition}"))
+                    print(f"✓ Added column: {column_name}")
+                else:
+                    print(f"✓ Column {column_name} already exists")
+                    
+            except Exception as e:
+                print(f"✗ Error adding column {column_name}: {e}")
+                continue
+
+async def main():
+    """Main function"""
+    print("Adding Plaid recipient columns to bank_accounts table...")
+    await add_recipient_columns()
+    print("Done!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
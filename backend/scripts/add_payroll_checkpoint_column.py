@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script to add the checkpoint column to the payroll_runs table.
+Existing runs have no checkpoint, so reprocessing one starts from its first employee.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine
+from sqlalchemy import text
+
+async def add_checkpoint_column():
+    """Add the checkpoint column to the payroll_runs table"""
+    
+    columns_to_add = [
+        ("checkpoint_employee_id", "INT")
+    ]
+    
+    async with engine.begin() as conn:
+        for column_name, column_definition in columns_to_add:
+            try:
+                # Check if column already exists
+                result = await conn.execute(text(f"""
+                    SELECT COUNT(*) 
+                    FROM INFORMATION_SCHEMA.COLUMNS 
+                    WHERE TABLE_SCHEMA = DATABASE() 
+                    AND TABLE_NAME = 'payroll_runs' 
+                    AND COLUMN_NAME = '{column_name}'
+                """))
+                
+                count = result.scalar()
+                
+                if count == 0:
+                    print(f"Adding column: {column_name}")
+                    await conn.execute(text(f"ALTER TABLE payroll_runs ADD COLUMN {column_name} {column_definition}"))
+                    print(f"✓ Added column: {column_name}")
+                else:
+                    print(f"✓ Column {column_name} already exists")
+                    
+            except Exception as e:
+                print(f"✗ Error adding column {column_name}: {e}")
+                continue
+
+async def main():
+    """Main function"""
+    print("Adding checkpoint column to payroll_runs table...")
+    await add_checkpoint_column()
+    print("Done!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
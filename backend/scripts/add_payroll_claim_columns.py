@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script to add the claim tokens that fence payroll workers off from each other.
+Existing jobs and runs have no claim; the next claim of a job sets both.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine
+from sqlalchemy import text
+
+async def add_claim_columns():
+    """Add claim_token to payroll_jobs and payroll_runs"""
+    
+    columns_to_add = [
+        ("payroll_jobs", "claim_token", "VARCHAR(64)"),
+        ("payroll_runs", "claim_token", "VARCHAR(64)")
+    ]
+    
+    async with engine.begin() as conn:
+        for table_name, column_name, column_definition in columns_to_add:
+            try:
+                # Check if column already exists
+                result = await conn.execute(text(f"""
+                    SELECT COUNT(*) 
+                    FROM INFORMATION_SCHEMA.COLUMNS 
+                    WHERE TABLE_SCHEMA = DATABASE() 
+                    AND TABLE_NAME = '{table_name}' 
+                    AND COLUMN_NAME = '{column_name}'
+                """))
+                
+                count = result.scalar()
+                
+                if count == 0:
+                    print(f"Adding column: {column_name}")
+                    await conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}"))
+                    print(f"✓ Added column: {column_name}")
+                else:
+                    print(f"✓ Column {column_name} already exists")
+                    
+            except Exception as e:
+                print(f"✗ Error adding column {column_name}: {e}")
+                continue
+
+async def main():
+    """Main function"""
+    print("Adding payroll claim columns...")
+    await add_claim_columns()
+    print("Done!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
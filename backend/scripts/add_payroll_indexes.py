@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script to add the composite indexes declared on the models to an existing database.
+create_all only creates indexes together with new tables, so databases created before the
+indexes were declared need this once. Building an index on a large table takes a while;
+InnoDB builds them online, so reads and writes continue meanwhile.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine
+from backend.orm_models import Employee, Timesheet, PayrollRun, Payslip, PayrollOutboxEvent
+from sqlalchemy import text
+
+async def add_payroll_indexes():
+    """Create each model-declared composite index that the database does not have yet"""
+
+    indexes_to_add = [
+        index
+        for model in (Employee, Timesheet, PayrollRun, Payslip, PayrollOutboxEvent)
+        for index in model.__table__.indexes
+        if len(index.columns) > 1
+    ]
+
+    async with engine.begin() as conn:
+        for index in indexes_to_add:
+            table_name = index.table.name
+            try:
+                # Check if index already exists
+                result = await conn.execute(text(f"""
+                    SELECT COUNT(*)
+                    FROM INFORMATION_SCHEMA.STATISTICS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                    AND TABLE_NAME = '{table_name}'
+                    AND INDEX_NAME = '{index.name}'
+                """))
+
+                count = result.scalar()
+
+                if count == 0:
+                    print(f"Adding index: {index.name} on {table_name}")
+                    await conn.run_sync(index.create)
+                    print(f"✓ Added index: {index.name}")
+                else:
+                    print(f"✓ Index {index.name} already exists")
+
+            except Exception as e:
+                print(f"✗ Error adding index {index.name}: {e}")
+                continue
+
+async def main():
+    """Main function"""
+    print("Adding payroll indexes...")
+    await add_payroll_indexes()
+    print("Done!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script to add the columns used by incremental payroll recomputation.
+Existing payslips are regular payslips, and existing runs have never been recomputed.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine
+from sqlalchemy import text
+
+async def add_recompute_columns():
+    """Add the adjustment flag to payslips and the recompute watermark to payroll_runs"""
+    
+    columns_to_add = [
+        ("payslips", "is_adjustment", "BOOLEAN NOT NULL DEFAULT FALSE"),
+        ("payroll_runs", "recomputed_at", "DATETIME")
+    ]
+    
+    async with engine.begin() as conn:
+        for table_name, column_name, column_definition in columns_to_add:
+            try:
+                # Check if column already exists
+                result = await conn.execute(text(f"""
+                    SELECT COUNT(*) 
+                    FROM INFORMATION_SCHEMA.COLUMNS 
+                    WHERE TABLE_SCHEMA = DATABASE() 
+                    AND TABLE_NAME = '{table_name}' 
+                    AND COLUMN_NAME = '{column_name}'
+                """))
+                
+                count = result.scalar()
+                
+                if count == 0:
+                    print(f"Adding column: {column_name}")
+                    await conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}"))
+                    print(f"✓ Added column: {column_name}")
+                else:
+                    print(f"✓ Column {column_name} already exists")
+                    
+            except Exception as e:
+                print(f"✗ Error adding column {column_name}: {e}")
+                continue
+
+async def main():
+    """Main function"""
+    print("Adding payroll recompute columns...")
+    await add_recompute_columns()
+    print("Done!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the employee_ytd_wages table from existing payslips.
+Run it once after deploying year-to-date wage tracking (for the current tax year, and the
+previous one if its payroll is not finished), or any time the totals need to be repaired.
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine, AsyncSessionLocal
+from backend.orm_models import EmployeeYTDWages, Payslip
+from backend.services.ytd_wage_service import ytd_wage_service
+from sqlalchemy import select, func, and_
+
+async def backfill_ytd_wages(tax_year: int):
+    """Set each employee's YTD gross wages to the sum of their payslips dated in tax_year"""
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: EmployeeYTDWages.__table__.create(sync_conn, checkfirst=True))
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Payslip.employee_id, func.sum(Payslip.gross_pay))
+            .where(
+                and_(
+                    Payslip.pay_date >= datetime(tax_year, 1, 1),
+                    Payslip.pay_date < datetime(tax_year + 1, 1, 1)
+                )
+            )
+            .group_by(Payslip.employee_id)
+        )
+        wages = {employee_id: gross_wages for employee_id, gross_wages in result.all()}
+
+        await ytd_wage_service.set(db, tax_year, wages)
+        await db.commit()
+
+    print(f"✓ Set {tax_year} YTD wages for {len(wages)} employees")
+
+async def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Rebuild year-to-date wages from payslips")
+    parser.add_argument("--year", type=int, default=datetime.utcnow().year, help="Tax year to rebuild")
+    args = parser.parse_args()
+
+    print(f"Backfilling YTD wages for {args.year}...")
+    await backfill_ytd_wages(args.year)
+    print("Done!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for payslip PDF rendering.
+Compares payslips/second when the ReportLab styles are rebuilt for every payslip (the old
+behaviour) against the shared PayslipTemplate, and the throughput of the process pool.
+
+Usage: python -m backend.scripts.benchmark_payslip_pdf --count 500 --pool
+"""
+
+import asyncio
+import sys
+import os
+import time
+import argparse
+from datetime import datetime
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.pdf_service import PDFService, PayslipTemplate, render_payslip_pdf, shutdown_render_pool
+
+def make_snapshot(index: int) -> dict:
+    """Build a representative payslip snapshot"""
+    return {
+        'payslip': {
+            'id': index,
+            'pay_period_start': datetime(2024, 1, 1),
+            'pay_period_end': datetime(2024, 1, 14),
+            'pay_date': datetime(2024, 1, 19),
+            'regular_hours': Decimal('80.00'),
+            'overtime_hours': Decimal('4.50'),
+            'regular_pay': Decimal('2400.00'),
+            'overtime_pay': Decimal('202.50'),
+            'gross_pay': Decimal('2602.50'),
+            'federal_tax': Decimal('572.55'),
+            'state_tax': Decimal('130.13'),
+            'social_security': Decimal('161.36'),
+            'medicare': Decimal('37.74'),
+            'total_deductions': Decimal('901.78'),
+            'net_pay': Decimal('1700.72'),
+        },
+        'employee': {
+            'id': index,
+            'employee_id': f"EMP{index:06d}",
+            'first_name': "Jane",
+            'last_name': f"Doe {index}",
+            'email': f"jane.doe{index}@example.com",
+            'department': "Engineering",
+            'position': "Developer",
+        },
+    }
+
+def run_benchmark(label: str, render, snapshots) -> float:
+    """Render all snapshots serially and print payslips/second"""
+    start = time.perf_counter()
+    for snapshot in snapshots:
+        render(snapshot)
+    elapsed = time.perf_counter() - start
+    rate = len(snapshots) / elapsed
+    print(f"{label:<32} {len(snapshots):>6} payslips in {elapsed:7.2f}s  ->  {rate:8.1f} payslips/s")
+    return rate
+
+async def run_pool_benchmark(snapshots) -> float:
+    """Render all snapshots through PDFService's process pool and print payslips/second"""
+    service = PDFService()
+    # Warm up the worker processes so their start-up is not measured
+    await service.render_payslip_pdfs(snapshots[:1])
+    start = time.perf_counter()
+    await service.render_payslip_pdfs(snapshots)
+    elapsed = time.perf_counter() - start
+    rate = len(snapshots) / elapsed
+    print(f"{'process pool (cached template)':<32} {len(snapshots):>6} payslips in {elapsed:7.2f}s  ->  {rate:8.1f} payslips/s")
+    return rate
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark payslip PDF rendering")
+    parser.add_argument("--count", type=int, default=500, help="number of payslips to render")
+    parser.add_argument("--pool", action="store_true", help="also benchmark the process pool")
+    args = parser.parse_args()
+
+    snapshots = [make_snapshot(index) for index in range(args.count)]
+
+    # Warm up ReportLab's font and module caches
+    render_payslip_pdf(snapshots[0])
+
+    before = run_benchmark("styles rebuilt per payslip", lambda snapshot: PayslipTemplate().render(snapshot), snapshots)
+    after = run_benchmark("cached template", render_payslip_pdf, snapshots)
+    print(f"Speed-up from the cached template: {after / before:.2f}x")
+
+    if args.pool:
+        asyncio.run(run_pool_benchmark(snapshots))
+        shutdown_render_pool()
+
+if __name__ == "__main__":
+    main()
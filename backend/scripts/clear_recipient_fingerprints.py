@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Script to remove the unkeyed Plaid recipient fingerprints stored before they became HMACs.
+Those plain SHA-256 hashes include the account and routing numbers and can be brute-forced,
+so they must not stay in the database. Clearing them only means each bank account gets a new
+Plaid recipient (with a keyed fingerprint) on its next payment. Run once after deploying.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine
+from sqlalchemy import text
+
+async def clear_recipient_fingerprints():
+    """Forget every stored recipient fingerprint"""
+    async with engine.begin() as conn:
+        result = await conn.execute(text("""
+            UPDATE bank_accounts
+            SET plaid_recipient_fingerprint = NULL
+            WHERE plaid_recipient_fingerprint IS NOT NULL
+        """))
+        print(f"✓ Cleared {result.rowcount} recipient fingerprints")
+
+async def main():
+    """Main function"""
+    print("Clearing unkeyed recipient fingerprints...")
+    await clear_recipient_fingerprints()
+    print("Done!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Report what importing the application costs, module by module.
+Runs the import in a fresh interpreter with `python -X importtime` (so nothing is cached from
+this process) and lists the slowest modules by cumulative time, i.e. including everything
+they import. Use it to keep cold start (new gunicorn workers, autoscaling, tests) fast: SDKs
+that are only needed by some requests should be imported on first use, not at module level.
+
+Usage: python -m backend.scripts.profile_imports --module backend.main --top 25
+       python -m backend.scripts.profile_imports --backend-only --max-ms 1500
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def measure_imports(module: str) -> List[ImportTime]:
+    """Import a module in a new interpreter and parse its -X importtime report"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PACKAGE_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        # "import time:       255 |     661076 |   fastapi"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append(ImportTime(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(name) - len(name.lstrip()) - 1) // 2
+        ))
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time per module")
+    parser.add_argument("--module", default="backend.main", help="module to import (default: backend.main)")
+    parser.add_argument("--top", type=int, default=25, help="number of modules to list")
+    parser.add_argument("--backend-only", action="store_true", help="list only the application's own modules")
+    parser.add_argument("--max-ms", type=float, help="exit with status 1 if the total import takes longer")
+    args = parser.parse_args()
+
+    timings = measure_imports(args.module)
+    total_us = max((timing.cumulative_us for timing in timings if timing.module == args.module), default=0)
+
+    listed = [timing for timing in timings if timing.module != args.module]
+    if args.backend_only:
+        listed = [timing for timing in listed if timing.module.startswith("backend.")]
+    listed.sort(key=lambda timing: timing.cumulative_us, reverse=True)
+
+    print(f"Importing {args.module} took {total_us / 1000:.1f} ms ({len(timings)} modules)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in listed[:args.top]:
+        print(f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  {'  ' * timing.depth}{timing.module}")
+
+    if args.max_ms is not None and total_us / 1000 > args.max_ms:
+        print(f"Import time exceeds the {args.max_ms:.0f} ms budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Standalone payroll worker.
+Runs queued payroll jobs and drains the payroll outbox (PDFs, emails, payments) outside the
+API process. Start as many as needed; workers claim work with SKIP LOCKED and never share a job.
+Set PAYROLL_WORKER_ENABLED / OUTBOX_WORKER_ENABLED to false on the API servers to leave all
+work to these processes.
+
+Usage: python -m backend.scripts.run_payroll_worker [--no-jobs] [--no-outbox]
+"""
+
+import asyncio
+import sys
+import os
+import argparse
+import logging
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.payroll_job_service import payroll_job_service
+from backend.services.outbox_service import outbox_service
+
+async def main(run_jobs: bool, run_outbox: bool):
+    """Main function"""
+    workers = []
+    if run_jobs:
+        print("Starting payroll job worker...")
+        workers.append(payroll_job_service.run_worker())
+    if run_outbox:
+        print("Starting payroll outbox worker...")
+        workers.append(outbox_service.run_worker())
+    if not workers:
+        print("Nothing to run")
+        return
+    await asyncio.gather(*workers)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run payroll background workers")
+    parser.add_argument("--no-jobs", action="store_true", help="don't run queued payroll jobs")
+    parser.add_argument("--no-outbox", action="store_true", help="don't drain the payroll outbox")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main(not args.no_jobs, not args.no_outbox))
+    except KeyboardInterrupt:
+        print("Stopped")
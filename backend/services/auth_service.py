@@ -1,10 +1,9 @@
-import boto3
 import jwt
-import requests
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
 from backend.config import settings
-import json
+from backend.services.aws_clients import aws_executor, cognito_client
+from backend.services.jwks_service import JWKSKeyStore
 
 class CognitoService:
     def __init__(self):
@@ -13,29 +12,21 @@ class CognitoService:
         self.client_id = settings.COGNITO_CLIENT_ID
         self.client_secret = settings.COGNITO_CLIENT_SECRET
         
-        # Initialize Cognito client
-        self.cognito_client = boto3.client(
-            'cognito-idp',
-            region_name=self.region,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
-        
-        # Get JWKs for token verification
+        # Signing keys for token verification, loaded in the background
         self.jwks_url = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
-        self.jwks = self._get_jwks()
+        self.jwks = JWKSKeyStore(
+            self.jwks_url,
+            ttl=settings.JWKS_CACHE_TTL_SECONDS,
+            min_refresh=settings.JWKS_MIN_REFRESH_SECONDS,
+            timeout=settings.JWKS_TIMEOUT_SECONDS
+        )
     
-    def _get_jwks(self) -> Dict[str, Any]:
-        """Get JSON Web Key Set from Cognito"""
-        try:
-            response = requests.get(self.jwks_url)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching JWKS: {e}")
-            return {"keys": []}
+    @property
+    def cognito_client(self):
+        """Shared Cognito client, created on first use so importing this module stays cheap"""
+        return cognito_client()
     
-    def verify_token(self, token: str) -> Dict[str, Any]:
+    async def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify JWT token and return claims"""
         try:
             # Decode header to get kid
@@ -43,11 +34,7 @@ class CognitoService:
             kid = header.get('kid')
             
             # Find the correct key
-            key = None
-            for jwk in self.jwks.get('keys', []):
-                if jwk.get('kid') == kid:
-                    key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(jwk))
-                    break
+            key = await self.jwks.get_key(kid)
             
             if not key:
                 raise HTTPException(
@@ -70,8 +57,8 @@ class CognitoService:
                 'email': payload.get('email', ''),
                 'given_name': payload.get('given_name', ''),
                 'family_name': payload.get('family_name', ''),
-                'groups': payload.get('groups', []),
-                'org_id': payload.get('org_id', None)
+                'groups': [group.lower() for group in payload.get('cognito:groups', payload.get('groups', []))],
+                'org_id': payload.get('custom:org_id', payload.get('org_id', None))
             }
             return user_info
             
@@ -175,8 +162,8 @@ cognito_service = CognitoService()
 
 async def verify_token(token: str) -> Dict[str, Any]:
     """Verify token and return user info"""
-    return cognito_service.verify_token(token)
+    return await cognito_service.verify_token(token)
 
 async def get_current_user(token: str) -> Dict[str, Any]:
     """Get current user information"""
-    return cognito_service.get_user_info(token)
+    return await aws_executor.run(cognito_service.get_user_info, token)
@@ -0,0 +1,70 @@
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+from backend.config import settings
+from backend.utils.executors import BlockingExecutor
+
+logger = logging.getLogger(__name__)
+
+# One client per (service, region); botocore clients are thread-safe once created
+_clients: Dict[Tuple[str, str], Any] = {}
+_clients_lock = threading.Lock()
+
+# Thread pool for blocking AWS calls, so they never run on the event loop. It sets no timeout
+# of its own: abandoning a call that botocore is still retrying would report a failure for a
+# Cognito user or group change that may yet succeed, so the clients' connect and read
+# timeouts bound each call instead.
+aws_executor = BlockingExecutor("aws", settings.AWS_MAX_WORKERS)
+
+def get_client(service_name: str, region_name: Optional[str] = None):
+    """Shared boto3 client for a service and region, created on first use.
+
+    Credential resolution, endpoint loading and the connection pool are paid once per
+    process instead of once per request; the pool is sized for the AWS executor's threads.
+    boto3 itself is imported here, so processes that never call AWS do not load it.
+    """
+    region_name = region_name or settings.S3_REGION
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                import boto3
+                from botocore.config import Config
+
+                # Sessions are not thread-safe, so each client is built from its own under the lock
+                session = boto3.session.Session(
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=region_name
+                )
+                client = session.client(
+                    service_name,
+                    config=Config(
+                        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+                        connect_timeout=settings.AWS_CONNECT_TIMEOUT_SECONDS,
+                        read_timeout=settings.AWS_READ_TIMEOUT_SECONDS,
+                        retries={'max_attempts': 3, 'mode': 'standard'}
+                    )
+                )
+                _clients[key] = client
+    return client
+
+def cognito_client():
+    """Shared Cognito Identity Provider client for the user pool's region"""
+    return get_client('cognito-idp', settings.COGNITO_REGION)
+
+def s3_client():
+    """Shared S3 client for the payslip bucket's region"""
+    return get_client('s3', settings.S3_REGION)
+
+def warm_up_aws_clients():
+    """Create the clients the application uses (called on startup, off the event loop)"""
+    cognito_client()
+    s3_client()
+    logger.info(f"Created {len(_clients)} AWS clients")
+
+def shutdown_aws_clients():
+    """Stop the AWS executor's threads (called on application shutdown; restarted on next use)"""
+    aws_executor.shutdown()
@@ -1,23 +1,22 @@
-import boto3
 import gzip
 import json
 from datetime import datetime
 from typing import Dict, Any
 from backend.config import settings
+from backend.services.aws_clients import s3_client
 import logging
 
 logger = logging.getLogger(__name__)
 
 class BackupService:
     def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.S3_REGION
-        )
         self.backup_bucket = f"{settings.S3_BUCKET_NAME}-backups"
     
+    @property
+    def s3_client(self):
+        """Shared S3 client, created on first backup"""
+        return s3_client()
+    
     async def backup_payroll_data(self, payroll_run_id: int, data: Dict[str, Any]):
         """Backup payroll data to S3"""
         try:
@@ -0,0 +1,109 @@
+import numpy as np
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Union
+from backend.orm_models import TaxConfiguration
+from backend.services.tax_brackets import federal_brackets
+from backend.services.tax_service import ADDITIONAL_MEDICARE_THRESHOLD, ADDITIONAL_MEDICARE_RATE
+
+# Tax rates are DECIMAL(5, 4) columns, so every rate is a whole number of 1/10000ths
+RATE_SCALE = 10000
+
+# Rates as integers (scalars, or one per row for runs that mix organizations)
+RateArg = Union[int, np.ndarray]
+
+def to_cents(amount: Decimal) -> int:
+    """Whole cents of an amount that is already rounded to cents"""
+    cents = amount * 100
+    if cents != cents.to_integral_value():
+        raise ValueError(f"{amount} is not a whole number of cents")
+    return int(cents)
+
+def from_cents(cents: int) -> Decimal:
+    """Decimal dollars from whole cents"""
+    return Decimal(int(cents)).scaleb(-2)
+
+def rate_units(rate: Decimal) -> int:
+    """A tax rate in 1/10000ths; rejects rates the DECIMAL(5, 4) columns could not hold"""
+    units = Decimal(rate) * RATE_SCALE
+    if units != units.to_integral_value():
+        raise ValueError(f"Tax rate {rate} has more than 4 decimal places")
+    return int(units)
+
+def round_half_even(values: np.ndarray, divisor: int) -> np.ndarray:
+    """Integer division rounding halves to even, like Decimal.quantize under the default context"""
+    quotient, remainder = np.divmod(values, divisor)
+    half = divisor // 2
+    round_up = (remainder > half) | ((remainder == half) & (quotient % 2 == 1))
+    return quotient + round_up
+
+class BatchTaxService:
+    """Columnar equivalent of TaxService.calculate_taxes over int64 cents.
+
+    Products of cents and 1/10000th rates are exact integers in millionths of a dollar,
+    so each amount is rounded exactly once, half to even, just as the Decimal version
+    quantizes its exact products. The results are identical to TaxService for every gross
+    amount that is a whole number of cents.
+    """
+
+    def calculate_taxes(
+        self,
+        gross_cents: np.ndarray,
+        federal_rate: RateArg,
+        state_rate: RateArg,
+        social_security_rate: RateArg,
+        medicare_rate: RateArg,
+        ytd_gross_cents: Optional[np.ndarray] = None,
+        tax_year: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Calculate all tax deductions for arrays of gross pay; rates are in 1/10000ths.
+
+        ytd_gross_cents holds each employee's earlier gross pay in tax_year (zero if omitted),
+        the calendar year of the pay date (the current year if not given).
+        """
+        gross = np.asarray(gross_cents, dtype=np.int64)
+        ytd = np.zeros_like(gross) if ytd_gross_cents is None else np.asarray(ytd_gross_cents, dtype=np.int64)
+
+        # Exact amounts in millionths of a dollar (cents x 1/10000ths)
+        federal_tax = gross * federal_rate
+        state_tax = gross * state_rate
+        wage_base = to_cents(federal_brackets.social_security_wage_base(tax_year or datetime.utcnow().year))
+        social_security_wages = np.maximum(np.minimum(gross, wage_base - ytd), 0)
+        social_security = social_security_wages * social_security_rate
+
+        medicare = gross * medicare_rate
+        additional_medicare_wages = np.maximum(
+            ytd + gross - np.maximum(ytd, to_cents(ADDITIONAL_MEDICARE_THRESHOLD)), 0
+        )
+        medicare = medicare + additional_medicare_wages * rate_units(ADDITIONAL_MEDICARE_RATE)
+
+        # As in TaxService, totals are rounded from the exact sums, not summed from rounded parts
+        total_deductions = federal_tax + state_tax + social_security + medicare
+        net_pay = gross * RATE_SCALE - total_deductions
+
+        return {
+            'federal_tax': round_half_even(federal_tax, RATE_SCALE),
+            'state_tax': round_half_even(state_tax, RATE_SCALE),
+            'social_security': round_half_even(social_security, RATE_SCALE),
+            'medicare': round_half_even(medicare, RATE_SCALE),
+            'total_deductions': round_half_even(total_deductions, RATE_SCALE),
+            'net_pay': round_half_even(net_pay, RATE_SCALE)
+        }
+
+    def calculate_taxes_for_config(
+        self,
+        gross_cents: np.ndarray,
+        tax_config: TaxConfiguration,
+        ytd_gross_cents: Optional[np.ndarray] = None,
+        tax_year: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Calculate taxes for one organization's employees (any object with the four rates)"""
+        return self.calculate_taxes(
+            gross_cents,
+            federal_rate=rate_units(tax_config.federal_tax_rate),
+            state_rate=rate_units(tax_config.state_tax_rate),
+            social_security_rate=rate_units(tax_config.social_security_rate),
+            medicare_rate=rate_units(tax_config.medicare_rate),
+            ytd_gross_cents=ytd_gross_cents,
+            tax_year=tax_year
+        )
@@ -1,16 +1,64 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from typing import Dict, List, Optional, Sequence
 from backend.config import settings
+from backend.services.smtp_pool import SMTPConnectionPool
+
+_smtp_pool: Optional[SMTPConnectionPool] = None
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Process-wide pool of authenticated SMTP sessions, created on first use"""
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPConnectionPool(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            size=settings.SMTP_POOL_SIZE,
+            starttls=settings.SMTP_STARTTLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+            max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        )
+    return _smtp_pool
+
+async def close_smtp_pool():
+    """Close the shared SMTP sessions (called on application shutdown)"""
+    global _smtp_pool
+    if _smtp_pool is not None:
+        await _smtp_pool.close()
+        _smtp_pool = None
 
 class EmailService:
-    def __init__(self):
-        self.smtp_host = settings.SMTP_HOST
-        self.smtp_port = settings.SMTP_PORT
-        self.smtp_user = settings.SMTP_USER
-        self.smtp_password = settings.SMTP_PASSWORD
+    def __init__(self, smtp_pool: Optional[SMTPConnectionPool] = None):
         self.from_email = settings.FROM_EMAIL
+        self._smtp_pool = smtp_pool
+    
+    @property
+    def smtp_pool(self) -> SMTPConnectionPool:
+        return self._smtp_pool or get_smtp_pool()
+    
+    def build_message(self, to_email: str, subject: str, body: str) -> MIMEMultipart:
+        """Build a plain-text email from the payroll sender"""
+        msg = MIMEMultipart()
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+        return msg
+    
+    async def send_email(self, to_email: str, subject: str, body: str):
+        """Send a plain-text email over a pooled SMTP session; raises on failure"""
+        await self.smtp_pool.send_message(self.build_message(to_email, subject, body))
+    
+    async def send_many(self, emails: Sequence[Dict[str, str]]) -> List[Optional[Exception]]:
+        """Send many emails (dicts with email, subject and body) over the pooled sessions.
+        
+        Returns one entry per email in input order: None if it was accepted, otherwise the error.
+        """
+        messages = [self.build_message(email['email'], email['subject'], email['body']) for email in emails]
+        return await self.smtp_pool.send_many(messages)
     
     async def send_payslip_notification(
         self,
@@ -18,13 +66,10 @@ class EmailService:
         employee_name: str,
         payslip_url: str,
         pay_date: datetime
-    ):
-        """Send payslip notification email"""
+    ) -> bool:
+        """Send payslip notification email; returns whether it was accepted"""
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = f"Payslip Available - {pay_date.strftime('%B %Y')}"
+            subject = f"Payslip Available - {pay_date.strftime('%B %Y')}"
             
             body = f"""
             Dear {employee_name},
@@ -42,18 +87,14 @@ class EmailService:
             Payroll Team
             """
             
-            msg.attach(MIMEText(body, 'plain'))
+            await self.send_email(to_email, subject, body)
             
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-                
             print(f"Payslip notification sent to {to_email}")
+            return True
             
         except Exception as e:
             print(f"Error sending email: {e}")
+            return False
     
     async def send_timesheet_approval_notification(
         self,
@@ -61,13 +102,10 @@ class EmailService:
         employee_name: str,
         week_start: datetime,
         status: str
-    ):
-        """Send timesheet approval notification"""
+    ) -> bool:
+        """Send timesheet approval notification; returns whether it was accepted"""
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = f"Timesheet {status.title()} - Week of {week_start.strftime('%B %d, %Y')}"
+            subject = f"Timesheet {status.title()} - Week of {week_start.strftime('%B %d, %Y')}"
             
             body = f"""
             Dear {employee_name},
@@ -80,18 +118,14 @@ class EmailService:
             Payroll Team
             """
             
-            msg.attach(MIMEText(body, 'plain'))
+            await self.send_email(to_email, subject, body)
             
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-                
             print(f"Timesheet notification sent to {to_email}")
+            return True
             
         except Exception as e:
             print(f"Error sending email: {e}")
+            return False
 
     async def send_welcome_email(
         self,
@@ -99,13 +133,10 @@ class EmailService:
         employee_name: str,
         temp_password: str,
         login_url: str = "http://localhost:3000/login"
-    ):
-        """Send welcome email with temporary password"""
+    ) -> bool:
+        """Send welcome email with temporary password; returns whether it was accepted"""
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = "Welcome to the Payroll System - Your Account Details"
+            subject = "Welcome to the Payroll System - Your Account Details"
             
             body = f"""
             Dear {employee_name},
@@ -132,15 +163,11 @@ class EmailService:
             Payroll Team
             """
             
-            msg.attach(MIMEText(body, 'plain'))
+            await self.send_email(to_email, subject, body)
             
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-                
             print(f"Welcome email sent to {to_email}")
+            return True
             
         except Exception as e:
-            print(f"Error sending welcome email: {e}")
\ No newline at end of file
+            print(f"Error sending welcome email: {e}")
+            return False
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import time
+import requests
+from typing import Any, Dict, Optional
+from jwt.algorithms import RSAAlgorithm
+
+logger = logging.getLogger(__name__)
+
+class JWKSKeyStore:
+    """Cognito signing keys, parsed once and cached by kid.
+
+    Keys are fetched in a worker thread, never on import or at startup. A cache older than
+    ttl is refreshed in the background while the keys in hand keep serving requests; a token
+    signed with an unknown kid (a key rotation) waits for one refresh, at most once every
+    min_refresh seconds so forged kids cannot hammer Cognito. Concurrent refreshes share a
+    single fetch, and a failed fetch keeps the previous keys.
+    """
+
+    def __init__(self, jwks_url: str, ttl: float, min_refresh: float, timeout: float):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self.timeout = timeout
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Begin loading the keys in the background (called on application startup)"""
+        self._schedule_refresh()
+
+    async def get_key(self, kid: Optional[str]) -> Optional[Any]:
+        """Public key for a kid, or None if Cognito does not publish it"""
+        key = self._keys.get(kid)
+        if key is not None:
+            if self._fetched_at is None or time.monotonic() - self._fetched_at > self.ttl:
+                self._schedule_refresh()
+            return key
+
+        if self._attempted_at is None or time.monotonic() - self._attempted_at >= self.min_refresh:
+            await self.refresh()
+        elif self._refresh_task is not None:
+            # A refresh is already under way (e.g. the startup load); wait for it instead
+            await asyncio.shield(self._refresh_task)
+        return self._keys.get(kid)
+
+    async def refresh(self):
+        """Fetch the key set now, joining a fetch that is already in flight"""
+        await asyncio.shield(self._schedule_refresh())
+
+    def _schedule_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._attempted_at = time.monotonic()
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def _refresh(self):
+        try:
+            jwks = await asyncio.to_thread(self._fetch)
+            keys = {
+                jwk['kid']: RSAAlgorithm.from_jwk(jwk)
+                for jwk in jwks.get('keys', [])
+                if jwk.get('kid')
+            }
+        except Exception as e:
+            logger.error(f"Error fetching JWKS: {e}")
+            return
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.info(f"Loaded {len(keys)} signing keys from {self.jwks_url}")
+
+    def _fetch(self) -> Dict[str, Any]:
+        response = requests.get(self.jwks_url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
@@ -1,13 +1,28 @@
-from typing import List, Dict, Any
+import asyncio
+import random
+import smtplib
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+from backend.config import settings
 from backend.services.email_service import EmailService
+from backend.utils.rate_limiter import TokenBucket
 import logging
 
 logger = logging.getLogger(__name__)
 
+def is_transient_email_error(error: Exception) -> bool:
+    """Whether a send failure is worth retrying (4xx replies, dropped connections, timeouts)"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError))
+
 class NotificationService:
     def __init__(self):
         self.email_service = EmailService()
+        # Shared by every bulk send so concurrent batches together respect the relay's limit
+        self.rate_limiter = TokenBucket(settings.NOTIFICATION_RATE_PER_SECOND)
     
     async def send_welcome_notification(self, employee_email: str, employee_name: str):
         """Send welcome notification to new employee"""
@@ -36,11 +51,12 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Failed to send welcome notification: {e}")
     
-    async def send_timesheet_reminder(self, employee_email: str, employee_name: str):
-        """Send timesheet submission reminder"""
-        try:
-            subject = "Timesheet Submission Reminder"
-            body = f"""
+    def build_timesheet_reminder(self, employee_email: str, employee_name: str) -> Dict[str, str]:
+        """Build the timesheet reminder for one employee"""
+        return {
+            'email': employee_email,
+            'subject': "Timesheet Submission Reminder",
+            'body': f"""
             Dear {employee_name},
             
             This is a reminder to submit your timesheet for this week.
@@ -52,13 +68,24 @@ class NotificationService:
             Best regards,
             Payroll Team
             """
-            
-            await self.email_service.send_email(employee_email, subject, body)
+        }
+    
+    async def send_timesheet_reminder(self, employee_email: str, employee_name: str):
+        """Send timesheet submission reminder"""
+        try:
+            reminder = self.build_timesheet_reminder(employee_email, employee_name)
+            await self.email_service.send_email(reminder['email'], reminder['subject'], reminder['body'])
             logger.info(f"Timesheet reminder sent to {employee_email}")
             
         except Exception as e:
             logger.error(f"Failed to send timesheet reminder: {e}")
     
+    async def send_timesheet_reminders(self, employees: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Send timesheet reminders to many employees (dicts with email and name)"""
+        return await self.send_bulk_notifications([
+            self.build_timesheet_reminder(employee['email'], employee['name']) for employee in employees
+        ])
+    
     async def send_payroll_processed_notification(
         self, 
         employee_email: str, 
@@ -89,14 +116,66 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Failed to send payroll notification: {e}")
     
-    async def send_bulk_notifications(self, notifications: List[Dict[str, Any]]):
-        """Send bulk notifications"""
-        for notification in notifications:
-            try:
-                await self.email_service.send_email(
-                    notification['email'],
-                    notification['subject'],
-                    notification['body']
-                )
-            except Exception as e:
-                logger.error(f"Failed to send notification to {notification['email']}: {e}")
+    async def send_bulk_notifications(
+        self,
+        notifications: List[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Send many notifications (dicts with email, subject and body) concurrently.
+        
+        At most `concurrency` sends are in flight and the shared token bucket paces them toward
+        the SMTP relay. Transient failures are retried with exponential backoff; recipients still
+        failing transiently after the last retry are reported as deferred, permanent (5xx)
+        failures as failed.
+        """
+        concurrency = concurrency or settings.NOTIFICATION_CONCURRENCY
+        max_retries = settings.NOTIFICATION_MAX_RETRIES if max_retries is None else max_retries
+        semaphore = asyncio.Semaphore(concurrency)
+        summary: Dict[str, Any] = {
+            'total': len(notifications),
+            'sent': 0,
+            'failed': 0,
+            'deferred': 0,
+            'failures': [],
+            'deferred_recipients': []
+        }
+        
+        async def send_one(notification: Dict[str, Any]):
+            attempt = 0
+            while True:
+                async with semaphore:
+                    await self.rate_limiter.acquire()
+                    try:
+                        await self.email_service.send_email(
+                            notification['email'],
+                            notification['subject'],
+                            notification['body']
+                        )
+                        summary['sent'] += 1
+                        return
+                    except Exception as e:
+                        error = e
+                
+                if not is_transient_email_error(error):
+                    logger.error(f"Failed to send notification to {notification['email']}: {error}")
+                    summary['failed'] += 1
+                    summary['failures'].append({'email': notification['email'], 'error': str(error)})
+                    return
+                if attempt >= max_retries:
+                    logger.warning(f"Deferred notification to {notification['email']} after {attempt + 1} attempts: {error}")
+                    summary['deferred'] += 1
+                    summary['deferred_recipients'].append({'email': notification['email'], 'error': str(error)})
+                    return
+                
+                # Back off outside the semaphore so other recipients keep flowing
+                delay = settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+                attempt += 1
+        
+        await asyncio.gather(*[send_one(notification) for notification in notifications])
+        logger.info(
+            f"Bulk notifications: {summary['sent']} sent, {summary['failed']} failed, "
+            f"{summary['deferred']} deferred of {summary['total']}"
+        )
+        return summary
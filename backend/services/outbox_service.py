@@ -0,0 +1,400 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Sequence, Optional, Set, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, or_, insert, update
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.orm_models import (
+    Employee, Payslip, PayrollOutboxEvent, OutboxEventType, OutboxStatus, PaymentStatus
+)
+from backend.services.pdf_service import PDFService
+from backend.services.email_service import EmailService
+from backend.services.payment_service import PaymentService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT when writing outbox events
+OUTBOX_INSERT_CHUNK_SIZE = 500
+
+class OutboxService:
+    """Transactional outbox for payroll side effects.
+
+    Payroll writes outbox events in the same transaction as the payslips they refer to;
+    the worker drains them afterwards with bounded concurrency per event type, so slow
+    PDF rendering, SMTP or Plaid calls never hold up the payroll calculation.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.pdf_service = PDFService()
+        self.email_service = EmailService()
+        self.payment_service = PaymentService()
+        self.concurrency = {
+            OutboxEventType.PAYSLIP_PDF: settings.OUTBOX_PDF_CONCURRENCY,
+            OutboxEventType.PAYSLIP_EMAIL: settings.OUTBOX_EMAIL_CONCURRENCY,
+            OutboxEventType.PAYMENT: settings.OUTBOX_PAYMENT_CONCURRENCY,
+        }
+        self.handlers = {
+            OutboxEventType.PAYSLIP_EMAIL: self._handle_payslip_email,
+        }
+        # Event types processed a whole claimed batch at a time
+        self.batch_handlers = {
+            OutboxEventType.PAYSLIP_PDF: self._handle_payslip_pdf_batch,
+            OutboxEventType.PAYMENT: self._handle_payment_batch,
+        }
+        self._worker_task: Optional[asyncio.Task] = None
+        self._last_status_refresh = 0.0
+
+    async def enqueue(self, db: AsyncSession, events: Sequence[Dict[str, Any]]):
+        """Add outbox events to the caller's transaction.
+
+        Each event is a dict with payroll_run_id, payslip_id and event_type. Nothing is
+        committed here, so the events become visible together with the rows they describe.
+        available_at is set from the application clock, the same clock claims compare it with.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                'payroll_run_id': event['payroll_run_id'],
+                'payslip_id': event['payslip_id'],
+                'event_type': event['event_type'],
+                'status': OutboxStatus.PENDING,
+                'attempts': 0,
+                'available_at': now,
+            }
+            for event in events
+        ]
+        for start in range(0, len(rows), OUTBOX_INSERT_CHUNK_SIZE):
+            await db.execute(insert(PayrollOutboxEvent).values(rows[start:start + OUTBOX_INSERT_CHUNK_SIZE]))
+
+    async def drain(self, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """Process pending events of every type until none are left; returns processed counts per type"""
+        batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        event_types = list(self.concurrency)
+        counts = await asyncio.gather(*[
+            self._drain_event_type(event_type, batch_size) for event_type in event_types
+        ])
+        return {event_type.value: count for event_type, count in zip(event_types, counts)}
+
+    async def run_worker(self, poll_interval: Optional[float] = None):
+        """Drain the outbox forever, sleeping between polls when it is empty"""
+        poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL_SECONDS
+        while True:
+            try:
+                counts = await self.drain()
+                if time.monotonic() - self._last_status_refresh >= settings.PAYMENT_STATUS_REFRESH_SECONDS:
+                    self._last_status_refresh = time.monotonic()
+                    await self.refresh_payment_statuses()
+                if not any(counts.values()):
+                    await asyncio.sleep(poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox worker error: {e}")
+                await asyncio.sleep(poll_interval)
+
+    def start_worker(self):
+        """Start the background worker on the running event loop"""
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self.run_worker())
+
+    async def stop_worker(self):
+        """Cancel the background worker and wait for it to exit"""
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
+    async def refresh_payment_statuses(self, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """Poll Plaid for payments that were submitted but have not settled yet"""
+        batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Payslip)
+                .where(
+                    and_(
+                        Payslip.payment_status == PaymentStatus.PROCESSING,
+                        Payslip.payment_reference.isnot(None)
+                    )
+                )
+                .order_by(Payslip.id)
+                .limit(batch_size)
+            )
+            counts = await self.payment_service.refresh_batch_status(
+                result.scalars().all(),
+                concurrency=self.concurrency[OutboxEventType.PAYMENT]
+            )
+            await db.commit()
+        return counts
+
+    async def _drain_event_type(self, event_type: OutboxEventType, batch_size: int) -> int:
+        """Claim and process batches of one event type with its own concurrency limit"""
+        semaphore = asyncio.Semaphore(self.concurrency[event_type])
+        handler = self.handlers.get(event_type)
+        batch_handler = self.batch_handlers.get(event_type)
+        processed = 0
+
+        async def run_one(event_id: int, claimed_at: datetime):
+            async with semaphore:
+                await self._process_event(event_id, claimed_at, handler)
+
+        while True:
+            event_ids, claimed_at = await self._claim_events(event_type, batch_size)
+            if not event_ids:
+                return processed
+            if batch_handler:
+                await batch_handler(event_ids, claimed_at)
+            else:
+                await asyncio.gather(*[run_one(event_id, claimed_at) for event_id in event_ids])
+            processed += len(event_ids)
+
+    async def _claim_events(self, event_type: OutboxEventType, batch_size: int) -> Tuple[List[int], datetime]:
+        """Lock a batch of due events and mark them as processing; returns their ids and the claim time.
+
+        SKIP LOCKED lets several workers claim disjoint batches; events stuck in processing
+        longer than the lease (e.g. a crashed worker) are claimed again. The claim time is
+        stored in locked_at, and outcomes are only written while locked_at still holds it.
+        """
+        now = datetime.utcnow()
+        # Whole seconds: MySQL DATETIME drops the fraction, and claims are matched on locked_at exactly
+        claimed_at = now.replace(microsecond=0)
+        lease_expired_before = now - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(PayrollOutboxEvent.id)
+                .where(
+                    and_(
+                        PayrollOutboxEvent.event_type == event_type,
+                        or_(
+                            and_(
+                                PayrollOutboxEvent.status == OutboxStatus.PENDING,
+                                PayrollOutboxEvent.available_at <= now
+                            ),
+                            and_(
+                                PayrollOutboxEvent.status == OutboxStatus.PROCESSING,
+                                PayrollOutboxEvent.locked_at < lease_expired_before
+                            )
+                        )
+                    )
+                )
+                .order_by(PayrollOutboxEvent.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            event_ids = [row[0] for row in result.all()]
+
+            if event_ids:
+                await db.execute(
+                    update(PayrollOutboxEvent)
+                    .where(PayrollOutboxEvent.id.in_(event_ids))
+                    .values(
+                        status=OutboxStatus.PROCESSING,
+                        locked_at=claimed_at,
+                        attempts=PayrollOutboxEvent.attempts + 1
+                    )
+                )
+            await db.commit()
+
+        return event_ids, claimed_at
+
+    @staticmethod
+    def _claimed(event_ids: Sequence[int], claimed_at: datetime):
+        return and_(
+            PayrollOutboxEvent.id.in_(event_ids),
+            PayrollOutboxEvent.status == OutboxStatus.PROCESSING,
+            PayrollOutboxEvent.locked_at == claimed_at
+        )
+
+    async def _lock_claimed(self, db: AsyncSession, event_ids: Sequence[int], claimed_at: datetime) -> Set[int]:
+        """Lock the events that are still under this claim and return their ids.
+
+        A batch that outlives OUTBOX_LEASE_SECONDS may have been claimed again by another
+        worker; its outcome is then that worker's to record.
+        """
+        result = await db.execute(
+            select(PayrollOutboxEvent.id).where(self._claimed(event_ids, claimed_at)).with_for_update()
+        )
+        owned = set(result.scalars().all())
+        if len(owned) < len(event_ids):
+            lost = sorted(set(event_ids) - owned)
+            logger.warning(f"Outbox events {lost} were claimed by another worker; their outcome is not recorded")
+        return owned
+
+    async def _complete_events(self, db: AsyncSession, event_ids: Sequence[int], claimed_at: datetime):
+        """Mark events completed, only where this claim still holds them"""
+        if not event_ids:
+            return
+        await db.execute(
+            update(PayrollOutboxEvent)
+            .where(self._claimed(event_ids, claimed_at))
+            .values(status=OutboxStatus.COMPLETED, processed_at=datetime.utcnow(), last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _process_event(self, event_id: int, claimed_at: datetime, handler):
+        """Run one event's handler in its own session and record the outcome"""
+        async with self.session_factory() as db:
+            event = await db.get(PayrollOutboxEvent, event_id)
+            try:
+                await handler(db, event)
+                if await self._lock_claimed(db, [event_id], claimed_at):
+                    await self._complete_events(db, [event_id], claimed_at)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                if await self._lock_claimed(db, [event_id], claimed_at):
+                    event = await db.get(PayrollOutboxEvent, event_id)
+                    self._record_failure(event, str(e))
+                await db.commit()
+
+    def _record_failure(self, event: PayrollOutboxEvent, error: str, retry: bool = True):
+        """Schedule a failed event for retry with backoff, or give up after the last attempt"""
+        logger.error(f"Outbox event {event.id} ({event.event_type.value}) failed: {error}")
+        event.last_error = error
+        if not retry or event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            event.status = OutboxStatus.FAILED
+        else:
+            # Exponential backoff: 30s, 60s, 120s, ...
+            event.status = OutboxStatus.PENDING
+            event.available_at = datetime.utcnow() + timedelta(seconds=30 * 2 ** (event.attempts - 1))
+
+    async def _load_payslip_and_employee(self, db: AsyncSession, payslip_id: int):
+        result = await db.execute(
+            select(Payslip, Employee)
+            .join(Employee, Payslip.employee_id == Employee.id)
+            .where(Payslip.id == payslip_id)
+        )
+        row = result.first()
+        if not row:
+            raise ValueError(f"Payslip {payslip_id} not found")
+        return row
+
+    async def _handle_payslip_pdf_batch(self, event_ids: List[int], claimed_at: datetime):
+        """Render a claimed batch of payslip PDFs in one pass through the render pool, then upload them.
+
+        Each payslip that gets its PDF also gets its notification email queued, in the same
+        transaction as the URL the email links to; failed uploads are retried per event.
+        Nothing is written for events another worker has claimed since, so a reclaimed batch
+        queues each email once.
+        """
+        async with self.session_factory() as db:
+            events = (await db.execute(
+                select(PayrollOutboxEvent).where(PayrollOutboxEvent.id.in_(event_ids)).order_by(PayrollOutboxEvent.id)
+            )).scalars().all()
+            rows = (await db.execute(
+                select(Payslip, Employee)
+                .join(Employee, Payslip.employee_id == Employee.id)
+                .where(Payslip.id.in_([event.payslip_id for event in events]))
+            )).all()
+            items = {payslip.id: (payslip, employee) for payslip, employee in rows}
+
+            try:
+                pdf_urls = await self.pdf_service.generate_payslip_pdfs(
+                    list(items.values()),
+                    concurrency=self.concurrency[OutboxEventType.PAYSLIP_PDF],
+                    return_exceptions=True
+                )
+            except Exception as e:
+                # Rendering failed for the whole batch; nothing has been written yet
+                owned = await self._lock_claimed(db, event_ids, claimed_at)
+                for event in events:
+                    if event.id in owned:
+                        self._record_failure(event, str(e))
+                await db.commit()
+                return
+
+            owned = await self._lock_claimed(db, event_ids, claimed_at)
+            pdf_url_by_payslip = dict(zip(items, pdf_urls))
+            now = datetime.utcnow()
+            completed = []
+            emails = []
+            for event in events:
+                if event.id not in owned:
+                    continue
+                pdf_url = pdf_url_by_payslip.get(event.payslip_id, ValueError(f"Payslip {event.payslip_id} not found"))
+                if isinstance(pdf_url, Exception):
+                    self._record_failure(event, str(pdf_url))
+                    continue
+                payslip, _ = items[event.payslip_id]
+                payslip.pdf_url = pdf_url
+                payslip.pdf_generated_at = now
+                completed.append(event.id)
+                emails.append({
+                    'payroll_run_id': event.payroll_run_id,
+                    'payslip_id': payslip.id,
+                    'event_type': OutboxEventType.PAYSLIP_EMAIL,
+                })
+
+            await self._complete_events(db, completed, claimed_at)
+            await self.enqueue(db, emails)
+            await db.commit()
+
+    async def _handle_payslip_email(self, db: AsyncSession, event: PayrollOutboxEvent):
+        """Email the employee a link to their payslip PDF"""
+        payslip, employee = await self._load_payslip_and_employee(db, event.payslip_id)
+
+        if not payslip.pdf_url:
+            raise ValueError(f"Payslip {payslip.id} has no PDF yet")
+
+        sent = await self.email_service.send_payslip_notification(
+            employee.email,
+            employee.first_name,
+            payslip.pdf_url,
+            payslip.pay_date
+        )
+        if not sent:
+            raise RuntimeError(f"Payslip email to {employee.email} was not accepted")
+
+    async def _handle_payment_batch(self, event_ids: List[int], claimed_at: datetime):
+        """Submit the payouts for a claimed batch of payment events through PaymentService.send_batch"""
+        async def load_events(db: AsyncSession) -> Sequence[PayrollOutboxEvent]:
+            result = await db.execute(select(PayrollOutboxEvent).where(PayrollOutboxEvent.id.in_(event_ids)))
+            return result.scalars().all()
+
+        async with self.session_factory() as db:
+            events = await load_events(db)
+            payslips = (await db.execute(
+                select(Payslip).where(Payslip.id.in_([event.payslip_id for event in events]))
+            )).scalars().all()
+
+            try:
+                summary = await self.payment_service.send_batch(
+                    payslips,
+                    db,
+                    concurrency=self.concurrency[OutboxEventType.PAYMENT]
+                )
+            except Exception as e:
+                # Payslips were committed as processing before any request, so a retry cannot pay twice
+                await db.rollback()
+                owned = await self._lock_claimed(db, event_ids, claimed_at)
+                for event in await load_events(db):
+                    if event.id in owned:
+                        self._record_failure(event, str(e))
+                await db.commit()
+                return
+
+            owned = await self._lock_claimed(db, event_ids, claimed_at)
+            completed = []
+            for event in events:
+                if event.id not in owned:
+                    continue
+                result = summary['results'].get(event.payslip_id, {'status': 'failed', 'error': 'Payslip not found'})
+                if result['status'] == 'failed':
+                    self._record_failure(event, result['error'])
+                elif result['status'] == 'unconfirmed':
+                    # Retrying could pay twice; leave it for manual reconciliation
+                    self._record_failure(event, result['error'], retry=False)
+                else:
+                    completed.append(event.id)
+            await self._complete_events(db, completed, claimed_at)
+            await db.commit()
+
+# Global instance
+outbox_service = OutboxService()
@@ -1,16 +1,58 @@
-import stripe
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Sequence, Optional
 from decimal import Decimal
+from sqlalchemy import select, and_
 from backend.config import settings
 from backend.services.plaid_service import plaid_service
+from backend.utils.executors import BlockingExecutor
+from backend.utils.helpers import hmac_sensitive_data
 import logging
-from backend.orm_models import Employee, BankAccount
+from backend.orm_models import Employee, BankAccount, Payslip, PaymentStatus
 
 logger = logging.getLogger(__name__)
 
+PLAID_COMPLETED_STATUSES = {'PAYMENT_STATUS_EXECUTED', 'PAYMENT_STATUS_SETTLED'}
+PLAID_FAILED_STATUSES = {
+    'PAYMENT_STATUS_FAILED',
+    'PAYMENT_STATUS_BLOCKED',
+    'PAYMENT_STATUS_REJECTED',
+    'PAYMENT_STATUS_CANCELLED',
+    'PAYMENT_STATUS_INSUFFICIENT_FUNDS',
+}
+
+def map_plaid_payment_status(plaid_status: str) -> PaymentStatus:
+    """Map a Plaid payment initiation status onto our PaymentStatus"""
+    if plaid_status in PLAID_COMPLETED_STATUSES:
+        return PaymentStatus.COMPLETED
+    if plaid_status in PLAID_FAILED_STATUSES:
+        return PaymentStatus.FAILED
+    return PaymentStatus.PROCESSING
+
+def payment_reference_for(payslip: Payslip) -> str:
+    """Stable Plaid payment reference for a payslip (Plaid allows at most 18 characters)"""
+    return f"PAYSLIP-{payslip.id}"
+
+def recipient_fingerprint(recipient_name: str, bank_account: BankAccount) -> str:
+    """HMAC of everything a Plaid payment recipient is created from.
+
+    A stored recipient is only reused while this matches, so renaming the employee or
+    relinking a different account transparently creates a fresh recipient. The account and
+    routing numbers are few enough to enumerate, so the fingerprint is keyed: stored in
+    plaintext, a plain hash would give away the encrypted columns.
+    """
+    key = settings.PLAID_RECIPIENT_FINGERPRINT_KEY or settings.SECRET_KEY
+    return hmac_sensitive_data("|".join([
+        recipient_name,
+        bank_account.plaid_account_id or "",
+        bank_account.mask or "",
+        bank_account.account_number or "",
+        bank_account.routing_number or "",
+    ]), key)
+
 class PaymentService:
     def __init__(self):
-        stripe.api_key = settings.STRIPE_SECRET_KEY
+        # The Stripe SDK is blocking; run it on its own threads, off the event loop
+        self.stripe_executor = BlockingExecutor("stripe", settings.STRIPE_MAX_WORKERS, settings.STRIPE_TIMEOUT_SECONDS)
     
     async def send_payment_via_plaid(
         self,
@@ -21,38 +63,44 @@ class PaymentService:
     ) -> Dict[str, Any]:
         """Send payment via Plaid Payment Initiation"""
         try:
-            from sqlalchemy import select
-            
-            # Get employee and their bank account
-            employee_result = await db.execute(
-                select(Employee).where(Employee.id == employee_id)
+            # Employee and their verified bank account in one round trip
+            result = await db.execute(
+                select(Employee, BankAccount)
+                .outerjoin(
+                    BankAccount,
+                    and_(
+                        BankAccount.employee_id == Employee.id,
+                        BankAccount.is_verified == True
+                    )
+                )
+                .where(Employee.id == employee_id)
+                .order_by(BankAccount.is_primary.desc(), BankAccount.id)
+                .limit(1)
             )
-            employee = employee_result.scalar_one_or_none()
+            row = result.first()
             
-            if not employee:
+            if not row:
                 raise ValueError("Employee not found")
             
-            bank_account_result = await db.execute(
-                select(BankAccount).where(
-                    BankAccount.employee_id == employee_id,
-                    BankAccount.is_verified == True
-                )
-            )
-            bank_account = bank_account_result.scalar_one_or_none()
+            employee, bank_account = row
             
             if not bank_account:
                 raise ValueError("No verified bank account found for employee")
             
-            # Create payment recipient
-            recipient_name = f"{employee.first_name} {employee.last_name}"
-            recipient_id = await plaid_service.create_payment_recipient(recipient_name)
+            recipient_id = await self.get_or_create_recipient(employee, bank_account)
             
             # Create payment
-            payment_id = await plaid_service.create_payment(
-                recipient_id=recipient_id,
-                reference=description,
-                amount=amount
-            )
+            try:
+                payment_id = await plaid_service.create_payment(
+                    recipient_id=recipient_id,
+                    reference=description,
+                    amount=amount
+                )
+            except plaid_service.api_error as e:
+                if e.status == 400:
+                    # Plaid rejected the request, possibly because the stored recipient is no longer valid
+                    self.invalidate_recipient(bank_account)
+                raise
             
             # Get payment status
             payment_status = await plaid_service.get_payment_status(payment_id)
@@ -74,6 +122,205 @@ class PaymentService:
                 'error': str(e)
             }
     
+    async def send_batch(
+        self,
+        payslips: Sequence[Payslip],
+        db,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Submit Plaid payments for many payslips with a bounded concurrency window.
+        
+        Idempotent per payslip: payslips that already have a payment reference are skipped, and
+        payslips are marked processing (and committed) before anything is sent, so a batch that
+        dies half way is never resubmitted blindly. Payslips found processing without a reference
+        are reported as unconfirmed for manual reconciliation. Status checks are left to
+        refresh_batch_status. Changes are committed before returning.
+        
+        A payslip is only marked failed (and so safe to retry) when no payment can exist: it
+        failed before the payment request was sent, or Plaid rejected the request with a 4xx.
+        Any other error from the payment request (timeouts, dropped connections, 5xx) leaves it
+        processing and reports it as unconfirmed, because Plaid may have created the payment.
+        """
+        concurrency = concurrency or settings.PAYMENT_BATCH_CONCURRENCY
+        summary: Dict[str, Any] = {
+            'total': len(payslips),
+            'submitted': 0,
+            'skipped': 0,
+            'failed': 0,
+            'unconfirmed': 0,
+            'results': {}
+        }
+        
+        to_send = []
+        for payslip in payslips:
+            if payslip.payment_reference:
+                summary['skipped'] += 1
+                summary['results'][payslip.id] = {'status': 'skipped', 'payment_id': payslip.payment_reference}
+            elif payslip.payment_status == PaymentStatus.PROCESSING:
+                summary['unconfirmed'] += 1
+                summary['results'][payslip.id] = {
+                    'status': 'unconfirmed',
+                    'error': 'Payment was submitted without recording a reference; reconcile with Plaid'
+                }
+            else:
+                to_send.append(payslip)
+        
+        if not to_send:
+            return summary
+        
+        accounts = await self._load_payment_accounts(db, {payslip.employee_id for payslip in to_send})
+        
+        # Claim the payslips before sending so a crash can never lead to paying twice
+        for payslip in to_send:
+            payslip.payment_method = 'plaid'
+            payslip.payment_status = PaymentStatus.PROCESSING
+        await db.commit()
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        recipients: Dict[int, asyncio.Task] = {}
+        
+        def recipient_for(employee: Employee, bank_account: BankAccount) -> asyncio.Task:
+            # Payslips of the same employee share one recipient lookup
+            if employee.id not in recipients:
+                recipients[employee.id] = asyncio.ensure_future(self.get_or_create_recipient(employee, bank_account))
+            return recipients[employee.id]
+        
+        def fail(payslip: Payslip, error: Exception):
+            # Definitely not paid: the payslip may be submitted again
+            logger.error(f"Plaid payment error for payslip {payslip.id}: {error}")
+            payslip.payment_status = PaymentStatus.FAILED
+            summary['failed'] += 1
+            summary['results'][payslip.id] = {'status': 'failed', 'error': str(error)}
+        
+        def unconfirmed(payslip: Payslip, error: Exception):
+            # Plaid may have accepted it; leave the payslip processing for reconciliation
+            if isinstance(error, asyncio.TimeoutError):
+                message = 'Plaid request timed out'
+            else:
+                message = str(error) or type(error).__name__
+            logger.error(f"Plaid payment for payslip {payslip.id} is unconfirmed: {message}")
+            summary['unconfirmed'] += 1
+            summary['results'][payslip.id] = {'status': 'unconfirmed', 'error': message}
+        
+        async def submit(payslip: Payslip):
+            async with semaphore:
+                try:
+                    if payslip.employee_id not in accounts:
+                        raise ValueError("No verified bank account found for employee")
+                    employee, bank_account = accounts[payslip.employee_id]
+                    # Creating a recipient moves no money, so its errors are plain failures
+                    recipient_id = await recipient_for(employee, bank_account)
+                except Exception as e:
+                    fail(payslip, e)
+                    return
+                
+                try:
+                    payment_id = await plaid_service.create_payment(
+                        recipient_id=recipient_id,
+                        reference=payment_reference_for(payslip),
+                        amount=payslip.net_pay
+                    )
+                except plaid_service.api_error as e:
+                    if e.status is None or not 400 <= e.status < 500:
+                        unconfirmed(payslip, e)
+                        return
+                    if e.status == 400:
+                        # Possibly because the stored recipient is no longer valid
+                        self.invalidate_recipient(bank_account)
+                    fail(payslip, e)
+                    return
+                except Exception as e:
+                    unconfirmed(payslip, e)
+                    return
+                
+                payslip.payment_reference = payment_id
+                summary['submitted'] += 1
+                summary['results'][payslip.id] = {'status': 'submitted', 'payment_id': payment_id}
+        
+        await asyncio.gather(*[submit(payslip) for payslip in to_send])
+        await db.commit()
+        
+        logger.info(
+            f"Payment batch: {summary['submitted']} submitted, {summary['skipped']} skipped, "
+            f"{summary['failed']} failed, {summary['unconfirmed']} unconfirmed of {summary['total']}"
+        )
+        return summary
+    
+    async def refresh_batch_status(
+        self,
+        payslips: Sequence[Payslip],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, int]:
+        """Poll Plaid for submitted payments and update the payslips' payment status.
+        
+        Only payslips with a payment reference that are still processing are checked; the
+        caller commits.
+        """
+        concurrency = concurrency or settings.PAYMENT_BATCH_CONCURRENCY
+        semaphore = asyncio.Semaphore(concurrency)
+        counts = {'checked': 0, 'completed': 0, 'failed': 0, 'processing': 0, 'errors': 0}
+        
+        async def refresh(payslip: Payslip):
+            async with semaphore:
+                try:
+                    payment = await plaid_service.get_payment_status(payslip.payment_reference)
+                except Exception as e:
+                    logger.error(f"Error getting payment status for payslip {payslip.id}: {e}")
+                    counts['errors'] += 1
+                    return
+                payslip.payment_status = map_plaid_payment_status(payment['status'])
+                counts['checked'] += 1
+                counts[payslip.payment_status.value] += 1
+        
+        await asyncio.gather(*[
+            refresh(payslip) for payslip in payslips
+            if payslip.payment_reference and payslip.payment_status == PaymentStatus.PROCESSING
+        ])
+        return counts
+    
+    async def _load_payment_accounts(self, db, employee_ids) -> Dict[int, tuple]:
+        """Map employee id to (employee, verified bank account), preferring the primary account"""
+        if not employee_ids:
+            return {}
+        result = await db.execute(
+            select(Employee, BankAccount)
+            .join(
+                BankAccount,
+                and_(
+                    BankAccount.employee_id == Employee.id,
+                    BankAccount.is_verified == True
+                )
+            )
+            .where(Employee.id.in_(employee_ids))
+            .order_by(BankAccount.is_primary.desc(), BankAccount.id)
+        )
+        accounts = {}
+        for employee, bank_account in result.all():
+            accounts.setdefault(employee.id, (employee, bank_account))
+        return accounts
+    
+    async def get_or_create_recipient(self, employee: Employee, bank_account: BankAccount) -> str:
+        """Return the bank account's Plaid recipient, creating and storing one if needed.
+        
+        The new recipient is saved on the bank account in the caller's session and becomes
+        permanent when the caller commits.
+        """
+        recipient_name = f"{employee.first_name} {employee.last_name}"
+        fingerprint = recipient_fingerprint(recipient_name, bank_account)
+        
+        if bank_account.plaid_recipient_id and bank_account.plaid_recipient_fingerprint == fingerprint:
+            return bank_account.plaid_recipient_id
+        
+        recipient_id = await plaid_service.create_payment_recipient(recipient_name)
+        bank_account.plaid_recipient_id = recipient_id
+        bank_account.plaid_recipient_fingerprint = fingerprint
+        return recipient_id
+    
+    def invalidate_recipient(self, bank_account: BankAccount):
+        """Forget the stored recipient so the next payment creates a new one"""
+        bank_account.plaid_recipient_id = None
+        bank_account.plaid_recipient_fingerprint = None
+    
     async def send_payment(
         self,
         amount: Decimal,
@@ -81,13 +328,17 @@ class PaymentService:
         description: str
     ) -> Dict[str, Any]:
         """Send payment via Stripe (legacy method)"""
+        # Imported on first use: only this legacy path needs the SDK, and it is slow to import
+        import stripe
+        stripe.api_key = settings.STRIPE_SECRET_KEY
         try:
             # Convert amount to cents
             amount_cents = int(amount * 100)
             
             # Create transfer (this is a simplified example)
             # In production, you'd need to set up Stripe Connect accounts
-            transfer = stripe.Transfer.create(
+            transfer = await self.stripe_executor.run(
+                stripe.Transfer.create,
                 amount=amount_cents,
                 currency='usd',
                 destination=recipient_account_id,
@@ -100,6 +351,15 @@ class PaymentService:
                 'status': 'completed' if transfer.amount_reversed == 0 else 'failed'
             }
             
+        except asyncio.TimeoutError:
+            # The transfer may still have been created; don't report it as failed
+            logger.error("Stripe transfer timed out")
+            return {
+                'method': 'stripe',
+                'reference': None,
+                'status': 'unknown',
+                'error': 'Stripe request timed out'
+            }
         except stripe.error.StripeError as e:
             logger.error(f"Stripe error: {e}")
             return {
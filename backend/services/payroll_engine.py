@@ -0,0 +1,213 @@
+import asyncio
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from backend.config import settings
+from backend.orm_models import Employee, Timesheet, TaxConfiguration
+from backend.services.tax_service import TaxService
+from backend.services.batch_tax_service import BatchTaxService, to_cents, from_cents
+from backend.utils.helpers import round_currency, available_cores
+
+# Process pool for payroll calculation, created on first use
+_calc_pool: Optional[ProcessPoolExecutor] = None
+_calc_pool_size = 0
+
+@dataclass(frozen=True)
+class EmployeeSnapshot:
+    """Everything the gross-to-net calculation needs about one employee, detached from the session"""
+    id: int
+    salary_type: str
+    hourly_rate: Optional[Decimal]
+    base_salary: Decimal
+    tax_status: Optional[str]
+    regular_hours: Decimal
+    overtime_hours: Decimal
+    # Gross wages already paid in the run's tax year, before this payslip
+    ytd_gross: Decimal = Decimal('0')
+
+@dataclass(frozen=True)
+class TaxConfigSnapshot:
+    """The organization's tax rates"""
+    federal_tax_rate: Decimal
+    state_tax_rate: Decimal
+    social_security_rate: Decimal
+    medicare_rate: Decimal
+
+def employee_snapshot(
+    employee: Employee,
+    timesheets: Sequence[Timesheet],
+    ytd_gross: Decimal = Decimal('0')
+) -> EmployeeSnapshot:
+    """Snapshot an employee together with the hours from their approved timesheets and their YTD wages"""
+    regular_hours = Decimal('0')
+    overtime_hours = Decimal('0')
+    for timesheet in timesheets:
+        regular_hours += timesheet.total_hours - timesheet.overtime_hours
+        overtime_hours += timesheet.overtime_hours
+
+    return EmployeeSnapshot(
+        id=employee.id,
+        salary_type=employee.salary_type.value,
+        hourly_rate=employee.hourly_rate,
+        base_salary=employee.base_salary,
+        tax_status=employee.tax_status,
+        regular_hours=regular_hours,
+        overtime_hours=overtime_hours,
+        ytd_gross=ytd_gross
+    )
+
+def tax_config_snapshot(tax_config: TaxConfiguration) -> TaxConfigSnapshot:
+    """Snapshot the tax rates of a TaxConfiguration"""
+    return TaxConfigSnapshot(
+        federal_tax_rate=tax_config.federal_tax_rate,
+        state_tax_rate=tax_config.state_tax_rate,
+        social_security_rate=tax_config.social_security_rate,
+        medicare_rate=tax_config.medicare_rate
+    )
+
+def calculate_earnings(employee: EmployeeSnapshot, days_in_period: int) -> Tuple[Decimal, Decimal, Decimal]:
+    """Regular, overtime and gross pay for one employee, each rounded to cents"""
+    if employee.salary_type == 'hourly':
+        regular_pay = employee.regular_hours * employee.hourly_rate
+        overtime_pay = employee.overtime_hours * employee.hourly_rate * Decimal('1.5')
+    else:
+        # Fixed salary - calculate based on pay period
+        regular_pay = (employee.base_salary / Decimal('365')) * Decimal(str(days_in_period))
+        overtime_pay = Decimal('0')
+
+    # Rounded as the DECIMAL(10, 2) columns store them; taxes are computed on the stored gross
+    return round_currency(regular_pay), round_currency(overtime_pay), round_currency(regular_pay + overtime_pay)
+
+def calculate_employee_pay(
+    employee: EmployeeSnapshot,
+    tax_config: TaxConfigSnapshot,
+    days_in_period: int,
+    tax_year: int,
+    tax_service: Optional[TaxService] = None
+) -> Dict[str, Any]:
+    """Gross-to-net for one employee with Decimal arithmetic; a pure function of its arguments"""
+    tax_service = tax_service or TaxService()
+    regular_pay, overtime_pay, gross_pay = calculate_earnings(employee, days_in_period)
+
+    # Calculate taxes and deductions
+    tax_calculations = tax_service.calculate_taxes(
+        gross_pay=gross_pay,
+        tax_config=tax_config,
+        employee=employee,
+        ytd_gross=employee.ytd_gross,
+        tax_year=tax_year
+    )
+
+    return {
+        'employee_id': employee.id,
+        'regular_hours': employee.regular_hours,
+        'overtime_hours': employee.overtime_hours,
+        'regular_pay': regular_pay,
+        'overtime_pay': overtime_pay,
+        'gross_pay': gross_pay,
+        'federal_tax': tax_calculations['federal_tax'],
+        'state_tax': tax_calculations['state_tax'],
+        'social_security': tax_calculations['social_security'],
+        'medicare': tax_calculations['medicare'],
+        'total_deductions': tax_calculations['total_deductions'],
+        'net_pay': tax_calculations['net_pay'],
+    }
+
+def calculate_shard(
+    employees: Sequence[EmployeeSnapshot],
+    tax_config: TaxConfigSnapshot,
+    days_in_period: int,
+    tax_year: int
+) -> List[Dict[str, Any]]:
+    """Calculate a shard of employees, in the order given (runs in a worker process).
+
+    Earnings are per employee; taxes for the whole shard are computed column-wise over
+    integer cents by BatchTaxService, which matches calculate_employee_pay to the cent.
+    """
+    earnings = [calculate_earnings(employee, days_in_period) for employee in employees]
+    gross_cents = np.fromiter((to_cents(gross_pay) for _, _, gross_pay in earnings), dtype=np.int64, count=len(earnings))
+    ytd_gross_cents = np.fromiter((to_cents(employee.ytd_gross) for employee in employees), dtype=np.int64, count=len(employees))
+    taxes = {
+        name: values.tolist()
+        for name, values in BatchTaxService().calculate_taxes_for_config(
+            gross_cents, tax_config, ytd_gross_cents, tax_year
+        ).items()
+    }
+
+    return [
+        {
+            'employee_id': employee.id,
+            'regular_hours': employee.regular_hours,
+            'overtime_hours': employee.overtime_hours,
+            'regular_pay': regular_pay,
+            'overtime_pay': overtime_pay,
+            'gross_pay': gross_pay,
+            'federal_tax': from_cents(taxes['federal_tax'][index]),
+            'state_tax': from_cents(taxes['state_tax'][index]),
+            'social_security': from_cents(taxes['social_security'][index]),
+            'medicare': from_cents(taxes['medicare'][index]),
+            'total_deductions': from_cents(taxes['total_deductions'][index]),
+            'net_pay': from_cents(taxes['net_pay'][index]),
+        }
+        for index, (employee, (regular_pay, overtime_pay, gross_pay)) in enumerate(zip(employees, earnings))
+    ]
+
+def calc_pool_size() -> int:
+    """Number of calculation processes the pool uses (or will use)"""
+    return settings.PAYROLL_CALC_WORKERS or available_cores()
+
+def calculation_batch_size() -> int:
+    """Employees to hand to calculate_payslips at once: one shard per calculation process"""
+    return settings.PAYROLL_SHARD_SIZE * calc_pool_size()
+
+def get_calc_pool() -> ProcessPoolExecutor:
+    """Process pool for payroll calculation, created on first use"""
+    global _calc_pool, _calc_pool_size
+    if _calc_pool is None:
+        _calc_pool_size = calc_pool_size()
+        _calc_pool = ProcessPoolExecutor(max_workers=_calc_pool_size)
+    return _calc_pool
+
+def shutdown_calc_pool():
+    """Stop the calculation processes (called on application shutdown)"""
+    global _calc_pool
+    if _calc_pool is not None:
+        _calc_pool.shutdown(wait=False, cancel_futures=True)
+        _calc_pool = None
+
+async def calculate_payslips(
+    employees: Sequence[EmployeeSnapshot],
+    tax_config: TaxConfigSnapshot,
+    days_in_period: int,
+    tax_year: int
+) -> List[Dict[str, Any]]:
+    """Calculate pay for many employees, sharded across the process pool when it is worth it.
+
+    Shards are contiguous slices of the input and are concatenated in submission order, so
+    the result lists employees in exactly the input order whichever path is taken and
+    however the shards finish. Runs smaller than PAYROLL_PARALLEL_MIN_EMPLOYEES, or a pool of
+    one process, are calculated in-process.
+    """
+    if len(employees) < settings.PAYROLL_PARALLEL_MIN_EMPLOYEES or calc_pool_size() <= 1:
+        return calculate_shard(employees, tax_config, days_in_period, tax_year)
+
+    pool = get_calc_pool()
+    loop = asyncio.get_running_loop()
+    shard_size = settings.PAYROLL_SHARD_SIZE
+    shards = await asyncio.gather(*[
+        loop.run_in_executor(
+            pool, calculate_shard, employees[start:start + shard_size], tax_config, days_in_period, tax_year
+        )
+        for start in range(0, len(employees), shard_size)
+    ])
+    return [result for shard in shards for result in shard]
+
+def summarize(results: Sequence[Dict[str, Any]]) -> Dict[str, Decimal]:
+    """Run totals over calculated payslips (exact Decimal sums of the rounded amounts)"""
+    return {
+        'total_gross_pay': sum((result['gross_pay'] for result in results), Decimal('0')),
+        'total_net_pay': sum((result['net_pay'] for result in results), Decimal('0')),
+        'total_taxes': sum((result['total_deductions'] for result in results), Decimal('0')),
+    }
@@ -0,0 +1,279 @@
+import asyncio
+import uuid
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, or_, update, func
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.orm_models import (
+    PayrollRun, PayrollStatus, PayrollJob, PayrollJobStatus,
+    PayrollOutboxEvent, OutboxEventType, OutboxStatus
+)
+from backend.services.payroll_service import PayrollService
+from backend.utils.exceptions import PayrollClaimLostException
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A job whose worker keeps dying is failed instead of being picked up forever
+PAYROLL_JOB_MAX_ATTEMPTS = 3
+
+class PayrollJobService:
+    """Database-backed queue for payroll runs.
+
+    The API only enqueues a job; workers (in the API process or started with
+    scripts/run_payroll_worker.py) claim jobs with SKIP LOCKED, so any number of worker
+    processes can share the queue. Progress is written to the job row while the run is
+    calculated; PDF, email and payment progress is read from the run's outbox events.
+
+    Every claim gets a new claim token, stored on the job and on its payroll run. A worker only
+    writes the job while the token is still its own, and process_payroll checks it on the run
+    before each chunk, so when a lease lapses and another worker takes the job over, the
+    first worker stops at its next chunk instead of processing alongside.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.payroll_service = PayrollService()
+        self._worker_task: Optional[asyncio.Task] = None
+
+    async def enqueue(self, db: AsyncSession, payroll_run_id: int, requested_by: Optional[str] = None) -> PayrollJob:
+        """Queue a payroll run for processing, or return the job already queued or running for it"""
+        # Lock the run row so concurrent requests for the same run serialize here
+        result = await db.execute(
+            select(PayrollRun).where(PayrollRun.id == payroll_run_id).with_for_update()
+        )
+        payroll_run = result.scalar_one_or_none()
+
+        if not payroll_run:
+            raise ValueError("Payroll run not found")
+
+        active_result = await db.execute(
+            select(PayrollJob).where(
+                and_(
+                    PayrollJob.payroll_run_id == payroll_run_id,
+                    PayrollJob.status.in_([PayrollJobStatus.QUEUED, PayrollJobStatus.RUNNING])
+                )
+            )
+        )
+        active_job = active_result.scalars().first()
+        if active_job:
+            await db.commit()
+            return active_job
+
+        if payroll_run.status == PayrollStatus.COMPLETED:
+            await db.rollback()
+            raise RuntimeError("Payroll run has already been processed")
+
+        job = PayrollJob(
+            payroll_run_id=payroll_run_id,
+            status=PayrollJobStatus.QUEUED,
+            attempts=0,
+            employees_total=0,
+            employees_calculated=0,
+            requested_by=requested_by
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def get_status(self, db: AsyncSession, job_id: int) -> Optional[Dict[str, Any]]:
+        """Job status with per-stage progress, or None if the job does not exist"""
+        job = await db.get(PayrollJob, job_id)
+        if not job:
+            return None
+
+        counts_result = await db.execute(
+            select(PayrollOutboxEvent.event_type, PayrollOutboxEvent.status, func.count())
+            .where(PayrollOutboxEvent.payroll_run_id == job.payroll_run_id)
+            .group_by(PayrollOutboxEvent.event_type, PayrollOutboxEvent.status)
+        )
+        totals = {event_type: 0 for event_type in OutboxEventType}
+        completed = {event_type: 0 for event_type in OutboxEventType}
+        failed = {event_type: 0 for event_type in OutboxEventType}
+        for event_type, event_status, count in counts_result.all():
+            totals[event_type] += count
+            if event_status == OutboxStatus.COMPLETED:
+                completed[event_type] += count
+            elif event_status == OutboxStatus.FAILED:
+                failed[event_type] += count
+
+        return {
+            "job_id": job.id,
+            "payroll_run_id": job.payroll_run_id,
+            "status": job.status.value,
+            "attempts": job.attempts,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "progress": {
+                "employees_calculated": job.employees_calculated,
+                "employees_total": job.employees_total,
+                "pdfs_rendered": completed[OutboxEventType.PAYSLIP_PDF],
+                "pdfs_failed": failed[OutboxEventType.PAYSLIP_PDF],
+                "pdfs_total": totals[OutboxEventType.PAYSLIP_PDF],
+                "emails_sent": completed[OutboxEventType.PAYSLIP_EMAIL],
+                "emails_failed": failed[OutboxEventType.PAYSLIP_EMAIL],
+                "payments_sent": completed[OutboxEventType.PAYMENT],
+                "payments_failed": failed[OutboxEventType.PAYMENT],
+                "payments_total": totals[OutboxEventType.PAYMENT],
+            }
+        }
+
+    async def run_next(self) -> bool:
+        """Claim and run one job; returns False when the queue is empty"""
+        claimed = await self._claim_job()
+        if not claimed:
+            return False
+        job_id, payroll_run_id, claim_token = claimed
+        await self._run_job(job_id, payroll_run_id, claim_token)
+        return True
+
+    async def run_worker(self, poll_interval: Optional[float] = None):
+        """Run queued jobs forever, sleeping between polls when the queue is empty"""
+        poll_interval = poll_interval or settings.PAYROLL_JOB_POLL_INTERVAL_SECONDS
+        while True:
+            try:
+                if not await self.run_next():
+                    await asyncio.sleep(poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Payroll worker error: {e}")
+                await asyncio.sleep(poll_interval)
+
+    def start_worker(self):
+        """Start the background worker on the running event loop"""
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self.run_worker())
+
+    async def stop_worker(self):
+        """Cancel the background worker and wait for it to exit"""
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
+    async def _claim_job(self) -> Optional[tuple]:
+        """Lock the oldest runnable job and mark it running.
+
+        Running jobs that have not reported progress within the lease (e.g. their worker
+        crashed or is stuck) are claimed again, up to PAYROLL_JOB_MAX_ATTEMPTS. A job past
+        its attempts is failed, along with its payroll run if the run is still under the
+        job's last claim, and the next job is claimed instead. The new claim token is handed
+        to the payroll run in the same transaction, which fences off the previous worker if
+        it is still alive.
+        """
+        now = datetime.utcnow()
+        lease_expired_before = now - timedelta(seconds=settings.PAYROLL_JOB_LEASE_SECONDS)
+
+        async with self.session_factory() as db:
+            while True:
+                result = await db.execute(
+                    select(PayrollJob)
+                    .where(
+                        or_(
+                            PayrollJob.status == PayrollJobStatus.QUEUED,
+                            and_(
+                                PayrollJob.status == PayrollJobStatus.RUNNING,
+                                PayrollJob.locked_at < lease_expired_before
+                            )
+                        )
+                    )
+                    .order_by(PayrollJob.id)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                job = result.scalar_one_or_none()
+                if not job:
+                    return None
+
+                if job.attempts < PAYROLL_JOB_MAX_ATTEMPTS:
+                    break
+
+                error = job.error or "Worker stopped responding too many times"
+                logger.error(f"Payroll job {job.id} failed after {job.attempts} attempts: {error}")
+                job.status = PayrollJobStatus.FAILED
+                job.error = error
+                job.finished_at = now
+                if job.claim_token:
+                    await db.execute(
+                        update(PayrollRun)
+                        .where(
+                            and_(
+                                PayrollRun.id == job.payroll_run_id,
+                                PayrollRun.status == PayrollStatus.PROCESSING,
+                                PayrollRun.claim_token == job.claim_token
+                            )
+                        )
+                        .values(status=PayrollStatus.FAILED, claim_token=None)
+                    )
+                await db.commit()
+
+            claim_token = uuid.uuid4().hex
+            job.status = PayrollJobStatus.RUNNING
+            job.attempts += 1
+            job.claim_token = claim_token
+            job.locked_at = now
+            job.started_at = job.started_at or now
+            await db.execute(
+                update(PayrollRun)
+                .where(
+                    and_(
+                        PayrollRun.id == job.payroll_run_id,
+                        PayrollRun.status == PayrollStatus.PROCESSING
+                    )
+                )
+                .values(claim_token=claim_token)
+            )
+            await db.commit()
+            return job.id, job.payroll_run_id, claim_token
+
+    async def _run_job(self, job_id: int, payroll_run_id: int, claim_token: str):
+        """Process the payroll run and record the outcome on the job, while the claim is ours"""
+        owns_job = and_(PayrollJob.id == job_id, PayrollJob.claim_token == claim_token)
+
+        async def report_progress(calculated: int, total: int):
+            # Own session: job bookkeeping never shares a transaction with payroll writes
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    update(PayrollJob)
+                    .where(owns_job)
+                    .values(employees_calculated=calculated, employees_total=total, locked_at=datetime.utcnow())
+                )
+                await db.commit()
+            if result.rowcount == 0:
+                raise PayrollClaimLostException(f"Payroll job {job_id} was claimed by another worker")
+
+        try:
+            async with self.session_factory() as db:
+                await self.payroll_service.process_payroll(
+                    db, payroll_run_id, progress=report_progress, claim_token=claim_token
+                )
+            values = {'status': PayrollJobStatus.COMPLETED, 'error': None}
+        except PayrollClaimLostException as e:
+            # The worker that took over records the outcome
+            logger.warning(f"Payroll job {job_id} stopped: {e}")
+            return
+        except Exception as e:
+            logger.error(f"Payroll job {job_id} failed: {e}")
+            values = {'status': PayrollJobStatus.FAILED, 'error': str(e)}
+
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(PayrollJob)
+                .where(owns_job)
+                .values(finished_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+        if result.rowcount == 0:
+            logger.warning(f"Payroll job {job_id} was claimed by another worker; its outcome was not recorded")
+
+# Global instance
+payroll_job_service = PayrollJobService()
@@ -1,21 +1,39 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Optional, Callable, Awaitable
+from collections import defaultdict
 from decimal import Decimal
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from backend.orm_models import Employee, Timesheet, PayrollRun, Payslip, TaxConfiguration, TimesheetStatus, PayrollStatus
-from backend.services.tax_service import TaxService
-from backend.services.payment_service import PaymentService
-from backend.services.email_service import EmailService
-from backend.services.pdf_service import PDFService
+from sqlalchemy import select, and_, or_, insert, update, func
+from backend.orm_models import Employee, Timesheet, PayrollRun, Payslip, TaxConfiguration, TimesheetStatus, PayrollStatus, PaymentStatus, OutboxEventType
+from backend.services.outbox_service import outbox_service
+from backend.utils.exceptions import PayrollClaimLostException
+from backend.services.ytd_wage_service import ytd_wage_service
+from backend.services.tax_brackets import federal_brackets
+from backend.services.payroll_engine import (
+    TaxConfigSnapshot, calculate_payslips, calculation_batch_size, employee_snapshot, summarize,
+    tax_config_snapshot
+)
+
+# Upper bound on the number of ids sent in a single IN (...) clause
+TIMESHEET_PREFETCH_CHUNK_SIZE = 1000
+# Rows per multi-row INSERT when persisting payslips
+PAYSLIP_INSERT_CHUNK_SIZE = 500
+
+# How far before the last recompute to look again for timesheet changes. A timesheet approved
+# just before a recompute but committed after it would otherwise be missed; looking at it twice
+# is harmless, as an employee whose pay did not change gets no adjustment.
+RECOMPUTE_OVERLAP = timedelta(minutes=5)
+
+# Payslip columns an adjustment payslip carries as differences
+PAYSLIP_AMOUNT_COLUMNS = (
+    'regular_hours', 'overtime_hours', 'regular_pay', 'overtime_pay', 'gross_pay', 'federal_tax',
+    'state_tax', 'social_security', 'medicare', 'total_deductions', 'net_pay'
+)
+
+# Called with (employees_calculated, employees_total) as a run makes progress
+ProgressCallback = Callable[[int, int], Awaitable[None]]
 
 class PayrollService:
-    def __init__(self):
-        self.tax_service = TaxService()
-        self.payment_service = PaymentService()
-        self.email_service = EmailService()
-        self.pdf_service = PDFService()
-    
     async def create_payroll_run(
         self,
         db: AsyncSession,
@@ -40,60 +58,113 @@ class PayrollService:
         
         return payroll_run
     
-    async def process_payroll(self, db: AsyncSession, payroll_run_id: int) -> Dict[str, Any]:
-        """Process payroll for all employees in the organization"""
-        # Get payroll run
-        result = await db.execute(select(PayrollRun).where(PayrollRun.id == payroll_run_id))
+    async def process_payroll(
+        self,
+        db: AsyncSession,
+        payroll_run_id: int,
+        progress: Optional[ProgressCallback] = None,
+        claim_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Process payroll for all employees in the organization.
+        
+        Employees are processed in id order, one chunk per transaction: each chunk's payslips,
+        outbox events and the run's checkpoint_employee_id are committed together. If a chunk
+        fails the run is marked FAILED, and processing it again resumes after the checkpoint
+        instead of starting over.
+        
+        The run is claimed with claim_token, and a run already processing under another claim
+        is refused. Every chunk re-checks the claim under a row lock before it is written, so a
+        worker whose job was handed to another worker (see PayrollJobService) stops with
+        PayrollClaimLostException instead of paying the same employees twice.
+        """
+        # Lock the run so two callers cannot both start processing it
+        result = await db.execute(
+            select(PayrollRun).where(PayrollRun.id == payroll_run_id).with_for_update()
+        )
         payroll_run = result.scalar_one_or_none()
         
         if not payroll_run:
+            await db.rollback()
             raise ValueError("Payroll run not found")
         
+        if payroll_run.status == PayrollStatus.COMPLETED:
+            await db.rollback()
+            raise ValueError("Payroll run has already been processed")
+        
+        if payroll_run.status == PayrollStatus.PROCESSING and payroll_run.claim_token != claim_token:
+            await db.rollback()
+            raise RuntimeError("Payroll run is already being processed")
+        
+        try:
+            # No tax data for the pay date's year fails the run before anything is written
+            federal_brackets.resolve_year(payroll_run.pay_date.year)
+        except ValueError:
+            await db.rollback()
+            raise
+        
         # Update status to processing
         payroll_run.status = PayrollStatus.PROCESSING
+        payroll_run.claim_token = claim_token
         await db.commit()
         
         try:
-            # Get all active employees in the organization
+            tax_config = await self._get_tax_config(db, payroll_run.org_id)
+            
+            # Active employees not yet covered by an earlier attempt
+            employee_conditions = [
+                Employee.org_id == payroll_run.org_id,
+                Employee.is_active == True
+            ]
+            if payroll_run.checkpoint_employee_id:
+                employee_conditions.append(Employee.id > payroll_run.checkpoint_employee_id)
             employees_result = await db.execute(
-                select(Employee).where(
-                    and_(
-                        Employee.org_id == payroll_run.org_id,
-                        Employee.is_active == True
-                    )
-                )
+                select(Employee).where(and_(*employee_conditions)).order_by(Employee.id)
             )
             employees = employees_result.scalars().all()
             
-            # Get tax configuration
-            tax_config_result = await db.execute(
-                select(TaxConfiguration).where(
-                    and_(
-                        TaxConfiguration.org_id == payroll_run.org_id,
-                        TaxConfiguration.is_active == True
-                    )
-                )
-            )
-            tax_config = tax_config_result.scalar_one_or_none()
-            
-            if not tax_config:
-                raise ValueError("Tax configuration not found for organization")
+            employees_done = await self._count_payslips(db, payroll_run.id)
+            employees_total = employees_done + len(employees)
             
-            total_gross_pay = Decimal('0')
-            total_net_pay = Decimal('0')
-            total_taxes = Decimal('0')
+            tax_rates = tax_config_snapshot(tax_config)
+            days_in_period = (payroll_run.pay_period_end - payroll_run.pay_period_start).days + 1
+            # Wage bases and thresholds apply per calendar year of the pay date
+            tax_year = payroll_run.pay_date.year
+            batch_size = max(calculation_batch_size(), PAYSLIP_INSERT_CHUNK_SIZE)
             
-            # Process each employee
-            for employee in employees:
-                payslip = await self._process_employee_payroll(
-                    db, employee, payroll_run, tax_config
-                )
+            for batch_start in range(0, len(employees), batch_size):
+                batch = employees[batch_start:batch_start + batch_size]
+                
+                pay_results = await self._calculate_batch(db, payroll_run, tax_rates, tax_year, days_in_period, batch)
                 
-                total_gross_pay += payslip.gross_pay
-                total_net_pay += payslip.net_pay
-                total_taxes += payslip.total_deductions
+                for start in range(0, len(batch), PAYSLIP_INSERT_CHUNK_SIZE):
+                    chunk = batch[start:start + PAYSLIP_INSERT_CHUNK_SIZE]
+                    payslip_rows = [
+                        self._payslip_row(payroll_run, pay)
+                        for pay in pay_results[start:start + PAYSLIP_INSERT_CHUNK_SIZE]
+                    ]
+                    await self._check_claim(db, payroll_run.id, claim_token)
+                    await self._persist_payslip_chunk(db, payroll_run, chunk, payslip_rows)
+                    
+                    # The checkpoint commits atomically with the chunk's payslips, events and YTD wages
+                    payroll_run.checkpoint_employee_id = chunk[-1].id
+                    await db.commit()
+                    
+                    employees_done += len(chunk)
+                    if progress:
+                        await progress(employees_done, employees_total)
+            
+            # Totals over every payslip of the run, including chunks from earlier attempts
+            await self._check_claim(db, payroll_run.id, claim_token)
+            totals_result = await db.execute(
+                select(
+                    func.count(Payslip.id),
+                    func.coalesce(func.sum(Payslip.gross_pay), 0),
+                    func.coalesce(func.sum(Payslip.net_pay), 0),
+                    func.coalesce(func.sum(Payslip.total_deductions), 0)
+                ).where(Payslip.payroll_run_id == payroll_run.id)
+            )
+            total_employees, total_gross_pay, total_net_pay, total_taxes = totals_result.one()
             
-            # Update payroll run totals
             payroll_run.total_gross_pay = total_gross_pay
             payroll_run.total_net_pay = total_net_pay
             payroll_run.total_taxes = total_taxes
@@ -105,139 +176,387 @@ class PayrollService:
             return {
                 "payroll_run_id": payroll_run_id,
                 "status": "completed",
-                "total_employees": len(employees),
+                "total_employees": total_employees,
                 "total_gross_pay": float(total_gross_pay),
                 "total_net_pay": float(total_net_pay),
                 "total_taxes": float(total_taxes)
             }
             
         except Exception as e:
-            # Update status to failed
-            payroll_run.status = PayrollStatus.FAILED
+            # Discard the unfinished chunk; committed chunks stay behind the checkpoint
+            await db.rollback()
+            # A run taken over by another claim is not ours to mark failed
+            await db.execute(
+                update(PayrollRun)
+                .where(
+                    and_(
+                        PayrollRun.id == payroll_run_id,
+                        PayrollRun.status == PayrollStatus.PROCESSING,
+                        self._claim_condition(claim_token)
+                    )
+                )
+                .values(status=PayrollStatus.FAILED)
+                .execution_options(synchronize_session=False)
+            )
             await db.commit()
             raise e
     
-    async def _process_employee_payroll(
+    async def recompute_payroll(self, db: AsyncSession, payroll_run_id: int) -> Dict[str, Any]:
+        """Issue adjustment payslips for timesheets approved or changed since a run was processed.
+        
+        Only employees with such timesheets are recalculated, over the whole pay period. Each gets
+        one adjustment payslip holding the difference to what the run already paid them (skipped
+        if nothing changed), and the run totals and YTD wages move by the same differences.
+        """
+        result = await db.execute(
+            select(PayrollRun).where(PayrollRun.id == payroll_run_id).with_for_update()
+        )
+        payroll_run = result.scalar_one_or_none()
+        
+        if not payroll_run:
+            await db.rollback()
+            raise ValueError("Payroll run not found")
+        
+        if payroll_run.status != PayrollStatus.COMPLETED:
+            await db.rollback()
+            raise RuntimeError("Only processed payroll runs can be recomputed")
+        
+        try:
+            # Timesheet approved_at and updated_at are stamped by the application clock, as are these
+            recomputed_at = datetime.utcnow()
+            changed_since = (payroll_run.recomputed_at or payroll_run.processed_at) - RECOMPUTE_OVERLAP
+            
+            changed_result = await db.execute(
+                select(Timesheet.employee_id).distinct()
+                .join(Employee, Timesheet.employee_id == Employee.id)
+                .where(
+                    and_(
+                        Employee.org_id == payroll_run.org_id,
+                        Timesheet.status == TimesheetStatus.APPROVED,
+                        Timesheet.week_start_date >= payroll_run.pay_period_start,
+                        Timesheet.week_end_date <= payroll_run.pay_period_end,
+                        or_(Timesheet.approved_at > changed_since, Timesheet.updated_at > changed_since)
+                    )
+                )
+            )
+            employee_ids = sorted(changed_result.scalars().all())
+            
+            adjustment_rows = []
+            adjusted_employees = []
+            if employee_ids:
+                employees_result = await db.execute(
+                    select(Employee).where(Employee.id.in_(employee_ids)).order_by(Employee.id)
+                )
+                employees = employees_result.scalars().all()
+                paid_by_employee = await self._sum_payslips_by_employee(db, payroll_run.id, employee_ids)
+                
+                tax_config = await self._get_tax_config(db, payroll_run.org_id)
+                days_in_period = (payroll_run.pay_period_end - payroll_run.pay_period_start).days + 1
+                pay_results = await self._calculate_batch(
+                    db,
+                    payroll_run,
+                    tax_config_snapshot(tax_config),
+                    payroll_run.pay_date.year,
+                    days_in_period,
+                    employees,
+                    paid_gross={
+                        employee_id: paid['gross_pay'] for employee_id, paid in paid_by_employee.items()
+                    }
+                )
+                
+                for employee, pay in zip(employees, pay_results):
+                    paid = paid_by_employee.get(employee.id, {})
+                    adjustment = {
+                        column: pay[column] - paid.get(column, Decimal('0')) for column in PAYSLIP_AMOUNT_COLUMNS
+                    }
+                    if not any(adjustment.values()):
+                        continue
+                    adjustment_rows.append({
+                        **self._payslip_row(payroll_run, {'employee_id': employee.id, **adjustment}),
+                        'is_adjustment': True
+                    })
+                    adjusted_employees.append(employee)
+            
+            adjustment_totals = summarize(adjustment_rows)
+            if adjustment_rows:
+                await self._persist_payslip_chunk(db, payroll_run, adjusted_employees, adjustment_rows)
+                payroll_run.total_gross_pay += adjustment_totals['total_gross_pay']
+                payroll_run.total_net_pay += adjustment_totals['total_net_pay']
+                payroll_run.total_taxes += adjustment_totals['total_taxes']
+            
+            payroll_run.recomputed_at = recomputed_at
+            await db.commit()
+        except Exception:
+            # Releases the run row lock along with the unfinished adjustments
+            await db.rollback()
+            raise
+        
+        return {
+            "payroll_run_id": payroll_run_id,
+            "employees_recalculated": len(employee_ids),
+            "adjustments": len(adjustment_rows),
+            "adjustment_gross_pay": float(adjustment_totals['total_gross_pay']),
+            "adjustment_net_pay": float(adjustment_totals['total_net_pay']),
+            "adjustment_taxes": float(adjustment_totals['total_taxes']),
+            "total_gross_pay": float(payroll_run.total_gross_pay),
+            "total_net_pay": float(payroll_run.total_net_pay),
+            "total_taxes": float(payroll_run.total_taxes)
+        }
+    
+    async def preview_payroll(
         self,
         db: AsyncSession,
-        employee: Employee,
-        payroll_run: PayrollRun,
-        tax_config: TaxConfiguration
-    ) -> Payslip:
-        """Process payroll for a single employee"""
-        # Get approved timesheets for the pay period
-        timesheets_result = await db.execute(
-            select(Timesheet).where(
+        org_id: int,
+        pay_period_start: datetime,
+        pay_period_end: datetime,
+        pay_date: datetime
+    ) -> Dict[str, Any]:
+        """Calculate the register a run for this period would produce, without writing anything.
+        
+        Uses the same set-based loads and engine as process_payroll, against a PayrollRun that is
+        never added to the session, so no run, payslips, outbox events or YTD wages are created.
+        """
+        if pay_period_end < pay_period_start:
+            raise ValueError("Pay period end must not be before its start")
+        
+        payroll_run = PayrollRun(
+            org_id=org_id,
+            pay_period_start=pay_period_start,
+            pay_period_end=pay_period_end,
+            pay_date=pay_date
+        )
+        tax_config = await self._get_tax_config(db, org_id)
+        
+        employees_result = await db.execute(
+            select(Employee).where(
                 and_(
-                    Timesheet.employee_id == employee.id,
-                    Timesheet.status == TimesheetStatus.APPROVED,
-                    Timesheet.week_start_date >= payroll_run.pay_period_start,
-                    Timesheet.week_end_date <= payroll_run.pay_period_end
+                    Employee.org_id == org_id,
+                    Employee.is_active == True
                 )
-            )
+            ).order_by(Employee.id)
         )
-        timesheets = timesheets_result.scalars().all()
-        
-        # Calculate total hours
-        total_regular_hours = Decimal('0')
-        total_overtime_hours = Decimal('0')
-        
-        for timesheet in timesheets:
-            total_regular_hours += timesheet.total_hours - timesheet.overtime_hours
-            total_overtime_hours += timesheet.overtime_hours
-        
-        # Calculate gross pay
-        if employee.salary_type.value == 'hourly':
-            regular_pay = total_regular_hours * employee.hourly_rate
-            overtime_pay = total_overtime_hours * employee.hourly_rate * Decimal('1.5')
-        else:
-            # Fixed salary - calculate based on pay period
-            days_in_period = (payroll_run.pay_period_end - payroll_run.pay_period_start).days + 1
-            regular_pay = (employee.base_salary / Decimal('365')) * Decimal(str(days_in_period))
-            overtime_pay = Decimal('0')
+        employees = employees_result.scalars().all()
         
-        gross_pay = regular_pay + overtime_pay
+        tax_rates = tax_config_snapshot(tax_config)
+        days_in_period = (pay_period_end - pay_period_start).days + 1
+        batch_size = calculation_batch_size()
         
-        # Calculate taxes and deductions
-        tax_calculations = self.tax_service.calculate_taxes(
-            gross_pay=gross_pay,
-            tax_config=tax_config,
-            employee=employee
-        )
+        register = []
+        for batch_start in range(0, len(employees), batch_size):
+            batch = employees[batch_start:batch_start + batch_size]
+            pay_results = await self._calculate_batch(db, payroll_run, tax_rates, pay_date.year, days_in_period, batch)
+            for employee, pay in zip(batch, pay_results):
+                register.append({
+                    **pay,
+                    'employee_number': employee.employee_id,
+                    'employee_name': f"{employee.first_name} {employee.last_name}"
+                })
         
-        # Create payslip
-        payslip = Payslip(
-            employee_id=employee.id,
-            payroll_run_id=payroll_run.id,
-            pay_period_start=payroll_run.pay_period_start,
-            pay_period_end=payroll_run.pay_period_end,
-            pay_date=payroll_run.pay_date,
-            regular_hours=total_regular_hours,
-            overtime_hours=total_overtime_hours,
-            regular_pay=regular_pay,
-            overtime_pay=overtime_pay,
-            gross_pay=gross_pay,
-            federal_tax=tax_calculations['federal_tax'],
-            state_tax=tax_calculations['state_tax'],
-            social_security=tax_calculations['social_security'],
-            medicare=tax_calculations['medicare'],
-            total_deductions=tax_calculations['total_deductions'],
-            net_pay=tax_calculations['net_pay']
+        totals = summarize(register)
+        return {
+            "org_id": org_id,
+            "pay_period_start": pay_period_start,
+            "pay_period_end": pay_period_end,
+            "pay_date": pay_date,
+            "total_employees": len(register),
+            "total_gross_pay": float(totals['total_gross_pay']),
+            "total_net_pay": float(totals['total_net_pay']),
+            "total_taxes": float(totals['total_taxes']),
+            "employees": register
+        }
+    
+    @staticmethod
+    def _claim_condition(claim_token: Optional[str]):
+        if claim_token is None:
+            return PayrollRun.claim_token.is_(None)
+        return PayrollRun.claim_token == claim_token
+    
+    async def _check_claim(self, db: AsyncSession, payroll_run_id: int, claim_token: Optional[str]):
+        """Lock the run for the current transaction; raise if another claim has taken it over"""
+        result = await db.execute(
+            select(PayrollRun.claim_token).where(PayrollRun.id == payroll_run_id).with_for_update()
         )
+        if result.scalar_one_or_none() != claim_token:
+            raise PayrollClaimLostException(f"Payroll run {payroll_run_id} was taken over by another worker")
+    
+    async def _get_tax_config(self, db: AsyncSession, org_id: int) -> TaxConfiguration:
+        """The organization's active tax configuration"""
+        tax_config_result = await db.execute(
+            select(TaxConfiguration).where(
+                and_(
+                    TaxConfiguration.org_id == org_id,
+                    TaxConfiguration.is_active == True
+                )
+            )
+        )
+        tax_config = tax_config_result.scalar_one_or_none()
         
-        db.add(payslip)
-        await db.commit()
-        await db.refresh(payslip)
-        
-        # Generate PDF payslip
-        await self._generate_payslip_pdf(db, payslip, employee)
+        if not tax_config:
+            raise ValueError("Tax configuration not found for organization")
+        return tax_config
+    
+    async def _calculate_batch(
+        self,
+        db: AsyncSession,
+        payroll_run: PayrollRun,
+        tax_rates: TaxConfigSnapshot,
+        tax_year: int,
+        days_in_period: int,
+        employees: Sequence[Employee],
+        paid_gross: Optional[Dict[int, Decimal]] = None
+    ) -> List[Dict[str, Any]]:
+        """Calculate pay for a batch of employees, in order (reads only).
         
-        # Send payment if configured
-        if employee.bank_account_id:
-            await self._process_payment(db, payslip, employee)
+        paid_gross is gross pay the run has already paid (when recomputing), which is taken out of
+        the employees' YTD wages so it is not counted twice.
+        """
+        # Load the batch's approved timesheets in one pass instead of one query per employee
+        employee_ids = [employee.id for employee in employees]
+        timesheets_by_employee = await self._load_timesheets_by_employee(db, payroll_run, employee_ids)
+        ytd_by_employee = await ytd_wage_service.load(db, employee_ids, tax_year)
+        for employee_id, gross_pay in (paid_gross or {}).items():
+            ytd_by_employee[employee_id] = ytd_by_employee.get(employee_id, Decimal('0')) - gross_pay
+        return await calculate_payslips(
+            [
+                employee_snapshot(
+                    employee,
+                    timesheets_by_employee.get(employee.id, []),
+                    ytd_by_employee.get(employee.id, Decimal('0'))
+                )
+                for employee in employees
+            ],
+            tax_rates,
+            days_in_period,
+            tax_year
+        )
+    
+    async def _persist_payslip_chunk(
+        self,
+        db: AsyncSession,
+        payroll_run: PayrollRun,
+        employees: Sequence[Employee],
+        payslip_rows: Sequence[Dict[str, Any]]
+    ):
+        """Insert a chunk's payslips, their outbox events and YTD wage updates (no commit)"""
+        payslip_ids = await self._bulk_insert_payslips(db, payslip_rows)
+        await ytd_wage_service.add(
+            db,
+            payroll_run.pay_date.year,
+            {row['employee_id']: row['gross_pay'] for row in payslip_rows}
+        )
         
-        return payslip
+        outbox_events = []
+        for employee, row in zip(employees, payslip_rows):
+            payslip_id = payslip_ids[employee.id]
+            outbox_events.append({
+                'payroll_run_id': payroll_run.id,
+                'payslip_id': payslip_id,
+                'event_type': OutboxEventType.PAYSLIP_PDF
+            })
+            # Adjustments that reduce pay are recovered outside payroll, not paid out
+            if employee.bank_account_id and row['net_pay'] > 0:
+                outbox_events.append({
+                    'payroll_run_id': payroll_run.id,
+                    'payslip_id': payslip_id,
+                    'event_type': OutboxEventType.PAYMENT
+                })
+        await outbox_service.enqueue(db, outbox_events)
     
-    async def _generate_payslip_pdf(self, db: AsyncSession, payslip: Payslip, employee: Employee):
-        """Generate PDF payslip and upload to S3"""
-        try:
-            pdf_url = await self.pdf_service.generate_payslip_pdf(payslip, employee)
-            
-            payslip.pdf_url = pdf_url
-            payslip.pdf_generated_at = datetime.utcnow()
-            await db.commit()
-            
-            # Send email notification
-            await self.email_service.send_payslip_notification(
-                employee.email,
-                employee.first_name,
-                pdf_url,
-                payslip.pay_date
+    async def _sum_payslips_by_employee(
+        self,
+        db: AsyncSession,
+        payroll_run_id: int,
+        employee_ids: Sequence[int]
+    ) -> Dict[int, Dict[str, Decimal]]:
+        """Amounts a run has paid each employee so far, over its payslips and adjustments"""
+        result = await db.execute(
+            select(
+                Payslip.employee_id,
+                *[func.sum(getattr(Payslip, column)).label(column) for column in PAYSLIP_AMOUNT_COLUMNS]
             )
-            
-        except Exception as e:
-            print(f"Error generating payslip PDF: {e}")
+            .where(
+                and_(
+                    Payslip.payroll_run_id == payroll_run_id,
+                    Payslip.employee_id.in_(employee_ids)
+                )
+            )
+            .group_by(Payslip.employee_id)
+        )
+        return {
+            row.employee_id: {column: Decimal(getattr(row, column) or 0) for column in PAYSLIP_AMOUNT_COLUMNS}
+            for row in result.all()
+        }
     
-    async def _process_payment(self, db: AsyncSession, payslip: Payslip, employee: Employee):
-        """Process payment to employee"""
-        try:
-            # Use Plaid for payment processing
-            payment_result = await self.payment_service.send_payment_via_plaid(
-                amount=payslip.net_pay,
-                employee_id=employee.id,
-                description=f"Payroll payment for {payslip.pay_period_start.strftime('%Y-%m-%d')} to {payslip.pay_period_end.strftime('%Y-%m-%d')}",
-                db=db
+    async def _count_payslips(self, db: AsyncSession, payroll_run_id: int) -> int:
+        """Number of payslips already written for a run"""
+        result = await db.execute(
+            select(func.count(Payslip.id)).where(Payslip.payroll_run_id == payroll_run_id)
+        )
+        return result.scalar_one()
+    
+    async def _load_timesheets_by_employee(
+        self,
+        db: AsyncSession,
+        payroll_run: PayrollRun,
+        employee_ids: Sequence[int]
+    ) -> Dict[int, List[Timesheet]]:
+        """Load approved timesheets for the pay period, grouped by employee id"""
+        timesheets_by_employee: Dict[int, List[Timesheet]] = defaultdict(list)
+        
+        for start in range(0, len(employee_ids), TIMESHEET_PREFETCH_CHUNK_SIZE):
+            chunk = employee_ids[start:start + TIMESHEET_PREFETCH_CHUNK_SIZE]
+            timesheets_result = await db.execute(
+                select(Timesheet).where(
+                    and_(
+                        Timesheet.employee_id.in_(chunk),
+                        Timesheet.status == TimesheetStatus.APPROVED,
+                        Timesheet.week_start_date >= payroll_run.pay_period_start,
+                        Timesheet.week_end_date <= payroll_run.pay_period_end
+                    )
+                )
             )
-            
-            payslip.payment_method = payment_result['method']
-            payslip.payment_reference = payment_result.get('payment_id') or payment_result.get('reference')
-            payslip.payment_status = payment_result['status']
-            
-            await db.commit()
-            
-        except Exception as e:
-            logger.error(f"Error processing payment: {e}")
-            # Don't fail the entire payroll process if payment fails
-            payslip.payment_method = 'failed'
-            payslip.payment_status = 'failed'
-            await db.commit()
+            for timesheet in timesheets_result.scalars().all():
+                timesheets_by_employee[timesheet.employee_id].append(timesheet)
+        
+        return timesheets_by_employee
+    
+    def _payslip_row(self, payroll_run: PayrollRun, pay: Dict[str, Any]) -> Dict[str, Any]:
+        """Payslip column values from the engine's result for one employee"""
+        return {
+            **pay,
+            'payroll_run_id': payroll_run.id,
+            'pay_period_start': payroll_run.pay_period_start,
+            'pay_period_end': payroll_run.pay_period_end,
+            'pay_date': payroll_run.pay_date,
+            'payment_status': PaymentStatus.PENDING
+        }
+    
+    async def _bulk_insert_payslips(
+        self,
+        db: AsyncSession,
+        payslip_rows: Sequence[Dict[str, Any]]
+    ) -> Dict[int, int]:
+        """Insert payslip rows with chunked multi-row INSERTs and return payslip ids keyed by employee id.
+        
+        The caller owns the transaction; nothing is committed here. Rows must be for distinct employees;
+        an employee's newest payslip in the run (the one just inserted) is the one returned.
+        """
+        if not payslip_rows:
+            return {}
+        
+        for start in range(0, len(payslip_rows), PAYSLIP_INSERT_CHUNK_SIZE):
+            chunk = payslip_rows[start:start + PAYSLIP_INSERT_CHUNK_SIZE]
+            await db.execute(insert(Payslip).values(list(chunk)))
+        
+        # One lookup for the generated ids instead of a refresh per row
+        payroll_run_ids = {row['payroll_run_id'] for row in payslip_rows}
+        employee_ids = [row['employee_id'] for row in payslip_rows]
+        ids_result = await db.execute(
+            select(Payslip.employee_id, func.max(Payslip.id)).where(
+                and_(
+                    Payslip.payroll_run_id.in_(payroll_run_ids),
+                    Payslip.employee_id.in_(employee_ids)
+                )
+            ).group_by(Payslip.employee_id)
+        )
+        return {employee_id: payslip_id for employee_id, payslip_id in ids_result.all()}
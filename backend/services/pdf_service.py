@@ -3,79 +3,88 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-import boto3
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from datetime import datetime
 from decimal import Decimal
-from typing import Any
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from backend.config import settings
+from backend.services.aws_clients import aws_executor, s3_client
 from backend.orm_models import Payslip, Employee
+from backend.utils.helpers import available_cores
 
-class PDFService:
-    def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.S3_REGION
-        )
-        self.bucket_name = settings.S3_BUCKET_NAME
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_size = 0
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Process pool for ReportLab rendering, created on first use"""
+    global _render_pool, _render_pool_size
+    if _render_pool is None:
+        _render_pool_size = settings.PDF_RENDER_WORKERS or available_cores()
+        _render_pool = ProcessPoolExecutor(max_workers=_render_pool_size)
+    return _render_pool
+
+def shutdown_render_pool():
+    """Stop the rendering processes (called on application shutdown)"""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+def payslip_snapshot(payslip: Payslip, employee: Employee) -> Dict[str, Any]:
+    """Picklable copy of the fields a payslip PDF needs"""
+    return {
+        'payslip': {
+            'id': payslip.id,
+            'pay_period_start': payslip.pay_period_start,
+            'pay_period_end': payslip.pay_period_end,
+            'pay_date': payslip.pay_date,
+            'regular_hours': payslip.regular_hours,
+            'overtime_hours': payslip.overtime_hours,
+            'regular_pay': payslip.regular_pay,
+            'overtime_pay': payslip.overtime_pay,
+            'gross_pay': payslip.gross_pay,
+            'federal_tax': payslip.federal_tax,
+            'state_tax': payslip.state_tax,
+            'social_security': payslip.social_security,
+            'medicare': payslip.medicare,
+            'total_deductions': payslip.total_deductions,
+            'net_pay': payslip.net_pay,
+        },
+        'employee': {
+            'id': employee.id,
+            'employee_id': employee.employee_id,
+            'first_name': employee.first_name,
+            'last_name': employee.last_name,
+            'email': employee.email,
+            'department': employee.department,
+            'position': employee.position,
+        },
+    }
+
+class PayslipTemplate:
+    """Styles, column widths and table styles shared by every payslip.
     
-    async def generate_payslip_pdf(self, payslip: Payslip, employee: Employee) -> str:
-        """Generate payslip PDF and upload to S3 (main folder)"""
-        
-        # Create PDF in memory
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
+    These are identical for all payslips, so they are built once per process and only the
+    variable cells are produced per payslip.
+    """
+    
+    def __init__(self):
         styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        title_style = ParagraphStyle(
+        self.title_style = ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=18,
             spaceAfter=30,
             alignment=1  # Center alignment
         )
-        story.append(Paragraph("PAYSLIP", title_style))
-        
-        # Employee Information
-        emp_info = [
-            ['Employee Information', ''],
-            ['Name:', f"{employee.first_name} {employee.last_name}"],
-            ['Employee ID:', employee.employee_id],
-            ['Email:', employee.email],
-            ['Department:', employee.department or 'N/A'],
-            ['Position:', employee.position or 'N/A'],
-        ]
-        
-        emp_table = Table(emp_info, colWidths=[2*inch, 4*inch])
-        emp_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
         
-        story.append(emp_table)
-        story.append(Spacer(1, 20))
+        self.info_col_widths = [2*inch, 4*inch]
+        self.earnings_col_widths = [3*inch, 2*inch]
         
-        # Pay Period Information
-        pay_info = [
-            ['Pay Period Information', ''],
-            ['Pay Period:', f"{payslip.pay_period_start.strftime('%Y-%m-%d')} to {payslip.pay_period_end.strftime('%Y-%m-%d')}"],
-            ['Pay Date:', payslip.pay_date.strftime('%Y-%m-%d')],
-            ['Regular Hours:', f"{payslip.regular_hours:.2f}"],
-            ['Overtime Hours:', f"{payslip.overtime_hours:.2f}"],
-        ]
-        
-        pay_table = Table(pay_info, colWidths=[2*inch, 4*inch])
-        pay_table.setStyle(TableStyle([
+        # Used by both the employee and the pay period tables
+        self.info_table_style = TableStyle([
             ('BACKGROUND', (0, 0), (1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
@@ -84,30 +93,9 @@ class PDFService:
             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(pay_table)
-        story.append(Spacer(1, 20))
-        
-        # Earnings and Deductions
-        earnings_data = [
-            ['Earnings', 'Amount'],
-            ['Regular Pay', f"${payslip.regular_pay:.2f}"],
-            ['Overtime Pay', f"${payslip.overtime_pay:.2f}"],
-            ['Gross Pay', f"${payslip.gross_pay:.2f}"],
-            ['', ''],
-            ['Deductions', 'Amount'],
-            ['Federal Tax', f"${payslip.federal_tax:.2f}"],
-            ['State Tax', f"${payslip.state_tax:.2f}"],
-            ['Social Security', f"${payslip.social_security:.2f}"],
-            ['Medicare', f"${payslip.medicare:.2f}"],
-            ['Total Deductions', f"${payslip.total_deductions:.2f}"],
-            ['', ''],
-            ['Net Pay', f"${payslip.net_pay:.2f}"],
-        ]
+        ])
         
-        earnings_table = Table(earnings_data, colWidths=[3*inch, 2*inch])
-        earnings_table.setStyle(TableStyle([
+        self.earnings_table_style = TableStyle([
             ('BACKGROUND', (0, 0), (1, 0), colors.grey),
             ('BACKGROUND', (0, 5), (1, 5), colors.grey),
             ('TEXTCOLOR', (0, 0), (1, 0), colors.whitesmoke),
@@ -126,16 +114,141 @@ class PDFService:
             ('BACKGROUND', (0, 6), (-1, 10), colors.beige),
             ('BACKGROUND', (0, -1), (-1, -1), colors.lightgreen),
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        ])
+    
+    def render(self, snapshot: Dict[str, Any]) -> bytes:
+        """Render a payslip snapshot to PDF bytes"""
+        payslip = snapshot['payslip']
+        employee = snapshot['employee']
+        
+        # Create PDF in memory
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        story = [Paragraph("PAYSLIP", self.title_style)]
+        
+        # Employee Information
+        emp_info = [
+            ['Employee Information', ''],
+            ['Name:', f"{employee['first_name']} {employee['last_name']}"],
+            ['Employee ID:', employee['employee_id']],
+            ['Email:', employee['email']],
+            ['Department:', employee['department'] or 'N/A'],
+            ['Position:', employee['position'] or 'N/A'],
+        ]
+        story.append(Table(emp_info, colWidths=self.info_col_widths, style=self.info_table_style))
+        story.append(Spacer(1, 20))
         
-        story.append(earnings_table)
+        # Pay Period Information
+        pay_info = [
+            ['Pay Period Information', ''],
+            ['Pay Period:', f"{payslip['pay_period_start'].strftime('%Y-%m-%d')} to {payslip['pay_period_end'].strftime('%Y-%m-%d')}"],
+            ['Pay Date:', payslip['pay_date'].strftime('%Y-%m-%d')],
+            ['Regular Hours:', f"{payslip['regular_hours']:.2f}"],
+            ['Overtime Hours:', f"{payslip['overtime_hours']:.2f}"],
+        ]
+        story.append(Table(pay_info, colWidths=self.info_col_widths, style=self.info_table_style))
+        story.append(Spacer(1, 20))
+        
+        # Earnings and Deductions
+        earnings_data = [
+            ['Earnings', 'Amount'],
+            ['Regular Pay', f"${payslip['regular_pay']:.2f}"],
+            ['Overtime Pay', f"${payslip['overtime_pay']:.2f}"],
+            ['Gross Pay', f"${payslip['gross_pay']:.2f}"],
+            ['', ''],
+            ['Deductions', 'Amount'],
+            ['Federal Tax', f"${payslip['federal_tax']:.2f}"],
+            ['State Tax', f"${payslip['state_tax']:.2f}"],
+            ['Social Security', f"${payslip['social_security']:.2f}"],
+            ['Medicare', f"${payslip['medicare']:.2f}"],
+            ['Total Deductions', f"${payslip['total_deductions']:.2f}"],
+            ['', ''],
+            ['Net Pay', f"${payslip['net_pay']:.2f}"],
+        ]
+        story.append(Table(earnings_data, colWidths=self.earnings_col_widths, style=self.earnings_table_style))
         
         # Build PDF
         doc.build(story)
-        buffer.seek(0)
+        return buffer.getvalue()
+
+_payslip_template: Optional[PayslipTemplate] = None
+
+def get_payslip_template() -> PayslipTemplate:
+    """Per-process payslip template, built on first use"""
+    global _payslip_template
+    if _payslip_template is None:
+        _payslip_template = PayslipTemplate()
+    return _payslip_template
+
+def render_payslip_pdf(snapshot: Dict[str, Any]) -> bytes:
+    """Render a payslip snapshot to PDF bytes (runs in the render pool)"""
+    return get_payslip_template().render(snapshot)
+
+def _render_payslip_pdf_batch(snapshots: Sequence[Dict[str, Any]]) -> List[bytes]:
+    """Render several snapshots in one worker round trip"""
+    return [render_payslip_pdf(snapshot) for snapshot in snapshots]
+
+class PDFService:
+    def __init__(self):
+        self.bucket_name = settings.S3_BUCKET_NAME
+    
+    @property
+    def s3_client(self):
+        """Shared S3 client, created on first upload"""
+        return s3_client()
+    
+    async def render_payslip_pdfs(self, snapshots: Sequence[Dict[str, Any]]) -> List[bytes]:
+        """Render payslip snapshots in the process pool and return PDF bytes in input order"""
+        if not snapshots:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        pool = get_render_pool()
+        # A few chunks per core keeps every core busy without one IPC round trip per payslip
+        chunk_size = max(1, len(snapshots) // (_render_pool_size * 4))
+        chunks = [snapshots[start:start + chunk_size] for start in range(0, len(snapshots), chunk_size)]
+        
+        rendered = await asyncio.gather(*[
+            loop.run_in_executor(pool, _render_payslip_pdf_batch, chunk) for chunk in chunks
+        ])
+        return [pdf for chunk in rendered for pdf in chunk]
+    
+    async def generate_payslip_pdf(self, payslip: Payslip, employee: Employee) -> str:
+        """Generate payslip PDF and upload to S3 (main folder)"""
+        pdf_bytes, = await self.render_payslip_pdfs([payslip_snapshot(payslip, employee)])
+        return await self.upload_payslip_pdf(pdf_bytes, employee.id, payslip.id)
+    
+    async def generate_payslip_pdfs(
+        self,
+        items: Sequence[Tuple[Payslip, Employee]],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False
+    ) -> List[str]:
+        """Generate and upload PDFs for (payslip, employee) pairs; returns URLs in input order.
+        
+        At most `concurrency` uploads run at once. With return_exceptions, a failed upload is
+        returned in its payslip's place instead of failing the whole batch.
+        """
+        pdfs = await self.render_payslip_pdfs([payslip_snapshot(payslip, employee) for payslip, employee in items])
+        semaphore = asyncio.Semaphore(concurrency or len(items) or 1)
+        
+        async def upload(pdf_bytes: bytes, payslip: Payslip, employee: Employee) -> str:
+            async with semaphore:
+                return await self.upload_payslip_pdf(pdf_bytes, employee.id, payslip.id)
+        
+        return await asyncio.gather(*[
+            upload(pdf_bytes, payslip, employee) for pdf_bytes, (payslip, employee) in zip(pdfs, items)
+        ], return_exceptions=return_exceptions)
+    
+    async def upload_payslip_pdf(self, pdf_bytes: bytes, employee_id: int, payslip_id: int) -> str:
+        """Upload rendered PDF bytes to S3 and return a presigned URL"""
+        return await aws_executor.run(self._upload_payslip_pdf, pdf_bytes, employee_id, payslip_id)
+    
+    def _upload_payslip_pdf(self, pdf_bytes: bytes, employee_id: int, payslip_id: int) -> str:
+        buffer = BytesIO(pdf_bytes)
         
         # Upload to S3 in the main folder
-        file_key = f"payslip_{employee.id}_{payslip.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        file_key = f"payslip_{employee_id}_{payslip_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         self.bucket_name = 'adeptai-payroll'
         try:
             self.s3_client.upload_fileobj(
@@ -1,26 +1,65 @@
-import plaid
-from plaid.api import plaid_api
-from plaid.model.link_token_create_request import LinkTokenCreateRequest
-from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
-from plaid.model.products import Products
-from plaid.model.country_code import CountryCode
-from plaid.model.accounts_get_request import AccountsGetRequest
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.model.payment_initiation_payment_create_request import PaymentInitiationPaymentCreateRequest
-from plaid.model.payment_amount import PaymentAmount
-from plaid.model.payment_amount_currency import PaymentAmountCurrency
-from plaid.model.payment_initiation_recipient_create_request import PaymentInitiationRecipientCreateRequest
-from plaid.model.payment_initiation_recipient_get_request import PaymentInitiationRecipientGetRequest
-from plaid.model.payment_initiation_payment_get_request import PaymentInitiationPaymentGetRequest
+import threading
 from typing import Dict, Any, List, Optional
 from decimal import Decimal
 from backend.config import settings
+from backend.utils.executors import BlockingExecutor
 import logging
 
 logger = logging.getLogger(__name__)
 
+class AsyncPlaidApi:
+    """Async adapter around the blocking plaid_api.PlaidApi client.
+
+    `await adapter.accounts_get(request)` runs `PlaidApi.accounts_get(request)` on the executor's
+    threads with the executor's timeout, which is also passed to the HTTP request itself so a
+    timed-out call does not keep holding a pool thread.
+    """
+
+    def __init__(self, client: Any, executor: BlockingExecutor):
+        self.client = client
+        self.executor = executor
+
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+
+        async def call(*args, **kwargs):
+            if self.executor.timeout is not None:
+                kwargs.setdefault('_request_timeout', self.executor.timeout)
+            return await self.executor.run(method, *args, **kwargs)
+
+        return call
+
 class PlaidService:
+    """Plaid integration; the plaid SDK is imported and the client built on first use.
+
+    The SDK takes a noticeable share of startup time, and most processes (scripts, tests, the
+    payroll worker) never call Plaid, so nothing of it is loaded on import.
+    """
+
     def __init__(self):
+        self.executor = BlockingExecutor("plaid", settings.PLAID_MAX_WORKERS, settings.PLAID_TIMEOUT_SECONDS)
+        self._client: Optional[AsyncPlaidApi] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> AsyncPlaidApi:
+        """Async Plaid API client, created on first use"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @property
+    def api_error(self) -> type:
+        """plaid.ApiException, for except clauses (only evaluated once an exception is raised)"""
+        import plaid
+        return plaid.ApiException
+
+    def _create_client(self) -> AsyncPlaidApi:
+        import plaid
+        from plaid.api import plaid_api
+
         # Configure Plaid client
         configuration = plaid.Configuration(
             host=plaid.Environment.Sandbox if settings.PLAID_ENV == "sandbox" 
@@ -33,11 +72,18 @@ class PlaidService:
             }
         )
         
+        # One HTTP connection per executor thread so concurrent calls don't queue on urllib3
+        configuration.connection_pool_maxsize = settings.PLAID_MAX_WORKERS
+        
         api_client = plaid.ApiClient(configuration)
-        self.client = plaid_api.PlaidApi(api_client)
+        return AsyncPlaidApi(plaid_api.PlaidApi(api_client), self.executor)
     
     async def create_link_token(self, user_id: str, client_name: str = "Payroll System") -> str:
         """Create a link token for Plaid Link initialization"""
+        from plaid.model.link_token_create_request import LinkTokenCreateRequest
+        from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
+        from plaid.model.products import Products
+        from plaid.model.country_code import CountryCode
         try:
             request = LinkTokenCreateRequest(
                 user=LinkTokenCreateRequestUser(client_user_id=user_id),
@@ -47,7 +93,7 @@ class PlaidService:
                 language="en"
             )
             
-            response = self.client.link_token_create(request)
+            response = await self.client.link_token_create(request)
             return response.link_token
             
         except Exception as e:
@@ -56,9 +102,10 @@ class PlaidService:
     
     async def exchange_public_token(self, public_token: str) -> Dict[str, str]:
         """Exchange public token for access token"""
+        from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
         try:
             request = ItemPublicTokenExchangeRequest(public_token=public_token)
-            response = self.client.item_public_token_exchange(request)
+            response = await self.client.item_public_token_exchange(request)
             
             return {
                 'access_token': response.access_token,
@@ -71,9 +118,10 @@ class PlaidService:
     
     async def get_accounts(self, access_token: str) -> List[Dict[str, Any]]:
         """Get bank accounts for an access token"""
+        from plaid.model.accounts_get_request import AccountsGetRequest
         try:
             request = AccountsGetRequest(access_token=access_token)
-            response = self.client.accounts_get(request)
+            response = await self.client.accounts_get(request)
             
             accounts = []
             for account in response.accounts:
@@ -105,6 +153,7 @@ class PlaidService:
         address: Optional[Dict[str, str]] = None
     ) -> str:
         """Create a payment recipient"""
+        from plaid.model.payment_initiation_recipient_create_request import PaymentInitiationRecipientCreateRequest
         try:
             request = PaymentInitiationRecipientCreateRequest(
                 name=name,
@@ -112,7 +161,7 @@ class PlaidService:
                 address=address
             )
             
-            response = self.client.payment_initiation_recipient_create(request)
+            response = await self.client.payment_initiation_recipient_create(request)
             return response.recipient_id
             
         except Exception as e:
@@ -127,6 +176,9 @@ class PlaidService:
         currency: str = "USD"
     ) -> str:
         """Create a payment"""
+        from plaid.model.payment_initiation_payment_create_request import PaymentInitiationPaymentCreateRequest
+        from plaid.model.payment_amount import PaymentAmount
+        from plaid.model.payment_amount_currency import PaymentAmountCurrency
         try:
             payment_amount = PaymentAmount(
                 currency=PaymentAmountCurrency(currency),
@@ -139,7 +191,7 @@ class PlaidService:
                 amount=payment_amount
             )
             
-            response = self.client.payment_initiation_payment_create(request)
+            response = await self.client.payment_initiation_payment_create(request)
             return response.payment_id
             
         except Exception as e:
@@ -148,9 +200,10 @@ class PlaidService:
     
     async def get_payment_status(self, payment_id: str) -> Dict[str, Any]:
         """Get payment status"""
+        from plaid.model.payment_initiation_payment_get_request import PaymentInitiationPaymentGetRequest
         try:
             request = PaymentInitiationPaymentGetRequest(payment_id=payment_id)
-            response = self.client.payment_initiation_payment_get(request)
+            response = await self.client.payment_initiation_payment_get(request)
             
             return {
                 'payment_id': response.payment_id,
@@ -0,0 +1,244 @@
+import asyncio
+import contextlib
+import copy
+import email.generator
+import email.utils
+import io
+import re
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _PooledConnection:
+    """One authenticated SMTP session, used by a single task at a time"""
+
+    def __init__(self):
+        self.server: Optional[smtplib.SMTP] = None
+        self.messages_sent = 0
+        self.last_used = 0.0
+
+class SMTPConnectionPool:
+    """A small pool of long-lived, authenticated SMTP sessions.
+
+    smtplib is blocking, so every SMTP conversation runs on the pool's own threads (one per
+    connection) and never on the event loop. A session is opened (connect, STARTTLS, login)
+    the first time it is needed and then reused for many messages, so a burst of
+    notifications costs one TLS handshake per pooled connection rather than one per email.
+
+    When the server advertises PIPELINING (RFC 2920), each message's MAIL FROM, RCPT TO and
+    DATA commands are written as one batch and their replies read afterwards, so an envelope
+    costs one round trip instead of one per command.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        size: int = 4,
+        starttls: bool = True,
+        timeout: float = 30.0,
+        max_messages_per_connection: int = 100,
+        idle_check_seconds: float = 60.0
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_check_seconds = idle_check_seconds
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self._connections: Optional[asyncio.Queue] = None
+
+    def _get_connections(self) -> asyncio.Queue:
+        # Created lazily so the queue binds to the loop that actually sends mail
+        if self._connections is None:
+            self._connections = asyncio.Queue()
+            for _ in range(self.size):
+                self._connections.put_nowait(_PooledConnection())
+        return self._connections
+
+    async def send_message(self, msg: Message):
+        """Send one message over a pooled session; raises on failure"""
+        connections = self._get_connections()
+        connection = await connections.get()
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._send_blocking, connection, [msg])
+        finally:
+            connections.put_nowait(connection)
+
+    async def send_many(self, messages: Sequence[Message]) -> List[Optional[Exception]]:
+        """Send messages back to back over every pooled session.
+
+        Each connection keeps taking the next message from a shared queue until it is empty,
+        so sessions are never re-established between messages. Returns one entry per message,
+        in input order: None when it was accepted, otherwise the exception raised for it.
+
+        Envelopes are pipelined on servers that advertise PIPELINING; see _submit.
+        """
+        results: List[Optional[Exception]] = [None] * len(messages)
+        pending: asyncio.Queue = asyncio.Queue()
+        for index, msg in enumerate(messages):
+            pending.put_nowait((index, msg))
+
+        async def sender():
+            while True:
+                try:
+                    index, msg = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await self.send_message(msg)
+                except Exception as e:
+                    results[index] = e
+
+        await asyncio.gather(*[sender() for _ in range(min(self.size, len(messages)))])
+        return results
+
+    async def close(self):
+        """Quit every open session and stop the pool's threads"""
+        if self._connections is not None:
+            loop = asyncio.get_running_loop()
+            while not self._connections.empty():
+                connection = self._connections.get_nowait()
+                await loop.run_in_executor(self._executor, self._disconnect, connection)
+            self._connections = None
+        self._executor.shutdown(wait=False)
+
+    def _connect(self, connection: _PooledConnection):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if self.starttls:
+            server.starttls()
+            server.ehlo()
+        if self.username and self.password and server.has_extn('auth'):
+            server.login(self.username, self.password)
+        connection.server = server
+        connection.messages_sent = 0
+
+    def _disconnect(self, connection: _PooledConnection):
+        if connection.server is not None:
+            try:
+                connection.server.quit()
+            except Exception:
+                connection.server.close()
+            connection.server = None
+
+    def _ensure_connected(self, connection: _PooledConnection):
+        if connection.server is not None and connection.messages_sent >= self.max_messages_per_connection:
+            # Many relays cap messages per session; rotate before hitting the limit
+            self._disconnect(connection)
+        elif connection.server is not None and time.monotonic() - connection.last_used > self.idle_check_seconds:
+            try:
+                connection.server.noop()
+            except smtplib.SMTPException:
+                self._disconnect(connection)
+        if connection.server is None:
+            self._connect(connection)
+
+    def _send_blocking(self, connection: _PooledConnection, messages: Sequence[Message]):
+        for msg in messages:
+            self._ensure_connected(connection)
+            try:
+                self._submit(connection.server, msg)
+            except smtplib.SMTPServerDisconnected:
+                # The server dropped an idle session; reconnect once and retry
+                logger.info("SMTP session dropped, reconnecting")
+                with contextlib.suppress(Exception):
+                    connection.server.close()
+                connection.server = None
+                self._connect(connection)
+                self._submit(connection.server, msg)
+            except smtplib.SMTPResponseException as e:
+                # 421 means the server is closing the session; open a fresh one next time
+                if e.smtp_code == 421:
+                    self._disconnect(connection)
+                raise
+            connection.messages_sent += 1
+            connection.last_used = time.monotonic()
+
+    def _submit(self, server: smtplib.SMTP, msg: Message):
+        """Send one message, pipelining its envelope when the server allows it.
+
+        Falls back to smtplib's own send_message (one round trip per command) for servers
+        without PIPELINING, resent messages and internationalized addresses.
+        """
+        if not server.has_extn('pipelining') or msg.get_all('Resent-Date') is not None:
+            server.send_message(msg)
+            return
+
+        from_addr = email.utils.getaddresses([msg['Sender'] if 'Sender' in msg else msg['From']])[0][1]
+        to_addrs = [
+            address for _, address in email.utils.getaddresses(
+                [field for field in (msg['To'], msg['Bcc'], msg['Cc']) if field is not None]
+            )
+        ]
+        try:
+            ''.join([from_addr, *to_addrs]).encode('ascii')
+        except UnicodeEncodeError:
+            server.send_message(msg)
+            return
+
+        msg_copy = copy.copy(msg)
+        del msg_copy['Bcc']
+        with io.BytesIO() as buffer:
+            email.generator.BytesGenerator(buffer).flatten(msg_copy, linesep='\r\n')
+            data = buffer.getvalue()
+
+        mail_command = f"MAIL FROM:{smtplib.quoteaddr(from_addr)}"
+        if server.has_extn('size'):
+            mail_command += f" SIZE={len(data)}"
+        commands = [mail_command] + [f"RCPT TO:{smtplib.quoteaddr(address)}" for address in to_addrs] + ["DATA"]
+        server.send(("\r\n".join(commands) + "\r\n").encode('ascii'))
+
+        mail_code, mail_reply = server.getreply()
+        refused = {}
+        for address in to_addrs:
+            code, reply = server.getreply()
+            if code not in (250, 251):
+                refused[address] = (code, reply)
+        data_code, data_reply = server.getreply()
+
+        def abort():
+            if data_code == 354:
+                # The server is already reading the message; end it empty before resetting
+                server.send(b".\r\n")
+                server.getreply()
+            with contextlib.suppress(smtplib.SMTPServerDisconnected):
+                server.rset()
+
+        if mail_code == 421 or data_code == 421:
+            raise smtplib.SMTPResponseException(421, mail_reply if mail_code == 421 else data_reply)
+        if mail_code != 250:
+            abort()
+            raise smtplib.SMTPSenderRefused(mail_code, mail_reply, from_addr)
+        if len(refused) == len(to_addrs):
+            abort()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        if data_code != 354:
+            abort()
+            raise smtplib.SMTPDataError(data_code, data_reply)
+
+        body = re.sub(br'(?m)^\.', b'..', data)
+        if not body.endswith(b"\r\n"):
+            body += b"\r\n"
+        server.send(body + b".\r\n")
+        code, reply = server.getreply()
+        if code != 250:
+            if code == 421:
+                raise smtplib.SMTPResponseException(code, reply)
+            with contextlib.suppress(smtplib.SMTPServerDisconnected):
+                server.rset()
+            raise smtplib.SMTPDataError(code, reply)
+        if refused:
+            logger.warning(f"SMTP server refused recipients {sorted(refused)}")
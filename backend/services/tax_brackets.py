@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+FEDERAL_BRACKETS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'federal_tax_brackets.json'
+)
+
+# Employee.tax_status values that name an IRS filing status differently
+FILING_STATUS_ALIASES = {
+    'married': 'married_joint',
+    'married_filing_jointly': 'married_joint',
+    'married_filing_separately': 'married_separate',
+    'hoh': 'head_of_household',
+}
+
+def normalize_filing_status(tax_status: Optional[str]) -> str:
+    """Map an employee's tax_status to a filing status key of the bracket tables"""
+    status = (tax_status or 'single').strip().lower().replace(' ', '_').replace('-', '_')
+    return FILING_STATUS_ALIASES.get(status, status)
+
+@dataclass(frozen=True)
+class BracketTable:
+    """One year's brackets for one filing status, with the tax owed at each bracket's start.
+
+    thresholds[i] is where rates[i] starts and base_taxes[i] the total tax on income up to it,
+    so the tax on any income is base_taxes[i] + (income - thresholds[i]) * rates[i] for the
+    bracket i found by bisecting the thresholds.
+    """
+    thresholds: Tuple[Decimal, ...]
+    rates: Tuple[Decimal, ...]
+    base_taxes: Tuple[Decimal, ...]
+
+    @classmethod
+    def compile(cls, brackets) -> "BracketTable":
+        """Build a table from (threshold, rate) pairs in ascending order, starting at zero"""
+        thresholds = tuple(Decimal(threshold) for threshold, _ in brackets)
+        rates = tuple(Decimal(rate) for _, rate in brackets)
+        if not thresholds or thresholds[0] != 0:
+            raise ValueError("The first bracket must start at 0")
+        if any(lower >= upper for lower, upper in zip(thresholds, thresholds[1:])):
+            raise ValueError("Bracket thresholds must be strictly increasing")
+
+        base_taxes = [Decimal('0')]
+        for index in range(1, len(thresholds)):
+            base_taxes.append(base_taxes[-1] + (thresholds[index] - thresholds[index - 1]) * rates[index - 1])
+        return cls(thresholds=thresholds, rates=rates, base_taxes=tuple(base_taxes))
+
+    def tax(self, income: Decimal) -> Decimal:
+        """Federal income tax on a taxable income (unrounded)"""
+        if income <= 0:
+            return Decimal('0')
+        index = bisect_right(self.thresholds, income) - 1
+        return self.base_taxes[index] + (income - self.thresholds[index]) * self.rates[index]
+
+class FederalBracketRegistry:
+    """Compiled federal bracket tables keyed by (tax year, filing status), and the Social
+    Security wage base of each tax year.
+
+    Loaded once from the data file, at application startup or on first use. A tax year
+    after the latest one in the file uses the latest year's figures, with a warning logged
+    (once per year), so payroll keeps running until the data file is updated; a year
+    before the earliest one is an error.
+    """
+
+    def __init__(self, path: str = FEDERAL_BRACKETS_PATH):
+        self.path = path
+        self._tables: Optional[Dict[Tuple[int, str], BracketTable]] = None
+        self._wage_bases: Dict[int, Decimal] = {}
+        self._fallbacks_logged: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read and compile every table in the data file (replacing any loaded earlier).
+
+        Called on startup, so a data file without the current year is reported then rather
+        than by the first payroll run.
+        """
+        tables, wage_bases = self._read()
+        with self._lock:
+            self._tables, self._wage_bases = tables, wage_bases
+            self._fallbacks_logged.clear()
+        self.resolve_year(datetime.utcnow().year)
+
+    def _ensure_loaded(self):
+        if self._tables is None:
+            with self._lock:
+                if self._tables is None:
+                    self._tables, self._wage_bases = self._read()
+
+    @property
+    def tables(self) -> Dict[Tuple[int, str], BracketTable]:
+        self._ensure_loaded()
+        return self._tables
+
+    def _read(self) -> Tuple[Dict[Tuple[int, str], BracketTable], Dict[int, Decimal]]:
+        with open(self.path) as data_file:
+            data = json.load(data_file)
+
+        tables = {
+            (int(year), filing_status): BracketTable.compile(brackets)
+            for year, statuses in data['years'].items()
+            for filing_status, brackets in statuses.items()
+        }
+        wage_bases = {int(year): Decimal(amount) for year, amount in data['social_security_wage_base'].items()}
+        missing = {year for year, _ in tables} - set(wage_bases)
+        if missing:
+            raise ValueError(f"No Social Security wage base for {sorted(missing)}")
+        logger.info(f"Loaded {len(tables)} federal tax bracket tables from {self.path}")
+        return tables, wage_bases
+
+    def resolve_year(self, tax_year: int) -> int:
+        """The year of the data file whose figures apply to a tax year"""
+        self._ensure_loaded()
+        if tax_year in self._wage_bases:
+            return tax_year
+        latest_year = max(self._wage_bases)
+        if tax_year < latest_year:
+            raise ValueError(f"No federal tax data for {tax_year}")
+        if tax_year not in self._fallbacks_logged:
+            self._fallbacks_logged.add(tax_year)
+            logger.warning(
+                f"No federal tax brackets or wage base for {tax_year} in {self.path}; "
+                f"using {latest_year} until the data file is updated"
+            )
+        return latest_year
+
+    def get(self, tax_year: int, tax_status: Optional[str] = "single") -> BracketTable:
+        """The table for a tax year and an employee's tax_status"""
+        filing_status = normalize_filing_status(tax_status)
+        table = self.tables.get((self.resolve_year(tax_year), filing_status))
+        if table is None:
+            raise ValueError(f"No federal tax brackets for {tax_year} ({filing_status})")
+        return table
+
+    def social_security_wage_base(self, tax_year: int) -> Decimal:
+        """The most wages per employee that Social Security tax applies to in a tax year"""
+        # Resolved first: on first use resolve_year loads the data and replaces _wage_bases
+        year = self.resolve_year(tax_year)
+        return self._wage_bases[year]
+
+# Global instance
+federal_brackets = FederalBracketRegistry()
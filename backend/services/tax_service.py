@@ -1,15 +1,28 @@
+from datetime import datetime
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, Optional
 from backend.orm_models import Employee, TaxConfiguration
+from backend.services.tax_brackets import federal_brackets
+
+# Not indexed to inflation, unlike the Social Security wage base
+ADDITIONAL_MEDICARE_THRESHOLD = Decimal('200000')
+ADDITIONAL_MEDICARE_RATE = Decimal('0.009')
 
 class TaxService:
     def calculate_taxes(
         self,
         gross_pay: Decimal,
         tax_config: TaxConfiguration,
-        employee: Employee
+        employee: Employee,
+        ytd_gross: Decimal = Decimal('0'),
+        tax_year: Optional[int] = None
     ) -> Dict[str, Decimal]:
-        """Calculate all tax deductions for an employee"""
+        """Calculate all tax deductions for an employee.
+        
+        ytd_gross is the employee's gross pay earlier in tax_year, the calendar year of the pay
+        date (the current year if not given); the Social Security wage base and the additional
+        Medicare threshold apply to the year's wages, not the period's.
+        """
         
         # Federal tax calculation (simplified)
         federal_tax = gross_pay * tax_config.federal_tax_rate
@@ -17,18 +30,18 @@ class TaxService:
         # State tax calculation
         state_tax = gross_pay * tax_config.state_tax_rate
         
-        # Social Security tax (6.2% up to wage base limit)
-        social_security_wage_base = Decimal('160200')  # 2023 limit
-        social_security = min(gross_pay, social_security_wage_base) * tax_config.social_security_rate
+        # Social Security tax (6.2% up to the wage base for the year)
+        wage_base = federal_brackets.social_security_wage_base(tax_year or datetime.utcnow().year)
+        social_security_wages = max(Decimal('0'), min(gross_pay, wage_base - ytd_gross))
+        social_security = social_security_wages * tax_config.social_security_rate
         
         # Medicare tax (1.45% on all wages)
         medicare = gross_pay * tax_config.medicare_rate
         
-        # Additional Medicare tax (0.9% on wages over $200,000)
-        medicare_threshold = Decimal('200000')
-        if gross_pay > medicare_threshold:
-            additional_medicare = (gross_pay - medicare_threshold) * Decimal('0.009')
-            medicare += additional_medicare
+        # Additional Medicare tax (0.9% on the part of the year's wages over $200,000 paid this period)
+        additional_medicare_wages = ytd_gross + gross_pay - max(ytd_gross, ADDITIONAL_MEDICARE_THRESHOLD)
+        if additional_medicare_wages > 0:
+            medicare += additional_medicare_wages * ADDITIONAL_MEDICARE_RATE
         
         # Total deductions
         total_deductions = federal_tax + state_tax + social_security + medicare
@@ -48,36 +61,17 @@ class TaxService:
     def calculate_annual_taxes(
         self,
         annual_salary: Decimal,
-        tax_status: str = "single"
+        tax_status: str = "single",
+        tax_year: Optional[int] = None
     ) -> Dict[str, Decimal]:
-        """Calculate estimated annual taxes (simplified)"""
-        
-        # Federal tax brackets for 2023 (single filer)
-        federal_brackets = [
-            (Decimal('11000'), Decimal('0.10')),
-            (Decimal('44725'), Decimal('0.12')),
-            (Decimal('95375'), Decimal('0.22')),
-            (Decimal('182050'), Decimal('0.24')),
-            (Decimal('231250'), Decimal('0.32')),
-            (Decimal('578125'), Decimal('0.35')),
-            (float('inf'), Decimal('0.37'))
-        ]
-        
-        federal_tax = Decimal('0')
-        remaining_income = annual_salary
-        previous_bracket = Decimal('0')
+        """Calculate estimated annual taxes (simplified) for a tax year, by default the current one"""
+        tax_year = tax_year or datetime.utcnow().year
         
-        for bracket_limit, rate in federal_brackets:
-            if remaining_income <= 0:
-                break
-                
-            taxable_in_bracket = min(remaining_income, bracket_limit - previous_bracket)
-            federal_tax += taxable_in_bracket * rate
-            remaining_income -= taxable_in_bracket
-            previous_bracket = bracket_limit
+        # Federal tax from the compiled bracket table for the year and filing status
+        federal_tax = federal_brackets.get(tax_year, tax_status).tax(annual_salary)
         
         # Social Security and Medicare
-        social_security = min(annual_salary, Decimal('160200')) * Decimal('0.062')
+        social_security = min(annual_salary, federal_brackets.social_security_wage_base(tax_year)) * Decimal('0.062')
         medicare = annual_salary * Decimal('0.0145')
         
         return {
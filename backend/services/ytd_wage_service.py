@@ -0,0 +1,75 @@
+from typing import Dict, Sequence
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from backend.orm_models import EmployeeYTDWages
+
+# Upper bound on the number of ids sent in a single IN (...) clause
+YTD_CHUNK_SIZE = 1000
+
+class YTDWageService:
+    """Per-employee, per-tax-year gross wage accumulator.
+
+    Payroll reads an employee's year-to-date wages with one row lookup instead of summing
+    their earlier payslips, and adds each new payslip's gross pay in the same transaction
+    that inserts the payslip.
+    """
+
+    async def load(self, db: AsyncSession, employee_ids: Sequence[int], tax_year: int) -> Dict[int, Decimal]:
+        """Year-to-date gross wages keyed by employee id (employees without a row are omitted)"""
+        ytd_wages: Dict[int, Decimal] = {}
+        for start in range(0, len(employee_ids), YTD_CHUNK_SIZE):
+            chunk = employee_ids[start:start + YTD_CHUNK_SIZE]
+            result = await db.execute(
+                select(EmployeeYTDWages.employee_id, EmployeeYTDWages.gross_wages).where(
+                    and_(
+                        EmployeeYTDWages.employee_id.in_(chunk),
+                        EmployeeYTDWages.tax_year == tax_year
+                    )
+                )
+            )
+            for employee_id, gross_wages in result.all():
+                ytd_wages[employee_id] = Decimal(gross_wages)
+        return ytd_wages
+
+    async def add(self, db: AsyncSession, tax_year: int, wages: Dict[int, Decimal]):
+        """Add gross wages (which may be negative corrections) to employees' year-to-date totals.
+
+        A single upsert per chunk; nothing is committed here, so the totals move together
+        with the payslips that caused them.
+        """
+        await self._upsert(db, tax_year, wages, accumulate=True)
+
+    async def set(self, db: AsyncSession, tax_year: int, wages: Dict[int, Decimal]):
+        """Overwrite employees' year-to-date totals (used when rebuilding them from payslips)"""
+        await self._upsert(db, tax_year, wages, accumulate=False)
+
+    async def _upsert(self, db: AsyncSession, tax_year: int, wages: Dict[int, Decimal], accumulate: bool):
+        rows = [
+            {'employee_id': employee_id, 'tax_year': tax_year, 'gross_wages': gross_wages}
+            for employee_id, gross_wages in wages.items()
+        ]
+        dialect = db.get_bind().dialect.name
+
+        for start in range(0, len(rows), YTD_CHUNK_SIZE):
+            chunk = rows[start:start + YTD_CHUNK_SIZE]
+            if dialect == 'sqlite':
+                # Used by local and test databases
+                stmt = sqlite_insert(EmployeeYTDWages).values(chunk)
+                new_wages = stmt.excluded.gross_wages
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['employee_id', 'tax_year'],
+                    set_={'gross_wages': EmployeeYTDWages.gross_wages + new_wages if accumulate else new_wages}
+                )
+            else:
+                stmt = mysql_insert(EmployeeYTDWages).values(chunk)
+                new_wages = stmt.inserted.gross_wages
+                stmt = stmt.on_duplicate_key_update(
+                    gross_wages=EmployeeYTDWages.gross_wages + new_wages if accumulate else new_wages
+                )
+            await db.execute(stmt)
+
+# Global instance
+ytd_wage_service = YTDWageService()
@@ -1,12 +1,15 @@
 import pytest
+import pytest_asyncio
 import asyncio
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from backend.database import Base, get_db
 from main import app
-from backend.orm_models import Organization, Employee, UserRole, SalaryType
-from datetime import datetime
+from backend.orm_models import (
+    Organization, Employee, UserRole, SalaryType, TaxConfiguration, Timesheet, TimesheetStatus, PayrollRun
+)
+from datetime import datetime, timedelta
 from decimal import Decimal
 
 # Test database URL
@@ -38,6 +41,79 @@ async def db_session(setup_database):
     async with TestSessionLocal() as session:
         yield session
 
+@pytest_asyncio.fixture
+async def sqlite_session_factory(tmp_path):
+    """Session factory for a fresh SQLite database built from the models.
+
+    For service tests that need real queries and commits (several sessions see each
+    other's writes) but no MySQL server.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'payroll.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def sqlite_session(sqlite_session_factory):
+    """A session on the SQLite test database."""
+    async with sqlite_session_factory() as session:
+        yield session
+
+@pytest_asyncio.fixture
+async def sqlite_payroll_run(sqlite_session):
+    """A pending two-week payroll run for an organization of three hourly employees.
+
+    Each employee has two approved 40 hour timesheets in the period.
+    """
+    period_start = datetime(2024, 1, 1)
+    sqlite_session.add(Organization(id=1, name="Test Corp"))
+    sqlite_session.add(TaxConfiguration(
+        org_id=1,
+        federal_tax_rate=Decimal('0.2200'),
+        state_tax_rate=Decimal('0.0500'),
+        social_security_rate=Decimal('0.0620'),
+        medicare_rate=Decimal('0.0145'),
+        is_active=True
+    ))
+    for index in range(1, 4):
+        sqlite_session.add(Employee(
+            id=index,
+            org_id=1,
+            cognito_sub=f"test_user_{index}",
+            employee_id=f"EMP{index:03d}",
+            first_name="Jane",
+            last_name=f"Doe{index}",
+            email=f"jane.doe{index}@testcorp.com",
+            role=UserRole.EMPLOYEE,
+            salary_type=SalaryType.HOURLY,
+            base_salary=Decimal('50000.00'),
+            hourly_rate=Decimal('25.00'),
+            tax_status="single",
+            is_active=True
+        ))
+        for week in range(2):
+            week_start = period_start + timedelta(days=7 * week)
+            sqlite_session.add(Timesheet(
+                employee_id=index,
+                week_start_date=week_start,
+                week_end_date=week_start + timedelta(days=6),
+                total_hours=Decimal('40.00'),
+                overtime_hours=Decimal('0.00'),
+                status=TimesheetStatus.APPROVED,
+                approved_at=period_start
+            ))
+    payroll_run = PayrollRun(
+        id=1,
+        org_id=1,
+        pay_period_start=period_start,
+        pay_period_end=period_start + timedelta(days=13),
+        pay_date=period_start + timedelta(days=18)
+    )
+    sqlite_session.add(payroll_run)
+    await sqlite_session.commit()
+    return payroll_run
+
 @pytest.fixture
 async def override_get_db(db_session):
     """Override the get_db dependency."""
@@ -0,0 +1,30 @@
+import threading
+import pytest
+from backend.config import settings
+from backend.services.aws_clients import (
+    aws_executor, get_client, s3_client, cognito_client, shutdown_aws_clients
+)
+
+def test_clients_are_shared_per_service_and_region():
+    """Test that repeated lookups return the same boto3 client instead of building a new one."""
+    assert s3_client() is s3_client()
+    assert cognito_client() is cognito_client()
+    assert s3_client() is not cognito_client()
+    assert get_client('s3', 'eu-west-1') is not get_client('s3', 'us-east-2')
+    assert get_client('s3', 'eu-west-1').meta.region_name == 'eu-west-1'
+
+def test_clients_bound_each_attempt_with_botocore_timeouts():
+    """Test that AWS calls are bounded by the client's own timeouts, not by the executor."""
+    config = cognito_client().meta.config
+    assert config.connect_timeout == settings.AWS_CONNECT_TIMEOUT_SECONDS
+    assert config.read_timeout == settings.AWS_READ_TIMEOUT_SECONDS
+    assert aws_executor.timeout is None
+
+@pytest.mark.asyncio
+async def test_aws_executor_runs_again_after_shutdown():
+    """Test that a second application lifespan can use the executor after the first shut it down."""
+    assert await aws_executor.run(threading.current_thread) is not threading.current_thread()
+    shutdown_aws_clients()
+    thread = await aws_executor.run(threading.current_thread)
+    assert thread.name.startswith("aws")
+    shutdown_aws_clients()
@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+from decimal import Decimal
+from hypothesis import given, settings as hypothesis_settings, strategies as st
+from backend.services.batch_tax_service import BatchTaxService, from_cents, rate_units, round_half_even, to_cents
+from backend.services.payroll_engine import TaxConfigSnapshot
+from backend.services.tax_brackets import federal_brackets
+from backend.services.tax_service import TaxService
+
+# Up to $100M per payslip, well past the wage base and the additional Medicare threshold
+gross_cents = st.integers(min_value=0, max_value=10_000_000_000)
+# DECIMAL(5, 4) rates, in 1/10000ths
+rates = st.integers(min_value=0, max_value=10000).map(lambda units: Decimal(units).scaleb(-4))
+tax_years = st.sampled_from(sorted({tax_year for tax_year, _ in federal_brackets.tables}))
+
+@hypothesis_settings(max_examples=500, deadline=None)
+@given(
+    payslips=st.lists(st.tuples(gross_cents, gross_cents), min_size=1, max_size=50),
+    federal_rate=rates,
+    state_rate=rates,
+    social_security_rate=rates,
+    medicare_rate=rates,
+    tax_year=tax_years
+)
+def test_batch_taxes_match_decimal_tax_service(
+    payslips, federal_rate, state_rate, social_security_rate, medicare_rate, tax_year
+):
+    """Test that the vectorized calculator agrees with TaxService to the cent, given (gross, YTD gross) pairs."""
+    gross = [cents for cents, _ in payslips]
+    ytd = [ytd_cents for _, ytd_cents in payslips]
+    tax_config = TaxConfigSnapshot(
+        federal_tax_rate=federal_rate,
+        state_tax_rate=state_rate,
+        social_security_rate=social_security_rate,
+        medicare_rate=medicare_rate
+    )
+    batch = BatchTaxService().calculate_taxes_for_config(
+        np.array(gross, dtype=np.int64), tax_config, np.array(ytd, dtype=np.int64), tax_year
+    )
+
+    tax_service = TaxService()
+    for index, (cents, ytd_cents) in enumerate(payslips):
+        expected = tax_service.calculate_taxes(
+            from_cents(cents), tax_config, None, ytd_gross=from_cents(ytd_cents), tax_year=tax_year
+        )
+        for name, amount in expected.items():
+            assert from_cents(batch[name][index]) == amount, (name, cents, ytd_cents)
+
+@given(st.integers(min_value=-10**15, max_value=10**15))
+def test_round_half_even_matches_decimal_quantize(value):
+    """Test integer half-even rounding against Decimal.quantize, including negatives."""
+    expected = (Decimal(value) / 10000).quantize(Decimal('1'))
+    assert round_half_even(np.array([value], dtype=np.int64), 10000)[0] == int(expected)
+
+def test_rate_units_rejects_extra_precision():
+    """Test that rates finer than DECIMAL(5, 4) are rejected instead of silently rounded."""
+    assert rate_units(Decimal('0.0620')) == 620
+    with pytest.raises(ValueError):
+        rate_units(Decimal('0.06205'))
+
+@pytest.mark.parametrize("tax_year", [2023, 2024])
+def test_social_security_stops_at_wage_base(tax_year):
+    """Test that Social Security only applies to wages up to the tax year's base, across payslips."""
+    tax_config = TaxConfigSnapshot(
+        federal_tax_rate=Decimal('0'),
+        state_tax_rate=Decimal('0'),
+        social_security_rate=Decimal('0.0620'),
+        medicare_rate=Decimal('0.0145')
+    )
+    tax_service = TaxService()
+    wage_base = federal_brackets.social_security_wage_base(tax_year)
+
+    # Straddling the base: only the part below it is taxed
+    taxes = tax_service.calculate_taxes(
+        Decimal('10000.00'), tax_config, None, ytd_gross=wage_base - Decimal('4000.00'), tax_year=tax_year
+    )
+    assert taxes['social_security'] == Decimal('248.00')
+
+    # Past the base: none at all, while Medicare continues
+    taxes = tax_service.calculate_taxes(Decimal('10000.00'), tax_config, None, ytd_gross=wage_base, tax_year=tax_year)
+    assert taxes['social_security'] == Decimal('0.00')
+    assert taxes['medicare'] > 0
+
+def test_wage_base_follows_the_tax_year():
+    """Test that wages past the 2023 base are still taxed in 2024, whose base is higher."""
+    tax_config = TaxConfigSnapshot(
+        federal_tax_rate=Decimal('0'),
+        state_tax_rate=Decimal('0'),
+        social_security_rate=Decimal('0.0620'),
+        medicare_rate=Decimal('0')
+    )
+    ytd = np.array([to_cents(Decimal('165000.00'))], dtype=np.int64)
+    gross = np.array([to_cents(Decimal('5000.00'))], dtype=np.int64)
+    batch = BatchTaxService()
+
+    assert batch.calculate_taxes_for_config(gross, tax_config, ytd, 2023)['social_security'][0] == 0
+    # 168,600 - 165,000 = 3,600 taxable in 2024
+    assert batch.calculate_taxes_for_config(gross, tax_config, ytd, 2024)['social_security'][0] == 22320
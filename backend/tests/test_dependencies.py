@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import patch
+from starlette.requests import Request
+from backend import dependencies
+from backend.dependencies import get_current_user_info, get_current_user_profile
+
+def make_request(user_info, token="access-token"):
+    """A request as the auth middleware leaves it."""
+    request = Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/employees/",
+        "headers": [(b"authorization", f"Bearer {token}".encode())]
+    })
+    request.state.user = user_info
+    return request
+
+@pytest.mark.asyncio
+async def test_profile_is_fetched_once_per_user():
+    """Test that attributes missing from the token come from one cached GetUser call."""
+    claims = {"sub": "user-1", "email": "", "groups": ["admin"], "org_id": None}
+    profile = {"sub": "user-1", "email": "jane@example.com", "given_name": "Jane", "family_name": "Doe",
+               "groups": ["employee"], "org_id": "7"}
+    dependencies.user_profiles.clear()
+
+    with patch.object(dependencies.cognito_service, "get_user_info", return_value=profile) as get_user_info:
+        for _ in range(5):
+            request = make_request(claims)
+            user = await get_current_user_profile(request, await get_current_user_info(request))
+            assert user.org_id == "7" and user.email == "jane@example.com"
+            # Groups from the verified token take precedence
+            assert user.groups == ["admin"]
+        assert get_user_info.call_count == 1
+
+@pytest.mark.asyncio
+async def test_complete_claims_skip_cognito():
+    """Test that tokens carrying the org and email never call Cognito."""
+    claims = {"sub": "user-2", "email": "joe@example.com", "groups": ["employee"], "org_id": "3"}
+    with patch.object(dependencies.cognito_service, "get_user_info") as get_user_info:
+        request = make_request(claims)
+        user = await get_current_user_profile(request, await get_current_user_info(request))
+    assert user.org_id == "3"
+    get_user_info.assert_not_called()
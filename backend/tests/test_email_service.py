@@ -0,0 +1,121 @@
+import pytest
+import smtplib
+import socketserver
+import threading
+from email.message import EmailMessage
+from unittest.mock import MagicMock
+from backend.services.smtp_pool import SMTPConnectionPool, _PooledConnection
+from backend.services.email_service import EmailService
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue that accepts every message.
+
+    With server.pipelining set it advertises PIPELINING and holds back the replies to MAIL and
+    RCPT until DATA arrives, so a client that waits for each reply times out instead.
+    """
+
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b"220 localhost ready\r\n")
+        in_data = False
+        deferred = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.server.messages += 1
+                    self.wfile.write(b"250 OK\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"EHLO":
+                self.wfile.write(b"250-localhost\r\n250 PIPELINING\r\n" if self.server.pipelining else b"250 localhost\r\n")
+            elif command in (b"MAIL", b"RCPT") and self.server.pipelining:
+                deferred.append(b"250 OK\r\n")
+            elif command == b"DATA":
+                in_data = True
+                if deferred:
+                    self.server.pipelined_envelopes += 1
+                self.wfile.write(b"".join(deferred) + b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                deferred = []
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+@pytest.fixture
+def smtp_server():
+    """Run a local SMTP server that counts connections and messages."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = 0
+    server.pipelining = False
+    server.pipelined_envelopes = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.asyncio
+async def test_send_many_reuses_pooled_sessions(smtp_server):
+    """Test that a burst of emails is sent over at most one session per pooled connection."""
+    host, port = smtp_server.server_address
+    pool = SMTPConnectionPool(host, port, size=2, starttls=False)
+    email_service = EmailService(smtp_pool=pool)
+
+    results = await email_service.send_many([
+        {"email": f"employee{i}@example.com", "subject": "Payslip", "body": "Your payslip is ready"}
+        for i in range(20)
+    ])
+    await pool.close()
+
+    assert results == [None] * 20
+    assert smtp_server.messages == 20
+    assert smtp_server.connections <= 2
+
+@pytest.mark.asyncio
+async def test_envelopes_are_pipelined_when_advertised(smtp_server):
+    """Test that each message's MAIL, RCPT and DATA reach a PIPELINING server as one batch."""
+    smtp_server.pipelining = True
+    host, port = smtp_server.server_address
+    pool = SMTPConnectionPool(host, port, size=1, starttls=False, timeout=5)
+    email_service = EmailService(smtp_pool=pool)
+
+    results = await email_service.send_many([
+        {"email": f"employee{i}@example.com", "subject": "Payslip", "body": ".leading dot\nYour payslip is ready"}
+        for i in range(5)
+    ])
+    await pool.close()
+
+    assert results == [None] * 5
+    assert smtp_server.messages == 5
+    assert smtp_server.pipelined_envelopes == 5
+    assert smtp_server.connections == 1
+
+def test_dropped_session_is_closed_before_reconnecting():
+    """Test that the socket of a session the server dropped is closed, not leaked, when reconnecting."""
+    pool = SMTPConnectionPool("localhost", 25, size=1, starttls=False)
+    dropped = MagicMock()
+    dropped.has_extn.return_value = False
+    dropped.send_message.side_effect = smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+    fresh = MagicMock()
+    fresh.has_extn.return_value = False
+    connection = _PooledConnection()
+    connection.server = dropped
+
+    def connect(conn):
+        conn.server = fresh
+        conn.messages_sent = 0
+    pool._connect = connect
+
+    connection.last_used = float("inf")
+    pool._send_blocking(connection, [EmailMessage()])
+
+    dropped.close.assert_called_once()
+    fresh.send_message.assert_called_once()
+    assert connection.server is fresh
@@ -0,0 +1,63 @@
+import asyncio
+import time
+import pytest
+from backend.services.plaid_service import AsyncPlaidApi
+from backend.utils.executors import BlockingExecutor
+
+@pytest.fixture
+def executor():
+    executor = BlockingExecutor("test", max_workers=1, timeout=0.5)
+    yield executor
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_call_running_past_the_timeout_raises(executor):
+    """Test that a call still running when the timeout expires raises asyncio.TimeoutError."""
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run(time.sleep, 1.0)
+    assert await executor.run(time.sleep, 0.5, timeout=1.0) is None
+
+@pytest.mark.asyncio
+async def test_time_queued_for_a_thread_does_not_count(executor):
+    """Test that a call waiting behind a busy thread gets its whole timeout once it starts."""
+    first, second = await asyncio.gather(
+        executor.run(lambda: time.sleep(0.3) or "first"),
+        executor.run(lambda: time.sleep(0.3) or "second")
+    )
+    assert (first, second) == ("first", "second")
+
+@pytest.mark.asyncio
+async def test_cancelled_call_never_starts(executor):
+    """Test that cancelling a call still queued for a thread keeps it from running."""
+    started = []
+    blocker = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+    queued = asyncio.ensure_future(executor.run(started.append, "queued"))
+    await asyncio.sleep(0.05)
+    queued.cancel()
+    await blocker
+
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert started == []
+
+class RecordingPlaidApi:
+    def __init__(self):
+        self.calls = []
+
+    def accounts_get(self, request, **kwargs):
+        self.calls.append((request, kwargs))
+        return {'accounts': []}
+
+@pytest.mark.asyncio
+async def test_plaid_calls_carry_the_executor_timeout(executor):
+    """Test that AsyncPlaidApi passes the executor timeout on as the HTTP request timeout."""
+    api = RecordingPlaidApi()
+    plaid = AsyncPlaidApi(api, executor)
+
+    assert await plaid.accounts_get("request") == {'accounts': []}
+    await plaid.accounts_get("request", _request_timeout=2.0)
+    no_timeout = BlockingExecutor("no-timeout", max_workers=1)
+    await AsyncPlaidApi(api, no_timeout).accounts_get("request")
+    no_timeout.shutdown()
+
+    assert [kwargs for _, kwargs in api.calls] == [{'_request_timeout': 0.5}, {'_request_timeout': 2.0}, {}]
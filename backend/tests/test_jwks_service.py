@@ -0,0 +1,92 @@
+import asyncio
+import json
+import time
+import threading
+import jwt
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from backend.services.jwks_service import JWKSKeyStore
+
+def make_signing_key(kid: str):
+    """An RSA private key and its public JWK."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk
+
+class _JWKSHandler(BaseHTTPRequestHandler):
+    """Serves the server's current key set, slowly, counting requests"""
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(0.1)
+        body = json.dumps({"keys": self.server.keys}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def jwks_server():
+    """Run a local JWKS endpoint whose keys the test can rotate."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _JWKSHandler)
+    server.requests = 0
+    server.keys = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def store_for(server, ttl=3600.0, min_refresh=0.0):
+    host, port = server.server_address
+    return JWKSKeyStore(f"http://{host}:{port}/jwks.json", ttl=ttl, min_refresh=min_refresh, timeout=5.0)
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refreshes_once_for_concurrent_requests(jwks_server):
+    """Test that a key rotation is picked up with a single fetch however many requests miss."""
+    old_private, old_jwk = make_signing_key("old")
+    jwks_server.keys = [old_jwk]
+    store = store_for(jwks_server)
+    await store.refresh()
+    assert jwks_server.requests == 1
+
+    new_private, new_jwk = make_signing_key("new")
+    jwks_server.keys = [old_jwk, new_jwk]
+    keys = await asyncio.gather(*[store.get_key("new") for _ in range(20)])
+
+    assert jwks_server.requests == 2
+    assert all(key is keys[0] for key in keys)
+    token = jwt.encode({"sub": "user"}, new_private, algorithm="RS256", headers={"kid": "new"})
+    assert jwt.decode(token, keys[0], algorithms=["RS256"])["sub"] == "user"
+
+@pytest.mark.asyncio
+async def test_forged_kids_do_not_hammer_the_endpoint(jwks_server):
+    """Test that unknown kids trigger at most one refresh per min_refresh interval."""
+    _, jwk = make_signing_key("real")
+    jwks_server.keys = [jwk]
+    store = store_for(jwks_server, min_refresh=60.0)
+
+    for index in range(10):
+        assert await store.get_key(f"forged-{index}") is None
+    assert jwks_server.requests == 1
+    assert await store.get_key("real") is not None
+
+@pytest.mark.asyncio
+async def test_stale_keys_keep_serving_during_refresh(jwks_server):
+    """Test that an expired cache returns the cached key at once and refreshes in the background."""
+    _, jwk = make_signing_key("current")
+    jwks_server.keys = [jwk]
+    store = store_for(jwks_server, ttl=0.0)
+    await store.refresh()
+
+    started = time.monotonic()
+    assert await store.get_key("current") is not None
+    assert time.monotonic() - started < 0.05
+    await store.refresh()
+    assert jwks_server.requests == 2
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+import pytest
+from cryptography.fernet import Fernet
+from backend import orm_models
+from backend.config import settings
+from backend.scripts.profile_imports import PACKAGE_ROOT
+
+def test_app_import_does_not_load_external_sdks():
+    """Test that importing the app neither loads the AWS, Plaid or Stripe SDKs nor builds their clients."""
+    code = (
+        "import sys, backend.main\n"
+        "print(','.join(m for m in ('boto3', 'plaid', 'stripe') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PACKAGE_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+@pytest.fixture
+def encryption_key(monkeypatch):
+    orm_models.get_encryption_key.cache_clear()
+    key = Fernet.generate_key().decode()
+    monkeypatch.setattr(settings, "ENCRYPTION_KEY", key)
+    yield key
+    orm_models.get_encryption_key.cache_clear()
+
+def test_encrypted_columns_resolve_key_on_first_use(encryption_key):
+    """Test that bank account numbers are encrypted with the configured key, read when first needed."""
+    column_type = orm_models.BankAccount.__table__.c.account_number.type
+    encrypted = column_type.process_bind_param("000123456789", None)
+    assert b"000123456789" not in encrypted
+    assert column_type.process_result_value(encrypted, None) == "000123456789"
+
+def test_invalid_encryption_key_fails_on_first_use(monkeypatch):
+    """Test that a malformed ENCRYPTION_KEY is reported when encryption is first needed."""
+    orm_models.get_encryption_key.cache_clear()
+    monkeypatch.setattr(settings, "ENCRYPTION_KEY", "not-a-fernet-key")
+    try:
+        with pytest.raises(ValueError, match="ENCRYPTION_KEY is not a valid"):
+            orm_models.get_encryption_key()
+    finally:
+        orm_models.get_encryption_key.cache_clear()
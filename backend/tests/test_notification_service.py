@@ -0,0 +1,73 @@
+import smtplib
+import pytest
+from unittest.mock import AsyncMock
+from backend.config import settings
+from backend.services import notification_service as notification_service_module
+from backend.services.notification_service import NotificationService
+from backend.utils.rate_limiter import TokenBucket
+
+@pytest.fixture
+def backoff_delays(monkeypatch):
+    """Record retry backoffs instead of sleeping through them"""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(notification_service_module.asyncio, "sleep", sleep)
+    monkeypatch.setattr(notification_service_module.random, "uniform", lambda low, high: 0)
+    monkeypatch.setattr(settings, "NOTIFICATION_RETRY_BASE_SECONDS", 2.0)
+    return delays
+
+def notification(email):
+    return {'email': email, 'subject': "Timesheet Submission Reminder", 'body': "Please submit your hours."}
+
+@pytest.mark.asyncio
+async def test_bulk_send_retries_transient_errors_and_summarizes(backoff_delays):
+    """Test that 4xx errors are retried with backoff, 5xx fail at once and exhausted retries are deferred."""
+    outcomes = {
+        "sent@testcorp.com": [None],
+        "greylisted@testcorp.com": [smtplib.SMTPResponseException(421, b"Try again later"), None],
+        "unknown@testcorp.com": [smtplib.SMTPRecipientsRefused({"unknown@testcorp.com": (550, b"No such user")})],
+        "mailbox-full@testcorp.com": [smtplib.SMTPResponseException(452, b"Mailbox full")] * 3,
+    }
+    attempts = {email: 0 for email in outcomes}
+
+    async def send_email(email, subject, body):
+        outcome = outcomes[email][attempts[email]]
+        attempts[email] += 1
+        if outcome is not None:
+            raise outcome
+
+    service = NotificationService()
+    service.rate_limiter = TokenBucket(0)
+    service.email_service.send_email = AsyncMock(side_effect=send_email)
+
+    summary = await service.send_bulk_notifications(
+        [notification(email) for email in outcomes], concurrency=2, max_retries=2
+    )
+
+    assert (summary['total'], summary['sent'], summary['failed'], summary['deferred']) == (4, 2, 1, 1)
+    assert [failure['email'] for failure in summary['failures']] == ["unknown@testcorp.com"]
+    assert [deferred['email'] for deferred in summary['deferred_recipients']] == ["mailbox-full@testcorp.com"]
+    assert attempts == {
+        "sent@testcorp.com": 1, "greylisted@testcorp.com": 2, "unknown@testcorp.com": 1, "mailbox-full@testcorp.com": 3
+    }
+    # One backoff for the greylisted recipient, two growing ones for the full mailbox
+    assert sorted(backoff_delays) == [2.0, 2.0, 4.0]
+
+@pytest.mark.asyncio
+async def test_bulk_send_takes_a_token_per_attempt(backoff_delays):
+    """Test that every attempt, retries included, goes through the shared rate limiter."""
+    service = NotificationService()
+    service.rate_limiter = AsyncMock(spec=TokenBucket)
+    service.email_service.send_email = AsyncMock(
+        side_effect=[smtplib.SMTPServerDisconnected("Connection unexpectedly closed"), None, None]
+    )
+
+    summary = await service.send_bulk_notifications(
+        [notification("a@testcorp.com"), notification("b@testcorp.com")], concurrency=1, max_retries=1
+    )
+
+    assert summary['sent'] == 2
+    assert service.rate_limiter.acquire.await_count == 3
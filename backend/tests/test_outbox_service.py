@@ -0,0 +1,194 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import select, update
+from backend.config import settings
+from backend.orm_models import PayrollOutboxEvent, OutboxEventType, OutboxStatus, Payslip
+from backend.services.outbox_service import OutboxService
+from backend.services.payroll_service import PayrollService
+
+async def enqueue(outbox, session_factory, event_type, payslip_ids):
+    async with session_factory() as db:
+        await outbox.enqueue(db, [
+            {'payroll_run_id': 1, 'payslip_id': payslip_id, 'event_type': event_type} for payslip_id in payslip_ids
+        ])
+        await db.commit()
+
+async def load_events(session_factory):
+    async with session_factory() as db:
+        events = (await db.execute(select(PayrollOutboxEvent).order_by(PayrollOutboxEvent.id))).scalars().all()
+    return {event.payslip_id: event for event in events}
+
+@pytest.mark.asyncio
+async def test_claim_takes_due_events_of_one_type_once(sqlite_session_factory):
+    """Test that claims skip other types, future retries and claimed events, and reclaim lapsed leases."""
+    outbox = OutboxService(sqlite_session_factory)
+    before = datetime.utcnow()
+    await enqueue(outbox, sqlite_session_factory, OutboxEventType.PAYSLIP_PDF, [1, 2, 3])
+    await enqueue(outbox, sqlite_session_factory, OutboxEventType.PAYSLIP_EMAIL, [4])
+
+    events = await load_events(sqlite_session_factory)
+    assert all(before <= event.available_at <= datetime.utcnow() for event in events.values())
+
+    async with sqlite_session_factory() as db:
+        await db.execute(
+            update(PayrollOutboxEvent)
+            .where(PayrollOutboxEvent.payslip_id == 3)
+            .values(available_at=datetime.utcnow() + timedelta(minutes=5))
+        )
+        await db.commit()
+
+    claimed, _ = await outbox._claim_events(OutboxEventType.PAYSLIP_PDF, batch_size=10)
+    assert sorted(claimed) == [events[1].id, events[2].id]
+    assert (await outbox._claim_events(OutboxEventType.PAYSLIP_PDF, batch_size=10))[0] == []
+
+    events = await load_events(sqlite_session_factory)
+    assert (events[1].status, events[1].attempts) == (OutboxStatus.PROCESSING, 1)
+    assert events[4].status == OutboxStatus.PENDING
+
+    # A worker that died holding events: they are claimed again once the lease lapses
+    async with sqlite_session_factory() as db:
+        lapsed = datetime.utcnow() - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS + 1)
+        await db.execute(
+            update(PayrollOutboxEvent).where(PayrollOutboxEvent.id == events[1].id).values(locked_at=lapsed)
+        )
+        await db.commit()
+    assert (await outbox._claim_events(OutboxEventType.PAYSLIP_PDF, batch_size=10))[0] == [events[1].id]
+    assert (await load_events(sqlite_session_factory))[1].attempts == 2
+
+@pytest.mark.asyncio
+async def test_failed_event_is_retried_with_backoff(sqlite_session_factory, monkeypatch):
+    """Test that failures back off exponentially and give up after OUTBOX_MAX_ATTEMPTS."""
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 3)
+    outbox = OutboxService(sqlite_session_factory)
+    await enqueue(outbox, sqlite_session_factory, OutboxEventType.PAYSLIP_EMAIL, [1])
+    failing_handler = AsyncMock(side_effect=RuntimeError("SMTP relay unavailable"))
+
+    for attempt, backoff in enumerate([30, 60, None], start=1):
+        [event_id], claimed_at = await outbox._claim_events(OutboxEventType.PAYSLIP_EMAIL, batch_size=10)
+        failed_at = datetime.utcnow()
+        await outbox._process_event(event_id, claimed_at, failing_handler)
+
+        event = (await load_events(sqlite_session_factory))[1]
+        assert event.attempts == attempt
+        assert event.last_error == "SMTP relay unavailable"
+        if backoff is None:
+            assert event.status == OutboxStatus.FAILED
+            break
+        assert event.status == OutboxStatus.PENDING
+        assert abs((event.available_at - failed_at).total_seconds() - backoff) < 5
+        # Not due until the backoff has passed
+        assert (await outbox._claim_events(OutboxEventType.PAYSLIP_EMAIL, batch_size=10))[0] == []
+        async with sqlite_session_factory() as db:
+            await db.execute(
+                update(PayrollOutboxEvent).where(PayrollOutboxEvent.id == event_id).values(available_at=failed_at)
+            )
+            await db.commit()
+
+    assert failing_handler.await_count == 3
+
+@pytest.mark.asyncio
+async def test_unconfirmed_payments_are_not_retried(sqlite_session_factory):
+    """Test that only definitely failed payments are retried; unconfirmed ones wait for reconciliation."""
+    outbox = OutboxService(sqlite_session_factory)
+    await enqueue(outbox, sqlite_session_factory, OutboxEventType.PAYMENT, [1, 2, 3])
+    event_ids, claimed_at = await outbox._claim_events(OutboxEventType.PAYMENT, batch_size=10)
+    summary = {
+        'results': {
+            1: {'status': 'submitted', 'payment_id': 'payment-1'},
+            2: {'status': 'failed', 'error': 'Bad Request'},
+            3: {'status': 'unconfirmed', 'error': 'Plaid request timed out'},
+        }
+    }
+
+    with patch.object(outbox.payment_service, "send_batch", AsyncMock(return_value=summary)):
+        await outbox._handle_payment_batch(event_ids, claimed_at)
+
+    events = await load_events(sqlite_session_factory)
+    assert events[1].status == OutboxStatus.COMPLETED
+    assert events[2].status == OutboxStatus.PENDING
+    assert events[2].available_at > datetime.utcnow()
+    assert events[3].status == OutboxStatus.FAILED
+    assert events[3].last_error == 'Plaid request timed out'
+
+@pytest.mark.asyncio
+async def test_payslip_pdfs_are_rendered_as_one_batch(sqlite_session_factory, sqlite_session, sqlite_payroll_run):
+    """Test that a claimed batch of PDF events is rendered in one call and uploads fail per payslip."""
+    await PayrollService().process_payroll(sqlite_session, sqlite_payroll_run.id)
+    outbox = OutboxService(sqlite_session_factory)
+
+    async def upload(pdf_bytes, employee_id, payslip_id):
+        if payslip_id == 2:
+            raise RuntimeError("S3 unavailable")
+        return f"https://s3/payslip_{payslip_id}.pdf"
+
+    render = AsyncMock(side_effect=lambda snapshots: [b"%PDF" for _ in snapshots])
+    with patch.object(outbox.pdf_service, "render_payslip_pdfs", render), \
+         patch.object(outbox.pdf_service, "upload_payslip_pdf", side_effect=upload):
+        assert await outbox._drain_event_type(OutboxEventType.PAYSLIP_PDF, batch_size=10) == 3
+
+    render.assert_awaited_once()
+    assert len(render.await_args.args[0]) == 3
+
+    async with sqlite_session_factory() as db:
+        events = (await db.execute(select(PayrollOutboxEvent).order_by(PayrollOutboxEvent.id))).scalars().all()
+        payslips = {payslip.id: payslip for payslip in (await db.execute(select(Payslip))).scalars().all()}
+    pdf_events = {event.payslip_id: event for event in events if event.event_type == OutboxEventType.PAYSLIP_PDF}
+    assert [pdf_events[payslip_id].status for payslip_id in (1, 2, 3)] == [
+        OutboxStatus.COMPLETED, OutboxStatus.PENDING, OutboxStatus.COMPLETED
+    ]
+    assert pdf_events[2].last_error == "S3 unavailable"
+    assert payslips[1].pdf_url == "https://s3/payslip_1.pdf" and payslips[2].pdf_url is None
+    assert sorted(event.payslip_id for event in events if event.event_type == OutboxEventType.PAYSLIP_EMAIL) == [1, 3]
+
+@pytest.mark.asyncio
+async def test_payment_batch_error_is_recorded_for_every_event(sqlite_session_factory):
+    """Test that an error escaping send_batch schedules all events of the batch for retry."""
+    outbox = OutboxService(sqlite_session_factory)
+    await enqueue(outbox, sqlite_session_factory, OutboxEventType.PAYMENT, [1, 2])
+    event_ids, claimed_at = await outbox._claim_events(OutboxEventType.PAYMENT, batch_size=10)
+
+    with patch.object(outbox.payment_service, "send_batch", AsyncMock(side_effect=RuntimeError("Lost connection"))):
+        await outbox._handle_payment_batch(event_ids, claimed_at)
+
+    events = await load_events(sqlite_session_factory)
+    assert [(event.status, event.last_error) for event in events.values()] == [
+        (OutboxStatus.PENDING, "Lost connection")
+    ] * 2
+
+@pytest.mark.asyncio
+async def test_lapsed_pdf_batch_does_not_complete_reclaimed_events(
+    sqlite_session_factory, sqlite_session, sqlite_payroll_run
+):
+    """Test that a PDF batch that outlived its lease leaves the events, and their emails, to the new claim."""
+    await PayrollService().process_payroll(sqlite_session, sqlite_payroll_run.id)
+    first_worker = OutboxService(sqlite_session_factory)
+    second_worker = OutboxService(sqlite_session_factory)
+
+    event_ids, _ = await first_worker._claim_events(OutboxEventType.PAYSLIP_PDF, batch_size=10)
+    # The first worker claimed the batch long enough ago for its lease to lapse
+    first_claimed_at = (datetime.utcnow() - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS + 1)).replace(microsecond=0)
+    async with sqlite_session_factory() as db:
+        await db.execute(
+            update(PayrollOutboxEvent).where(PayrollOutboxEvent.id.in_(event_ids)).values(locked_at=first_claimed_at)
+        )
+        await db.commit()
+    reclaimed_ids, second_claimed_at = await second_worker._claim_events(OutboxEventType.PAYSLIP_PDF, batch_size=10)
+    assert sorted(reclaimed_ids) == sorted(event_ids)
+
+    async def upload(pdf_bytes, employee_id, payslip_id):
+        return f"https://s3/payslip_{payslip_id}.pdf"
+
+    render = AsyncMock(side_effect=lambda snapshots: [b"%PDF" for _ in snapshots])
+    for worker, claimed_at in ((first_worker, first_claimed_at), (second_worker, second_claimed_at)):
+        with patch.object(worker.pdf_service, "render_payslip_pdfs", render), \
+             patch.object(worker.pdf_service, "upload_payslip_pdf", side_effect=upload):
+            await worker._handle_payslip_pdf_batch(event_ids, claimed_at)
+
+    async with sqlite_session_factory() as db:
+        events = (await db.execute(select(PayrollOutboxEvent))).scalars().all()
+    pdf_events = [event for event in events if event.event_type == OutboxEventType.PAYSLIP_PDF]
+    assert all(event.status == OutboxStatus.COMPLETED for event in pdf_events)
+    assert all(event.attempts == 2 for event in pdf_events)
+    # One email per payslip, queued by the worker that held the claim
+    assert sorted(event.payslip_id for event in events if event.event_type == OutboxEventType.PAYSLIP_EMAIL) == [1, 2, 3]
@@ -0,0 +1,116 @@
+import hashlib
+import pytest
+import plaid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from urllib3.exceptions import ProtocolError
+from backend.orm_models import (
+    Organization, Employee, BankAccount, PayrollRun, Payslip, PaymentStatus, SalaryType
+)
+from backend.services.payment_service import PaymentService, recipient_fingerprint
+from backend.services.plaid_service import plaid_service
+
+PAY_DATE = datetime(2024, 1, 19)
+
+async def add_payslips(db, count: int, with_bank_account: bool = True):
+    """An organization with one payslip per employee, each employee with a verified bank account."""
+    db.add(Organization(id=1, name="Test Corp"))
+    db.add(PayrollRun(id=1, org_id=1, pay_period_start=PAY_DATE - timedelta(days=18),
+                      pay_period_end=PAY_DATE - timedelta(days=5), pay_date=PAY_DATE))
+    payslips = []
+    for index in range(1, count + 1):
+        db.add(Employee(id=index, org_id=1, cognito_sub=f"sub-{index}", employee_id=f"EMP{index:03d}",
+                        first_name="Jane", last_name=f"Doe{index}", email=f"jane{index}@testcorp.com",
+                        salary_type=SalaryType.FIXED, base_salary=Decimal('52000.00')))
+        if with_bank_account:
+            db.add(BankAccount(employee_id=index, plaid_account_id=f"acct-{index}", plaid_access_token="token",
+                               mask="0000", is_verified=True))
+        payslip = Payslip(id=index, employee_id=index, payroll_run_id=1, pay_period_start=PAY_DATE - timedelta(days=18),
+                          pay_period_end=PAY_DATE - timedelta(days=5), pay_date=PAY_DATE,
+                          gross_pay=Decimal('2000.00'), net_pay=Decimal('1500.00'))
+        db.add(payslip)
+        payslips.append(payslip)
+    await db.commit()
+    return payslips
+
+def plaid_outcomes(outcomes):
+    """create_payment fake returning or raising the outcome registered for each payslip reference."""
+    async def create_payment(recipient_id, reference, amount):
+        outcome = outcomes[reference]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return create_payment
+
+@pytest.mark.asyncio
+async def test_send_batch_separates_submitted_rejected_and_unknown(sqlite_session):
+    """Test that only definite rejections are failed; transport errors and 5xx stay unconfirmed."""
+    payslips = await add_payslips(sqlite_session, 4)
+    outcomes = {
+        "PAYSLIP-1": "payment-1",
+        "PAYSLIP-2": plaid.ApiException(status=400, reason="Bad Request"),
+        "PAYSLIP-3": ProtocolError("Connection aborted.", ConnectionResetError(104, "Connection reset by peer")),
+        "PAYSLIP-4": plaid.ApiException(status=503, reason="Service Unavailable"),
+    }
+
+    with patch.object(plaid_service, "create_payment_recipient", AsyncMock(return_value="recipient")), \
+         patch.object(plaid_service, "create_payment", side_effect=plaid_outcomes(outcomes)):
+        summary = await PaymentService().send_batch(payslips, sqlite_session)
+
+    assert (summary['submitted'], summary['failed'], summary['unconfirmed']) == (1, 1, 2)
+    assert summary['results'][1] == {'status': 'submitted', 'payment_id': 'payment-1'}
+    assert summary['results'][2]['status'] == 'failed'
+    assert summary['results'][3]['status'] == 'unconfirmed'
+    assert summary['results'][4]['status'] == 'unconfirmed'
+
+    submitted, rejected, reset, unavailable = payslips
+    assert submitted.payment_reference == "payment-1"
+    assert rejected.payment_status == PaymentStatus.FAILED
+    # Possibly paid: left processing so no later batch submits them again
+    assert reset.payment_status == PaymentStatus.PROCESSING and reset.payment_reference is None
+    assert unavailable.payment_status == PaymentStatus.PROCESSING
+
+    with patch.object(plaid_service, "create_payment", AsyncMock(return_value="payment-again")) as create_payment:
+        summary = await PaymentService().send_batch([reset, unavailable], sqlite_session)
+    create_payment.assert_not_called()
+    assert summary['unconfirmed'] == 2
+
+@pytest.mark.asyncio
+async def test_send_batch_fails_payslips_without_bank_account(sqlite_session):
+    """Test that a payslip without a verified bank account fails without calling Plaid."""
+    payslips = await add_payslips(sqlite_session, 1, with_bank_account=False)
+
+    with patch.object(plaid_service, "create_payment", AsyncMock()) as create_payment:
+        summary = await PaymentService().send_batch(payslips, sqlite_session)
+
+    create_payment.assert_not_called()
+    assert summary['failed'] == 1
+    assert payslips[0].payment_status == PaymentStatus.FAILED
+
+@pytest.mark.asyncio
+async def test_stored_recipient_is_reused_until_name_or_account_changes():
+    """Test that a renamed employee or a different account gets a new recipient, and only then."""
+    employee = Employee(id=1, first_name="Jane", last_name="Doe")
+    bank_account = BankAccount(plaid_account_id="acct-1", mask="6789",
+                               account_number="000123456789", routing_number="011000015")
+    service = PaymentService()
+
+    with patch.object(plaid_service, "create_payment_recipient",
+                      AsyncMock(side_effect=["recipient-1", "recipient-2", "recipient-3"])) as create_recipient:
+        assert await service.get_or_create_recipient(employee, bank_account) == "recipient-1"
+        assert await service.get_or_create_recipient(employee, bank_account) == "recipient-1"
+
+        employee.last_name = "Smith"
+        assert await service.get_or_create_recipient(employee, bank_account) == "recipient-2"
+
+        bank_account.account_number = "000987654321"
+        assert await service.get_or_create_recipient(employee, bank_account) == "recipient-3"
+    assert create_recipient.call_count == 3
+
+def test_recipient_fingerprint_is_keyed():
+    """Test that the stored fingerprint is not a plain hash of the bank details."""
+    bank_account = BankAccount(plaid_account_id="acct-1", mask="6789",
+                               account_number="000123456789", routing_number="011000015")
+    plain = hashlib.sha256("Jane Doe|acct-1|6789|000123456789|011000015".encode()).hexdigest()
+    assert recipient_fingerprint("Jane Doe", bank_account) != plain
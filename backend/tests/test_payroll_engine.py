@@ -0,0 +1,59 @@
+import pytest
+import random
+from decimal import Decimal
+from backend.config import settings
+from backend.services.payroll_engine import (
+    EmployeeSnapshot, TaxConfigSnapshot, calculate_employee_pay, calculate_payslips, calculate_shard,
+    summarize, shutdown_calc_pool
+)
+
+TAX_RATES = TaxConfigSnapshot(
+    federal_tax_rate=Decimal('0.2200'),
+    state_tax_rate=Decimal('0.0500'),
+    social_security_rate=Decimal('0.0620'),
+    medicare_rate=Decimal('0.0145')
+)
+TAX_YEAR = 2024
+
+def make_employees(count: int):
+    """Build a mix of hourly and fixed-salary employee snapshots."""
+    rnd = random.Random(42)
+    employees = []
+    for employee_id in range(1, count + 1):
+        total_hours = Decimal(rnd.randint(0, 9000)) / 100
+        overtime_hours = max(Decimal('0'), total_hours - 80)
+        employees.append(EmployeeSnapshot(
+            id=employee_id,
+            salary_type='fixed' if employee_id % 4 == 0 else 'hourly',
+            hourly_rate=Decimal(rnd.randint(1500, 15000)) / 100,
+            base_salary=Decimal(rnd.randint(30000, 400000)),
+            tax_status='single',
+            regular_hours=total_hours - overtime_hours,
+            overtime_hours=overtime_hours
+        ))
+    return employees
+
+@pytest.mark.asyncio
+async def test_sharded_calculation_matches_serial(monkeypatch):
+    """Test that the process pool produces exactly the serial results, in the same order."""
+    employees = make_employees(3000)
+    serial = calculate_shard(employees, TAX_RATES, 14, TAX_YEAR)
+
+    monkeypatch.setattr(settings, "PAYROLL_CALC_WORKERS", 3)
+    monkeypatch.setattr(settings, "PAYROLL_SHARD_SIZE", 250)
+    monkeypatch.setattr(settings, "PAYROLL_PARALLEL_MIN_EMPLOYEES", 1)
+    try:
+        sharded = await calculate_payslips(employees, TAX_RATES, 14, TAX_YEAR)
+    finally:
+        shutdown_calc_pool()
+
+    assert sharded == serial
+    assert [result['employee_id'] for result in sharded] == [employee.id for employee in employees]
+    assert summarize(sharded) == summarize(serial)
+
+def test_vectorized_shard_matches_decimal_path():
+    """Test that the NumPy shard calculation matches the per-employee Decimal calculation."""
+    employees = make_employees(2000)
+    assert calculate_shard(employees, TAX_RATES, 14, TAX_YEAR) == [
+        calculate_employee_pay(employee, TAX_RATES, 14, TAX_YEAR) for employee in employees
+    ]
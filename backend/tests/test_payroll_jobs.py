@@ -0,0 +1,141 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func
+from backend.config import settings
+from backend.orm_models import (
+    PayrollRun, PayrollStatus, PayrollJob, PayrollJobStatus, Payslip, PayrollOutboxEvent, EmployeeYTDWages
+)
+from backend.services import payroll_service as payroll_service_module
+from backend.services.payroll_job_service import PayrollJobService
+from backend.services.payroll_service import PayrollService
+from backend.utils.exceptions import PayrollClaimLostException
+
+async def count(db, column, *conditions):
+    return (await db.execute(select(func.count(column)).where(*conditions))).scalar()
+
+@pytest.mark.asyncio
+async def test_enqueue_payroll_job_is_idempotent(sqlite_session_factory, sqlite_session, sqlite_payroll_run):
+    """Test that queuing the same payroll run twice returns the same job."""
+    job_service = PayrollJobService(sqlite_session_factory)
+    first_job = await job_service.enqueue(sqlite_session, sqlite_payroll_run.id)
+    second_job = await job_service.enqueue(sqlite_session, sqlite_payroll_run.id)
+
+    assert first_job.id == second_job.id
+    assert first_job.status == PayrollJobStatus.QUEUED
+    assert await count(sqlite_session, PayrollJob.id) == 1
+
+@pytest.mark.asyncio
+async def test_lapsed_job_is_taken_over_without_duplicates(
+    sqlite_session_factory, sqlite_session, sqlite_payroll_run, monkeypatch
+):
+    """Test that a worker whose lease lapsed stops once another worker claims its job."""
+    monkeypatch.setattr(payroll_service_module, "PAYSLIP_INSERT_CHUNK_SIZE", 1)
+    first_worker = PayrollJobService(sqlite_session_factory)
+    second_worker = PayrollJobService(sqlite_session_factory)
+
+    job = await first_worker.enqueue(sqlite_session, sqlite_payroll_run.id)
+    first_claim = await first_worker._claim_job()
+    takeover = {}
+
+    process_payroll = first_worker.payroll_service.process_payroll
+
+    async def slow_first_chunk(db, payroll_run_id, progress=None, claim_token=None):
+        async def progress_after_takeover(calculated, total):
+            if calculated == 1:
+                # The first chunk outlived the lease and another worker claimed the job meanwhile
+                async with sqlite_session_factory() as session:
+                    lapsed = datetime.utcnow() - timedelta(seconds=settings.PAYROLL_JOB_LEASE_SECONDS + 1)
+                    await session.execute(update(PayrollJob).where(PayrollJob.id == job.id).values(locked_at=lapsed))
+                    await session.commit()
+                takeover['claim'] = await second_worker._claim_job()
+            await progress(calculated, total)
+        return await process_payroll(db, payroll_run_id, progress=progress_after_takeover, claim_token=claim_token)
+
+    monkeypatch.setattr(first_worker.payroll_service, "process_payroll", slow_first_chunk)
+    await first_worker._run_job(*first_claim)
+
+    async with sqlite_session_factory() as db:
+        assert await count(db, Payslip.id) == 1
+        assert (await db.get(PayrollJob, job.id)).status == PayrollJobStatus.RUNNING
+
+    await second_worker._run_job(*takeover['claim'])
+
+    async with sqlite_session_factory() as db:
+        finished_job = await db.get(PayrollJob, job.id)
+        assert finished_job.status == PayrollJobStatus.COMPLETED
+        assert finished_job.attempts == 2
+        assert await count(db, Payslip.id) == 3
+        assert await count(db, func.distinct(Payslip.employee_id)) == 3
+        assert await count(db, PayrollOutboxEvent.id) == 3
+        assert await count(db, EmployeeYTDWages.id) == 3
+        assert (await db.get(PayrollRun, sqlite_payroll_run.id)).status == PayrollStatus.COMPLETED
+
+@pytest.mark.asyncio
+async def test_process_payroll_refuses_run_claimed_by_another_worker(sqlite_session, sqlite_payroll_run):
+    """Test that a run processing under another claim is neither started nor marked failed."""
+    run_id = sqlite_payroll_run.id
+    sqlite_payroll_run.status = PayrollStatus.PROCESSING
+    sqlite_payroll_run.claim_token = "other-worker"
+    await sqlite_session.commit()
+
+    with pytest.raises(RuntimeError, match="already being processed"):
+        await PayrollService().process_payroll(sqlite_session, run_id, claim_token="this-worker")
+
+    assert await count(sqlite_session, Payslip.id) == 0
+    run = await sqlite_session.get(PayrollRun, run_id, populate_existing=True)
+    assert (run.status, run.claim_token) == (PayrollStatus.PROCESSING, "other-worker")
+
+@pytest.mark.asyncio
+async def test_process_payroll_stops_when_claim_is_taken_over(
+    sqlite_session_factory, sqlite_session, sqlite_payroll_run, monkeypatch
+):
+    """Test that each chunk re-checks the claim, so a superseded worker writes nothing more."""
+    run_id = sqlite_payroll_run.id
+    monkeypatch.setattr(payroll_service_module, "PAYSLIP_INSERT_CHUNK_SIZE", 1)
+
+    async def taken_over_after_first_chunk(calculated, total):
+        async with sqlite_session_factory() as db:
+            await db.execute(
+                update(PayrollRun).where(PayrollRun.id == run_id).values(claim_token="other-worker")
+            )
+            await db.commit()
+
+    with pytest.raises(PayrollClaimLostException):
+        await PayrollService().process_payroll(
+            sqlite_session, run_id, progress=taken_over_after_first_chunk, claim_token="this-worker"
+        )
+
+    assert await count(sqlite_session, Payslip.id) == 1
+    run = await sqlite_session.get(PayrollRun, run_id, populate_existing=True)
+    assert run.status == PayrollStatus.PROCESSING
+
+@pytest.mark.asyncio
+async def test_exhausted_job_is_failed_and_next_job_claimed(sqlite_session_factory, sqlite_session, sqlite_payroll_run):
+    """Test that a job out of attempts fails its run and the same claim call moves on to the next job."""
+    job_service = PayrollJobService(sqlite_session_factory)
+    lapsed = datetime.utcnow() - timedelta(seconds=settings.PAYROLL_JOB_LEASE_SECONDS + 1)
+    sqlite_payroll_run.status = PayrollStatus.PROCESSING
+    sqlite_payroll_run.claim_token = "stale-claim"
+    exhausted_job = PayrollJob(
+        payroll_run_id=sqlite_payroll_run.id, status=PayrollJobStatus.RUNNING, attempts=3,
+        claim_token="stale-claim", locked_at=lapsed, employees_total=0, employees_calculated=0
+    )
+    sqlite_session.add(exhausted_job)
+    sqlite_session.add(PayrollRun(
+        id=2, org_id=1, pay_period_start=sqlite_payroll_run.pay_period_end + timedelta(days=1),
+        pay_period_end=sqlite_payroll_run.pay_period_end + timedelta(days=14),
+        pay_date=sqlite_payroll_run.pay_date + timedelta(days=14)
+    ))
+    await sqlite_session.commit()
+    queued_job = await job_service.enqueue(sqlite_session, 2)
+
+    claimed = await job_service._claim_job()
+
+    assert claimed[:2] == (queued_job.id, 2)
+    async with sqlite_session_factory() as db:
+        failed_job = await db.get(PayrollJob, exhausted_job.id)
+        assert failed_job.status == PayrollJobStatus.FAILED
+        assert failed_job.error == "Worker stopped responding too many times"
+        failed_run = await db.get(PayrollRun, sqlite_payroll_run.id)
+        assert failed_run.status == PayrollStatus.FAILED
+        assert failed_run.claim_token is None
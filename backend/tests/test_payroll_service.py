@@ -0,0 +1,164 @@
+import pytest
+from fastapi import HTTPException
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select, func
+from backend.orm_models import (
+    PayrollRun, PayrollStatus, Payslip, PayrollOutboxEvent, EmployeeYTDWages, Timesheet, TimesheetStatus
+)
+from backend.routers.payroll import preview_payroll_run
+from backend.schemas import PayrollRunCreate, UserInfo
+from backend.services import payroll_service as payroll_service_module
+from backend.services.payroll_service import PayrollService
+
+async def count(db, column, *conditions):
+    return (await db.execute(select(func.count(column)).where(*conditions))).scalar()
+
+@pytest.mark.asyncio
+async def test_preview_payroll_writes_nothing(sqlite_session, sqlite_payroll_run):
+    """Test that previewing payroll returns the register without creating runs or payslips."""
+    run_id = sqlite_payroll_run.id
+    preview = await PayrollService().preview_payroll(
+        sqlite_session,
+        org_id=sqlite_payroll_run.org_id,
+        pay_period_start=sqlite_payroll_run.pay_period_start,
+        pay_period_end=sqlite_payroll_run.pay_period_end,
+        pay_date=sqlite_payroll_run.pay_date
+    )
+
+    assert preview["total_employees"] == 3
+    assert [row["employee_id"] for row in preview["employees"]] == [1, 2, 3]
+    assert all(row["gross_pay"] == Decimal('2000.00') for row in preview["employees"])
+    assert await count(sqlite_session, PayrollRun.id) == 1
+    assert await count(sqlite_session, Payslip.id) == 0
+    assert await count(sqlite_session, PayrollOutboxEvent.id) == 0
+    assert await count(sqlite_session, EmployeeYTDWages.id) == 0
+
+    # Processing the run pays exactly what the preview showed
+    processed = await PayrollService().process_payroll(sqlite_session, run_id)
+    assert processed["total_gross_pay"] == preview["total_gross_pay"]
+    assert processed["total_net_pay"] == preview["total_net_pay"]
+
+async def payslip_sums(db, run_id):
+    result = await db.execute(
+        select(func.sum(Payslip.gross_pay), func.sum(Payslip.net_pay)).where(Payslip.payroll_run_id == run_id)
+    )
+    return tuple(result.one())
+
+@pytest.mark.asyncio
+async def test_preview_is_limited_to_the_admins_organization(sqlite_session, sqlite_payroll_run):
+    """Test that an admin can preview their own organization's payroll but not another's."""
+    period = {
+        "pay_period_start": sqlite_payroll_run.pay_period_start,
+        "pay_period_end": sqlite_payroll_run.pay_period_end,
+        "pay_date": sqlite_payroll_run.pay_date,
+    }
+    admin = UserInfo(sub="admin", email="admin@testcorp.com", groups=["admin"], org_id="1")
+
+    preview = await preview_payroll_run(PayrollRunCreate(org_id=1, **period), db=sqlite_session, current_user=admin)
+    assert preview["total_employees"] == 3
+
+    for current_user in (admin, admin.model_copy(update={"org_id": None})):
+        with pytest.raises(HTTPException) as exc_info:
+            await preview_payroll_run(PayrollRunCreate(org_id=2, **period), db=sqlite_session, current_user=current_user)
+        assert exc_info.value.status_code == 403
+
+@pytest.mark.asyncio
+async def test_recompute_adjusts_late_approvals_once(sqlite_session, sqlite_payroll_run):
+    """Test that a late approval or edit gets exactly one adjustment payslip and moves the run totals."""
+    run_id = sqlite_payroll_run.id
+    timesheets = (await sqlite_session.execute(
+        select(Timesheet).order_by(Timesheet.employee_id, Timesheet.week_start_date)
+    )).scalars().all()
+    late = next(t for t in timesheets if t.employee_id == 2 and t.week_start_date.day == 8)
+    late.status, late.approved_at = TimesheetStatus.PENDING, None
+    await sqlite_session.commit()
+    service = PayrollService()
+    await service.process_payroll(sqlite_session, run_id)
+
+    late.status, late.approved_at = TimesheetStatus.APPROVED, datetime.utcnow()
+    await sqlite_session.commit()
+    result = await service.recompute_payroll(sqlite_session, run_id)
+
+    assert result["adjustments"] == 1
+    adjustment = (await sqlite_session.execute(select(Payslip).where(Payslip.is_adjustment))).scalar_one()
+    assert (adjustment.employee_id, adjustment.gross_pay) == (2, Decimal('1000.00'))
+    run = await sqlite_session.get(PayrollRun, run_id)
+    assert (run.total_gross_pay, run.total_net_pay) == await payslip_sums(sqlite_session, run_id)
+    assert run.total_gross_pay == Decimal('6000.00')
+
+    # Nothing changed since: no payslips, events or totals are written
+    payslips, events = await count(sqlite_session, Payslip.id), await count(sqlite_session, PayrollOutboxEvent.id)
+    totals = (run.total_gross_pay, run.total_net_pay, run.total_taxes)
+    result = await service.recompute_payroll(sqlite_session, run_id)
+    assert result["adjustments"] == 0
+    assert await count(sqlite_session, Payslip.id) == payslips
+    assert await count(sqlite_session, PayrollOutboxEvent.id) == events
+    assert (run.total_gross_pay, run.total_net_pay, run.total_taxes) == totals
+
+    # An admin correcting an approved timesheet is picked up through updated_at
+    timesheets[0].total_hours = Decimal('45.00')
+    await sqlite_session.commit()
+    result = await service.recompute_payroll(sqlite_session, run_id)
+    assert result["adjustments"] == 1
+    assert run.total_gross_pay == Decimal('6125.00')
+    assert (run.total_gross_pay, run.total_net_pay) == await payslip_sums(sqlite_session, run_id)
+
+@pytest.mark.asyncio
+async def test_refused_recompute_releases_the_run(sqlite_session, sqlite_payroll_run):
+    """Test that recomputing a run that was never processed rolls back instead of keeping the run locked."""
+    with pytest.raises(RuntimeError):
+        await PayrollService().recompute_payroll(sqlite_session, sqlite_payroll_run.id)
+    assert not sqlite_session.in_transaction()
+
+@pytest.mark.asyncio
+async def test_failed_run_resumes_after_checkpoint(sqlite_session, sqlite_payroll_run, monkeypatch):
+    """Test that a rerun after a failed chunk pays only the remaining employees, once each."""
+    run_id = sqlite_payroll_run.id
+    monkeypatch.setattr(payroll_service_module, "PAYSLIP_INSERT_CHUNK_SIZE", 1)
+    service = PayrollService()
+    persist_payslip_chunk = service._persist_payslip_chunk
+    failed = []
+
+    async def fail_second_chunk_once(db, payroll_run, employees, payslip_rows):
+        await persist_payslip_chunk(db, payroll_run, employees, payslip_rows)
+        if employees[0].id == 2 and not failed:
+            failed.append(employees[0].id)
+            raise RuntimeError("Deadlock found when trying to get lock")
+
+    monkeypatch.setattr(service, "_persist_payslip_chunk", fail_second_chunk_once)
+    with pytest.raises(RuntimeError, match="Deadlock"):
+        await service.process_payroll(sqlite_session, run_id)
+
+    run = await sqlite_session.get(PayrollRun, run_id, populate_existing=True)
+    assert (run.status, run.checkpoint_employee_id) == (PayrollStatus.FAILED, 1)
+    # The failed chunk's writes were rolled back with it
+    assert await count(sqlite_session, Payslip.id) == 1
+    assert await count(sqlite_session, EmployeeYTDWages.id) == 1
+    assert await count(sqlite_session, PayrollOutboxEvent.id) == 1
+
+    result = await service.process_payroll(sqlite_session, run_id)
+
+    assert result["total_employees"] == 3
+    assert result["total_gross_pay"] == 6000.0
+    assert await count(sqlite_session, Payslip.id) == 3
+    assert await count(sqlite_session, func.distinct(Payslip.employee_id)) == 3
+    assert await count(sqlite_session, EmployeeYTDWages.id) == 3
+    assert await count(sqlite_session, func.distinct(PayrollOutboxEvent.payslip_id)) == 3
+    assert await count(sqlite_session, PayrollOutboxEvent.id) == 3
+    ytd_gross = (await sqlite_session.execute(select(func.sum(EmployeeYTDWages.gross_wages)))).scalar()
+    assert ytd_gross == Decimal('6000.00')
+
+@pytest.mark.asyncio
+async def test_run_without_tax_data_fails_before_writing(sqlite_session, sqlite_payroll_run):
+    """Test that a pay date in a year the tax data does not cover is refused up front."""
+    run_id = sqlite_payroll_run.id
+    sqlite_payroll_run.pay_date = datetime(2019, 1, 4)
+    await sqlite_session.commit()
+
+    with pytest.raises(ValueError, match="No federal tax data for 2019"):
+        await PayrollService().process_payroll(sqlite_session, run_id)
+
+    run = await sqlite_session.get(PayrollRun, run_id, populate_existing=True)
+    assert run.status == PayrollStatus.PENDING
+    assert await count(sqlite_session, Payslip.id) == 0
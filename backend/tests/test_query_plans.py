@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, select, and_, or_, func, text
+from backend.database import Base
+from backend.orm_models import (
+    Employee, Timesheet, PayrollRun, Payslip, TimesheetStatus, PayrollOutboxEvent, OutboxEventType, OutboxStatus
+)
+
+PERIOD_START = datetime(2024, 1, 1)
+PERIOD_END = PERIOD_START + timedelta(days=13)
+
+# The hot payroll queries and the index each must use
+HOT_QUERIES = {
+    "active employees of an organization": (
+        select(Employee).where(and_(Employee.org_id == 1, Employee.is_active == True)).order_by(Employee.id),
+        "ix_employees_org_id_is_active"
+    ),
+    "approved timesheets for a pay period": (
+        select(Timesheet).where(
+            and_(
+                Timesheet.employee_id.in_([1, 2, 3]),
+                Timesheet.status == TimesheetStatus.APPROVED,
+                Timesheet.week_start_date >= PERIOD_START,
+                Timesheet.week_end_date <= PERIOD_END
+            )
+        ),
+        "ix_timesheets_employee_status_week"
+    ),
+    "payroll run for a period": (
+        select(PayrollRun).where(
+            and_(
+                PayrollRun.org_id == 1,
+                PayrollRun.pay_period_start == PERIOD_START,
+                PayrollRun.pay_period_end == PERIOD_END
+            )
+        ),
+        "ix_payroll_runs_org_id_period"
+    ),
+    "an employee's payslips by pay date": (
+        select(Payslip).where(
+            and_(Payslip.employee_id == 1, Payslip.pay_date >= PERIOD_START)
+        ).order_by(Payslip.pay_date.desc()),
+        "ix_payslips_employee_id_pay_date"
+    ),
+    "a run's payslip totals": (
+        select(func.sum(Payslip.gross_pay), func.sum(Payslip.net_pay)).where(Payslip.payroll_run_id == 1),
+        "ix_payslips_payroll_run_id_employee_id"
+    ),
+    "a run's payslip ids by employee": (
+        select(Payslip.employee_id, func.max(Payslip.id)).where(
+            and_(Payslip.payroll_run_id == 1, Payslip.employee_id.in_([1, 2, 3]))
+        ).group_by(Payslip.employee_id),
+        "ix_payslips_payroll_run_id_employee_id"
+    ),
+    "due outbox events of a type": (
+        select(PayrollOutboxEvent.id).where(
+            and_(
+                PayrollOutboxEvent.event_type == OutboxEventType.PAYMENT,
+                or_(
+                    and_(
+                        PayrollOutboxEvent.status == OutboxStatus.PENDING,
+                        PayrollOutboxEvent.available_at <= PERIOD_END
+                    ),
+                    and_(
+                        PayrollOutboxEvent.status == OutboxStatus.PROCESSING,
+                        PayrollOutboxEvent.locked_at < PERIOD_START
+                    )
+                )
+            )
+        ).order_by(PayrollOutboxEvent.id).limit(100),
+        "ix_payroll_outbox_event_type_status_available_at"
+    ),
+}
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    """An empty schema built from the models, as create_all builds it in production."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_index(plan_engine, name):
+    """Test that each hot query is answered from its composite index, not a table scan."""
+    query, index_name = HOT_QUERIES[name]
+    compiled = query.compile(plan_engine, compile_kwargs={"literal_binds": True})
+
+    with plan_engine.connect() as conn:
+        plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+    table_name = query.get_final_froms()[0].name
+    assert any(index_name in step for step in plan), (name, plan)
+    assert not any(step.startswith(f"SCAN {table_name}") for step in plan), (name, plan)
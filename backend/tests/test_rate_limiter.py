@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from backend.utils import rate_limiter as rate_limiter_module
+from backend.utils.rate_limiter import TokenBucket
+
+class FakeClock:
+    """Monotonic clock that only moves when the rate limiter sleeps"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float):
+        self.sleeps.append(delay)
+        self.now += delay
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(rate_limiter_module, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=clock.sleep))
+    return clock
+
+@pytest.mark.asyncio
+async def test_bucket_allows_a_burst_then_paces_at_the_rate(clock):
+    """Test that acquisitions beyond the burst wait one token interval each."""
+    bucket = TokenBucket(rate=4, burst=2)
+    for _ in range(5):
+        await bucket.acquire()
+
+    assert clock.sleeps == [0.25, 0.25, 0.25]
+    assert clock.now == 0.75
+
+@pytest.mark.asyncio
+async def test_idle_bucket_refills_only_up_to_the_burst(clock):
+    """Test that time spent idle does not bank more than `burst` immediate acquisitions."""
+    bucket = TokenBucket(rate=4, burst=2)
+    clock.now = 60.0
+    for _ in range(3):
+        await bucket.acquire()
+
+    assert clock.sleeps == [0.25]
+
+@pytest.mark.asyncio
+async def test_zero_rate_disables_limiting(clock):
+    """Test that a rate of 0 never waits."""
+    bucket = TokenBucket(rate=0)
+    for _ in range(100):
+        await bucket.acquire()
+
+    assert clock.sleeps == []
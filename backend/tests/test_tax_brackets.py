@@ -0,0 +1,88 @@
+import json
+import logging
+import pytest
+import random
+from datetime import datetime
+from decimal import Decimal
+from backend.services.tax_brackets import (
+    BracketTable, FederalBracketRegistry, federal_brackets, normalize_filing_status
+)
+from backend.services.tax_service import TaxService
+
+def marginal_tax(brackets, income: Decimal) -> Decimal:
+    """Reference calculation walking every bracket."""
+    tax = Decimal('0')
+    for index, (threshold, rate) in enumerate(brackets):
+        upper = brackets[index + 1][0] if index + 1 < len(brackets) else income
+        if income > threshold:
+            tax += (min(income, upper) - threshold) * rate
+    return tax
+
+def test_bracket_table_matches_marginal_walk():
+    """Test that the bisect lookup matches a bracket-by-bracket walk, including at the boundaries."""
+    for (tax_year, filing_status), table in federal_brackets.tables.items():
+        brackets = list(zip(table.thresholds, table.rates))
+        incomes = [threshold + delta for threshold in table.thresholds for delta in (Decimal('-0.01'), 0, Decimal('0.01'))]
+        rnd = random.Random(tax_year)
+        incomes += [Decimal(rnd.randint(0, 100_000_000)) / 100 for _ in range(200)]
+        for income in incomes:
+            assert table.tax(income) == marginal_tax(brackets, income), (tax_year, filing_status, income)
+
+def test_filing_status_aliases():
+    """Test that employee tax_status values map onto the table's filing statuses."""
+    assert normalize_filing_status("married") == "married_joint"
+    assert normalize_filing_status("Head of Household") == "head_of_household"
+    assert normalize_filing_status(None) == "single"
+    assert federal_brackets.get(2023, "married") is federal_brackets.get(2023, "married_joint")
+    with pytest.raises(ValueError):
+        federal_brackets.get(1999, "single")
+
+def test_bracket_table_rejects_unsorted_brackets():
+    """Test that malformed bracket data fails when loaded, not when used."""
+    with pytest.raises(ValueError):
+        BracketTable.compile([("0", "0.10"), ("50000", "0.22"), ("20000", "0.12")])
+
+def test_annual_taxes_use_filing_status():
+    """Test that married filers get the wider joint brackets."""
+    tax_service = TaxService()
+    single = tax_service.calculate_annual_taxes(Decimal('100000'), "single", tax_year=2023)
+    married = tax_service.calculate_annual_taxes(Decimal('100000'), "married", tax_year=2023)
+    assert single['federal_tax'] == Decimal('17400.00')
+    assert married['federal_tax'] == Decimal('12615.00')
+
+def test_wage_base_is_looked_up_by_tax_year():
+    """Test that every bracket year has its own Social Security wage base."""
+    assert federal_brackets.social_security_wage_base(2023) == Decimal('160200')
+    assert federal_brackets.social_security_wage_base(2024) == Decimal('168600')
+    with pytest.raises(ValueError):
+        federal_brackets.social_security_wage_base(1999)
+
+def test_wage_base_loads_the_data_on_first_use():
+    """Test that the wage base can be the first thing asked of a registry that was never loaded."""
+    registry = FederalBracketRegistry()
+    assert registry.social_security_wage_base(2024) == Decimal('168600')
+
+def test_data_file_covers_the_current_year():
+    """Test that the shipped data has this year's tables, so payroll does not fall back."""
+    assert federal_brackets.resolve_year(datetime.utcnow().year) == datetime.utcnow().year
+
+def test_missing_later_year_falls_back_to_latest_with_a_warning(tmp_path, caplog):
+    """Test that a year past the data file uses its latest year, warns once, and earlier gaps fail."""
+    data_path = tmp_path / "brackets.json"
+    data_path.write_text(json.dumps({
+        "social_security_wage_base": {"2023": "160200"},
+        "years": {"2023": {"single": [["0", "0.10"], ["11000", "0.12"]]}}
+    }))
+    registry = FederalBracketRegistry(str(data_path))
+
+    with caplog.at_level(logging.WARNING, logger="backend.services.tax_brackets"):
+        registry.load()
+        # Reported at load time for the current year, not again when payroll asks for it
+        assert registry.social_security_wage_base(datetime.utcnow().year) == Decimal('160200')
+        assert registry.get(datetime.utcnow().year, "single") is registry.get(2023, "single")
+    assert [record.getMessage() for record in caplog.records] == [
+        f"No federal tax brackets or wage base for {datetime.utcnow().year} in {data_path}; "
+        f"using 2023 until the data file is updated"
+    ]
+    with pytest.raises(ValueError):
+        registry.social_security_wage_base(2022)
@@ -0,0 +1,75 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import select
+from backend.orm_models import Employee, EmployeeYTDWages, SalaryType, Timesheet
+from backend.routers.timesheets import pay_timesheet
+from backend.schemas import UserInfo
+from backend.services.payment_service import PaymentService
+from backend.services.ytd_wage_service import ytd_wage_service
+
+ADMIN = UserInfo(sub="admin", email="admin@testcorp.com", groups=["admin"])
+
+async def first_timesheet(db, employee_id: int) -> Timesheet:
+    result = await db.execute(select(Timesheet).where(Timesheet.employee_id == employee_id).order_by(Timesheet.id))
+    return result.scalars().first()
+
+async def ytd_gross(db, employee_id: int, tax_year: int) -> Decimal:
+    result = await db.execute(
+        select(EmployeeYTDWages.gross_wages).where(
+            EmployeeYTDWages.employee_id == employee_id, EmployeeYTDWages.tax_year == tax_year
+        )
+    )
+    return result.scalar_one()
+
+@pytest.mark.asyncio
+async def test_pay_timesheet_applies_and_records_ytd_wages(sqlite_session, sqlite_payroll_run):
+    """Test that a near-cap employee paid for a timesheet only has Social Security withheld up to the wage base."""
+    # $500 below the 2024 wage base of $168,600
+    await ytd_wage_service.add(sqlite_session, 2024, {1: Decimal('168100.00')})
+    await sqlite_session.commit()
+    timesheet = await first_timesheet(sqlite_session, 1)
+
+    async def pay(amount, employee_id, description, db):
+        # YTD wages are written only after Plaid has taken the payment
+        assert await ytd_gross(db, employee_id, 2024) == Decimal('168100.00')
+        return {'method': 'plaid', 'payment_id': 'payment-1', 'status': 'initiated'}
+
+    send_payment = AsyncMock(side_effect=pay)
+    with patch.object(PaymentService, "send_payment_via_plaid", send_payment):
+        result = await pay_timesheet(timesheet.id, db=sqlite_session, current_user=ADMIN)
+
+    assert result['payment_id'] == 'payment-1'
+    # 40 hours at $25: federal 220.00, state 50.00, Social Security on $500 only 31.00, Medicare 14.50
+    net_pay = send_payment.await_args.args[0]
+    assert net_pay == Decimal('684.50')
+    assert await ytd_gross(sqlite_session, 1, 2024) == Decimal('169100.00')
+
+@pytest.mark.asyncio
+async def test_failed_timesheet_payment_leaves_ytd_wages(sqlite_session, sqlite_payroll_run):
+    """Test that a payment Plaid did not take is not added to the year-to-date wages."""
+    await ytd_wage_service.add(sqlite_session, 2024, {1: Decimal('168100.00')})
+    await sqlite_session.commit()
+    timesheet = await first_timesheet(sqlite_session, 1)
+
+    send_payment = AsyncMock(return_value={'method': 'plaid', 'payment_id': None, 'status': 'failed', 'error': 'declined'})
+    with patch.object(PaymentService, "send_payment_via_plaid", send_payment):
+        result = await pay_timesheet(timesheet.id, db=sqlite_session, current_user=ADMIN)
+
+    assert result['status'] == 'failed'
+    assert await ytd_gross(sqlite_session, 1, 2024) == Decimal('168100.00')
+
+@pytest.mark.asyncio
+async def test_salaried_timesheet_pay_is_rounded_to_cents(sqlite_session, sqlite_payroll_run):
+    """Test that a weekly share of a salary is rounded to cents before it is taxed and added to YTD wages."""
+    employee = await sqlite_session.get(Employee, 1)
+    employee.salary_type, employee.hourly_rate = SalaryType.FIXED, None
+    await sqlite_session.commit()
+    timesheet = await first_timesheet(sqlite_session, 1)
+
+    send_payment = AsyncMock(return_value={'method': 'plaid', 'payment_id': 'payment-1', 'status': 'initiated'})
+    with patch.object(PaymentService, "send_payment_via_plaid", send_payment):
+        await pay_timesheet(timesheet.id, db=sqlite_session, current_user=ADMIN)
+
+    # $50,000 / 52 = $961.538...
+    assert await ytd_gross(sqlite_session, 1, 2024) == Decimal('961.54')
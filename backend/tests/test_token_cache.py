@@ -0,0 +1,38 @@
+import time
+import jwt
+import pytest
+from unittest.mock import AsyncMock, patch
+from backend.utils.cache import TTLCache
+from backend.middleware import auth_middleware
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    """Test per-entry expiry and the LRU bound."""
+    cache = TTLCache(max_entries=2)
+    now = time.time()
+    cache.set("a", 1, now + 60)
+    cache.set("b", 2, now + 60)
+    cache.get("a")
+    cache.set("c", 3, now + 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache.set("old", 4, now - 1)
+    assert cache.get("old") is None
+    assert len(cache) == 2
+
+@pytest.mark.asyncio
+async def test_repeated_token_is_verified_once():
+    """Test that a token is verified once and then served from the cache until it expires."""
+    user_info = {"sub": "user-1", "email": "", "given_name": "", "family_name": "", "groups": [], "org_id": "1"}
+    token = jwt.encode({"sub": "user-1", "exp": int(time.time()) + 300}, "secret", algorithm="HS256")
+    expired = jwt.encode({"sub": "user-1", "exp": int(time.time()) - 1}, "secret", algorithm="HS256")
+    auth_middleware.verified_tokens.clear()
+
+    with patch.object(auth_middleware, "verify_token", AsyncMock(return_value=user_info)) as verify:
+        for _ in range(20):
+            assert await auth_middleware.verify_token_cached(token) == user_info
+        assert verify.await_count == 1
+
+        await auth_middleware.verify_token_cached(expired)
+        await auth_middleware.verify_token_cached(expired)
+        assert verify.await_count == 3
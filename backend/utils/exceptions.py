@@ -16,6 +16,10 @@ class PayrollRunNotFoundException(PayrollException):
     """Payroll run not found exception"""
     pass
 
+class PayrollClaimLostException(PayrollException):
+    """Another worker took over the payroll job or run this worker was processing"""
+    pass
+
 class InsufficientPermissionsException(PayrollException):
     """Insufficient permissions exception"""
     pass
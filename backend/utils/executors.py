@@ -0,0 +1,58 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+class BlockingExecutor:
+    """Runs blocking SDK calls on a dedicated, bounded thread pool.
+
+    Each integration (Plaid, Stripe, ...) gets its own pool so a slow provider can only
+    exhaust its own threads, never the event loop or the default executor shared by
+    everything else. Calls are awaited with a timeout, unless the executor has none because
+    the SDK enforces its own. The timeout runs from the moment a thread picks the call up:
+    waiting for a free thread is bounded by the pool size, not counted against the call.
+
+    The thread pool is created on first use, and again after a shutdown, so an executor
+    outlives the application lifespan that stopped it (tests, reloads).
+    """
+
+    def __init__(self, name: str, max_workers: int, timeout: Optional[float] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool; raises asyncio.TimeoutError if it takes too long"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        timeout = timeout if timeout is not None else self.timeout
+        if timeout is None:
+            return await loop.run_in_executor(self._get_executor(), call)
+
+        started = asyncio.Event()
+
+        def run_started():
+            loop.call_soon_threadsafe(started.set)
+            return call()
+
+        future = loop.run_in_executor(self._get_executor(), run_started)
+        # Also wakes the wait if the call is cancelled before a thread picks it up
+        future.add_done_callback(lambda _: started.set())
+        try:
+            await started.wait()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        return await asyncio.wait_for(future, timeout)
+
+    def shutdown(self):
+        """Stop accepting work; calls already running are left to finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
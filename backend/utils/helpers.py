@@ -1,8 +1,10 @@
 from typing import Dict, Any, Optional, List
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, timedelta
+import os
 import uuid
 import hashlib
+import hmac
 import secrets
 
 def generate_employee_id() -> str:
@@ -18,6 +20,16 @@ def hash_sensitive_data(data: str) -> str:
     """Hash sensitive data"""
     return hashlib.sha256(data.encode()).hexdigest()
 
+def hmac_sensitive_data(data: str, key: str) -> str:
+    """Keyed hash of sensitive data; unlike a plain hash it cannot be brute-forced without the key"""
+    return hmac.new(key.encode(), data.encode(), hashlib.sha256).hexdigest()
+
+def available_cores() -> int:
+    """Number of CPU cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
 def round_currency(amount: Decimal) -> Decimal:
     """Round currency to 2 decimal places"""
     return amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Opaque cursor for the page after the given key values"""
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Key values from a cursor made by encode_cursor; 400 if it is malformed"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+        if not isinstance(values, dict) or not isinstance(values.get("id"), int):
+            raise ValueError("Cursor has no id")
+        return values
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def paginate(
+    query: Select,
+    key: InstrumentedAttribute,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0
+) -> Select:
+    """Order a list query by its id column and select one page of it.
+
+    With a cursor the page starts after the cursor's id (keyset pagination: an index seek, so
+    every page costs the same however deep it is). Without one, skip is applied as an offset,
+    kept for existing clients.
+    """
+    query = query.order_by(key)
+    if cursor:
+        query = query.where(key > decode_cursor(cursor)["id"])
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def set_next_cursor(response: Response, items: Sequence[Any], limit: int):
+    """Add the next page's cursor to the response if this page was full"""
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": items[-1].id})